@@ -0,0 +1,59 @@
+import gzip
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+class Recording(NamedTuple):
+    chunks: List[str]
+    delays: List[float]  # seconds before each chunk; the first one is the time to first token
+
+class CassetteMiss(LookupError):
+    """Raised when a replay-only cassette has no recording for a prompt"""
+
+class Cassette:
+    """Prompt to completion recordings with chunk timing, stored as gzipped JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._recordings: Dict[str, Recording] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._recordings)
+
+    def get(self, prompt: str) -> Optional[Recording]:
+        return self._recordings.get(self.key(prompt))
+
+    def record(self, prompt: str, chunks: List[str], delays: List[float]) -> None:
+        """Keep the recording and append it to the file; later lines win on load"""
+        key = self.key(prompt)
+        line = json.dumps({
+            "key": key,
+            "chunks": chunks,
+            "delays": [round(delay * 1000) for delay in delays]  # whole milliseconds keep the file small
+        }, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._recordings[key] = Recording(list(chunks), [round(d, 3) for d in delays])
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Appending adds a gzip member; gzip readers concatenate members transparently
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._recordings[entry["key"]] = Recording(
+                    entry["chunks"], [ms / 1000 for ms in entry["delays"]]
+                )
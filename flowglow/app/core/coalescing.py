@@ -0,0 +1,90 @@
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+class Flight:
+    """One in-flight generation whose chunks are replayed to every subscriber"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._updated = asyncio.Event()
+
+    def publish(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            if position < len(self.chunks):
+                position += 1
+                yield self.chunks[position - 1]
+            elif self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            else:
+                await self._updated.wait()
+
+    def _notify(self) -> None:
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+class SingleFlight:
+    """Coalesce identical concurrent generations onto one shared producer task"""
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self.stats = {"started": 0, "coalesced": 0, "cancelled": 0}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Yield the chunks of the flight for key, starting it with factory if none is running"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._produce(key, flight, factory))
+            self.stats["started"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        flight.subscribers += 1
+        try:
+            async for chunk in flight.subscribe():
+                yield chunk
+        finally:
+            flight.subscribers -= 1
+            # The shared generation is only abandoned once nobody is waiting for it
+            if flight.subscribers == 0 and not flight.task.done():
+                flight.task.cancel()
+                self.stats["cancelled"] += 1
+                # A request arriving before the task unwinds must start afresh, not join the cancelled flight
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    async def _produce(self, key: str, flight: Flight, factory: Callable[[], AsyncIterator[str]]) -> None:
+        try:
+            async with aclosing(factory()) as chunks:
+                async for chunk in chunks:
+                    flight.publish(chunk)
+            flight.finish()
+        except asyncio.CancelledError:
+            flight.finish(asyncio.CancelledError())
+            raise
+        except Exception as e:
+            flight.finish(e)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
@@ -32,20 +32,117 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     ENVIRONMENT: str = "development"
     UNSPLASH_API_KEY: str = Field(..., description="Unsplash API key for image fetching")
+    UNSPLASH_API_URL: str = "https://api.unsplash.com"
     
     # Content Generation Settings
     DEFAULT_LANGUAGE: str = "en"
     SUPPORTED_PLATFORMS: list = ["blog", "twitter", "instagram", "linkedin"]
+    CAMPAIGN_CONCURRENCY: int = 4
+    BATCH_CONCURRENCY: int = 4  # requests in flight for the headless batch command
+    STREAM_VALIDATION: bool = True  # stop generations as soon as they break platform limits or policy
+    TWITTER_MAX_THREAD_TWEETS: int = 8  # the Twitter prompt asks for at most 7 tweets; longer threads are invalid
+    PROHIBITED_LEXICONS: list = ["assets/lexicons/prohibited.json"]  # .json lexicons or .txt word lists
+    
+    # HTTP Client Configuration
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP2_ENABLED: bool = True
     
     # Cache Configuration
     ENABLE_CACHE: bool = True
     CACHE_TTL: int = 3600  # 1 hour
+    CACHE_PATH: str = ".cache/llm_responses.db"
+    CACHE_MAX_ENTRIES: int = 1000
+    IMAGE_CACHE_MAX_ENTRIES: int = 500
+    IMAGE_CACHE_TTL: int = 86400  # 1 day
+    IMAGE_CACHE_PATH: str = ".cache/image_lookups.json"  # empty to keep in memory only
+    IMAGE_CACHE_SAVE_DELAY: float = 5.0  # seconds changes are batched before the file is rewritten
+    IMAGE_SEARCH_RESULTS: int = 5
+    IMAGE_QUERY_FROM_REQUEST: bool = True  # search images alongside generation
+    
+    # Local Image Store Configuration
+    IMAGE_STORE_ENABLED: bool = True
+    IMAGE_STORE_DIR: str = "assets/images"
+    IMAGE_STORE_MAX_BYTES: int = 500 * 1024 * 1024
+    IMAGE_STORE_WORKERS: int = 2
+    IMAGE_STORE_QUALITY: int = 80
     
     # LLM Default Settings
     DEFAULT_PROVIDER: str = "ollama"
     TEMPERATURE: float = 0.7
     TOP_P: float = 0.9
     
+    # Generation Profile Configuration
+    GENERATION_CHARS_PER_TOKEN: float = 3.5
+    GENERATION_TOKEN_HEADROOM: float = 1.25  # the cleaner strips markup and preambles after generation
+    GENERATION_MAX_TOKENS: int = 4096  # ceiling for platforms with very long limits
+    GENERATION_STOP: list = ["\nUser:", "\nHuman:"]
+    GENERATION_PROFILES: Dict[str, Dict[str, Any]] = {}  # per-platform overrides, e.g. {"blog": {"max_tokens": 2048}}
+    OLLAMA_NUM_CTX: Optional[int] = None  # one size for all platforms: changing it makes Ollama reload the model
+    
+    # Provider Routing Configuration (provider="auto")
+    ROUTER_PROVIDERS: list = ["ollama", "groq"]
+    ROUTER_HEDGING: bool = True
+    ROUTER_WINDOW: int = 100
+    ROUTER_HEDGE_MIN_DELAY: float = 0.5
+    ROUTER_HEDGE_MAX_DELAY: float = 10.0
+    ROUTER_HEDGE_DEFAULT_DELAY: float = 3.0
+    
+    # Record/Replay Configuration (provider="replay")
+    REPLAY_CASSETTE: str = ".cache/cassettes/default.jsonl.gz"
+    REPLAY_MODE: str = "auto"  # replay: cassette only, record: always re-record, auto: record misses
+    REPLAY_UPSTREAM: str = "ollama"
+    REPLAY_SPEED: float = 1.0  # 2.0 replays twice as fast, 0 without delays
+    
+    # Generation Scheduler Configuration
+    SCHEDULER_CONCURRENCY: Dict[str, int] = {"ollama": 2, "groq": 8}
+    SCHEDULER_DEFAULT_CONCURRENCY: int = 4
+    SCHEDULER_MAX_QUEUE: int = 32
+    SCHEDULER_BULK_QUEUE_SHARE: float = 0.5  # rest of the queue is reserved for interactive use
+    GRADIO_CONCURRENCY_LIMIT: int = 16
+    GRADIO_MAX_QUEUE: int = 64
+    
+    # Metrics Configuration
+    METRICS_ENABLED: bool = True
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9464
+    METRICS_WINDOW: int = 1024  # samples kept per series for quantiles
+    METRICS_LOG_SPANS: bool = False
+    
+    # Logging Configuration
+    LOG_LEVEL: str = "INFO"
+    LOG_DIR: str = "logs"
+    LOG_FILE: str = "flowglow.log"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_ROTATE_INTERVAL: int = 86400  # seconds; 0 rotates by size only
+    LOG_BACKUP_COUNT: int = 7
+    LOG_MAX_FIELD_CHARS: int = 2000
+    LOG_CONTENT_SAMPLE_RATE: float = 0.1  # share of responses logged with their full body
+    LOG_CONSOLE: bool = True
+    
+    # Startup Configuration
+    OLLAMA_STARTUP_TIMEOUT: float = 30.0
+    OLLAMA_POLL_INITIAL_DELAY: float = 0.05
+    OLLAMA_POLL_MAX_DELAY: float = 1.0
+    
+    # Model Residency Configuration
+    OLLAMA_WARMUP: bool = True
+    OLLAMA_WARMUP_BLOCKING: bool = False  # hold startup until the models are loaded
+    OLLAMA_WARMUP_MODELS: list = []  # defaults to OLLAMA_MODEL
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    OLLAMA_KEEP_ALIVE_MODELS: Dict[str, str] = {}  # per-model overrides, e.g. {"llama3": "24h"}; negative keeps it loaded
+    OLLAMA_KEEPER_INTERVAL: float = 240.0
+    OLLAMA_KEEPER_HOURS: str = "08:00-20:00"  # local time
+    OLLAMA_KEEPER_DAYS: list = [0, 1, 2, 3, 4]  # Monday is 0
+    
+    # Groq Retry Configuration
+    GROQ_MAX_RETRIES: int = 3
+    GROQ_BACKOFF_BASE: float = 0.5
+    GROQ_BACKOFF_MAX: float = 20.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -57,8 +154,33 @@ class Settings(BaseSettings):
         load_dotenv(override=True)  # Added override to ensure env vars are loaded
         return cls()
 
+    def get_keep_alive(self, model: str) -> str:
+        """How long Ollama should keep a model loaded after its last request"""
+        return self.OLLAMA_KEEP_ALIVE_MODELS.get(model, self.OLLAMA_KEEP_ALIVE)
+
     def get_model_config(self, provider: str) -> Dict[str, Any]:
         """Get configuration for specific model provider"""
         return self.MODEL_PROVIDERS.get(provider, self.MODEL_PROVIDERS[self.DEFAULT_PROVIDER])
 
-settings = Settings.get_settings()
\ No newline at end of file
+class LazySettings:
+    """Settings loaded on first attribute access, so importing a module never reads .env or validates"""
+
+    def __init__(self):
+        object.__setattr__(self, "_settings", None)
+
+    @property
+    def loaded(self) -> bool:
+        return self._settings is not None
+
+    def load(self) -> Settings:
+        if self._settings is None:
+            object.__setattr__(self, "_settings", Settings.get_settings())
+        return self._settings
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.load(), name, value)
+
+settings = LazySettings()
\ No newline at end of file
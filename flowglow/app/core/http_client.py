@@ -0,0 +1,87 @@
+import asyncio
+import weakref
+from typing import Optional
+import httpx
+from .config import settings
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class HTTPClientPool:
+    """Application-scoped keep-alive httpx clients, one per event loop"""
+
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 timeout: float = 30.0,
+                 connect_timeout: float = 5.0,
+                 http2: bool = True):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and _http2_available()
+        self._clients = weakref.WeakKeyDictionary()
+
+    def client(self) -> httpx.AsyncClient:
+        """Return the shared client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2
+            )
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close every pooled client, including those owned by other running loops"""
+        current = asyncio.get_running_loop()
+        clients = list(self._clients.items())
+        self._clients = weakref.WeakKeyDictionary()
+
+        for loop, client in clients:
+            if client.is_closed:
+                continue
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running() and not loop.is_closed():
+                future = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                try:
+                    await asyncio.wait_for(asyncio.wrap_future(future), timeout=5)
+                except (asyncio.TimeoutError, RuntimeError):
+                    pass
+
+_pool: Optional[HTTPClientPool] = None
+
+def get_http_pool() -> HTTPClientPool:
+    """Get the application HTTP pool, configured from settings on first use"""
+    global _pool
+    if _pool is None:
+        _pool = HTTPClientPool(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            timeout=settings.HTTP_TIMEOUT,
+            connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+            http2=settings.HTTP2_ENABLED
+        )
+    return _pool
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shortcut for the pooled client of the running event loop"""
+    return get_http_pool().client()
+
+async def close_http_clients() -> None:
+    """Close pooled clients; call once when the application shuts down"""
+    if _pool is not None:
+        await _pool.aclose()
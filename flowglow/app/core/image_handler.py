@@ -1,50 +1,154 @@
-from typing import List, Optional
+import atexit
+from typing import Any, Dict, List, Optional
 import httpx
-from .models import ImageGenerationRequest, ImageResponse
+from .cache import ImageCache
+from .models import ContentRequest, ImageGenerationRequest, ImageResponse, Platform
 from .config import settings
+from .http_client import get_http_client
+from .image_store import ImageStore
+
+_image_cache: Optional[ImageCache] = None
+
+def get_image_cache() -> ImageCache:
+    """Get the image lookup cache shared by every handler in the process"""
+    global _image_cache
+    if _image_cache is None:
+        _image_cache = ImageCache(
+            max_entries=settings.IMAGE_CACHE_MAX_ENTRIES,
+            ttl=settings.IMAGE_CACHE_TTL,
+            path=settings.IMAGE_CACHE_PATH or None,
+            save_delay=settings.IMAGE_CACHE_SAVE_DELAY
+        )
+        atexit.register(_image_cache.flush)  # saves are batched, so the last ones land at exit
+    return _image_cache
+
+_image_store: Optional[ImageStore] = None
+
+def get_image_store() -> ImageStore:
+    """Get the local image store shared by every handler in the process"""
+    global _image_store
+    if _image_store is None:
+        _image_store = ImageStore(
+            settings.IMAGE_STORE_DIR,
+            max_bytes=settings.IMAGE_STORE_MAX_BYTES,
+            workers=settings.IMAGE_STORE_WORKERS,
+            quality=settings.IMAGE_STORE_QUALITY
+        )
+    return _image_store
 
 class ImageHandler:
     """Handler for image generation and retrieval"""
-    
-    def __init__(self):
-        self.api_base = "https://api.unsplash.com"
+
+    PLATFORM_ORIENTATIONS = {
+        Platform.BLOG: "landscape",
+        Platform.TWITTER: "landscape",
+        Platform.INSTAGRAM: "squarish",
+        Platform.LINKEDIN: "landscape"
+    }
+    QUERY_KEYWORDS = 3
+
+    def __init__(self, cache: Optional[ImageCache] = None, store: Optional[ImageStore] = None):
+        self.api_base = settings.UNSPLASH_API_URL.rstrip("/")
         self.headers = {
             "Authorization": f"Client-ID {settings.UNSPLASH_API_KEY}"
         }
-    
+        self.cache = cache or get_image_cache()
+        self._store = store
+
+    @classmethod
+    def query_for_request(cls, request: ContentRequest) -> str:
+        """Build an image search query from the request before any content is generated"""
+        terms = [request.topic]
+        if request.brand_voice:
+            terms.extend(request.brand_voice.get("keywords", [])[:cls.QUERY_KEYWORDS])
+        return " ".join(str(term).strip() for term in terms if term)
+
+    @classmethod
+    def orientation_for_platform(cls, platform: Optional[str]) -> str:
+        """Default photo orientation for the target platform"""
+        if platform is None:
+            return "landscape"
+        return cls.PLATFORM_ORIENTATIONS.get(Platform(platform), "landscape")
+
+    async def search(self,
+                     query: str,
+                     size: str = "regular",
+                     orientation: str = "landscape",
+                     count: int = 1) -> Dict[str, Any]:
+        """Search Unsplash, serving repeated queries from the shared cache"""
+        key = ImageCache.make_key(query, size, orientation)
+        cached = self.cache.get(key)
+        if cached is not None:
+            available = len(self._urls(cached))
+            if available >= count or available >= cached["total"]:
+                return cached
+
+        response = await get_http_client().get(
+            f"{self.api_base}/search/photos",
+            headers=self.headers,
+            params={
+                "query": query,
+                "per_page": max(count, settings.IMAGE_SEARCH_RESULTS),
+                "orientation": orientation
+            }
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        results = data["results"]
+        entry = {
+            "url": results[0]["urls"][size] if results else None,
+            "author": results[0]["user"]["name"] if results else None,
+            "alternates": [
+                {"url": img["urls"][size], "author": img["user"]["name"]}
+                for img in results[1:]
+            ],
+            "total": data["total"]
+        }
+        self.cache.set(key, entry)
+        return entry
+
     async def get_images(self, request: ImageGenerationRequest) -> ImageResponse:
         """Get images from Unsplash"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_base}/search/photos",
-                    headers=self.headers,
-                    params={
-                        "query": request.query,
-                        "per_page": request.count,
-                        "orientation": "landscape"
-                    }
-                )
-                
-                if response.status_code != 200:
-                    return ImageResponse(
-                        urls=[],
-                        error=f"API Error: {response.status_code}"
-                    )
-                
-                data = response.json()
-                urls = [img["urls"][request.size] for img in data["results"]]
-                
-                return ImageResponse(
-                    urls=urls,
-                    metadata={
-                        "total_results": data["total"],
-                        "query": request.query
-                    }
-                )
-                
+            entry = await self.search(
+                request.query,
+                size=request.size,
+                orientation=request.orientation,
+                count=request.count
+            )
+
+            return ImageResponse(
+                urls=self._urls(entry)[:request.count],
+                metadata={
+                    "total_results": entry["total"],
+                    "query": request.query,
+                    "author": entry["author"]
+                }
+            )
+
+        except httpx.HTTPStatusError as e:
+            return ImageResponse(
+                urls=[],
+                error=f"API Error: {e.response.status_code}"
+            )
         except Exception as e:
             return ImageResponse(
                 urls=[],
                 error=str(e)
-            )
\ No newline at end of file
+            )
+
+    async def localize(self, url: str, platform: Optional[str] = None) -> Optional[str]:
+        """Download the photo once and return a local, platform-sized copy"""
+        store = self._store or get_image_store()
+        try:
+            return await store.fetch(url, platform)
+        except Exception as e:
+            print(f"Error storing image: {str(e)}")
+            return None
+
+    @staticmethod
+    def _urls(entry: Dict[str, Any]) -> List[str]:
+        if not entry["url"]:
+            return []
+        return [entry["url"]] + [alt["url"] for alt in entry["alternates"]]
@@ -0,0 +1,219 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .http_client import get_http_client
+from .models import Platform
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; originals are served as downloaded
+    Image = None
+    ImageOps = None
+
+class ImageStore:
+    """Content-addressed on-disk store of downloaded photos and their platform variants"""
+
+    PLATFORM_SIZES: Dict[Platform, Tuple[int, int]] = {
+        Platform.BLOG: (1600, 900),
+        Platform.TWITTER: (1200, 675),
+        Platform.INSTAGRAM: (1080, 1080),
+        Platform.LINKEDIN: (1200, 627)
+    }
+
+    def __init__(self,
+                 root: str,
+                 max_bytes: int = 500 * 1024 * 1024,
+                 workers: int = 2,
+                 quality: int = 80):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._originals = self.root / "originals"
+        self._variants = self.root / "variants"
+        self._index_path = self.root / "index.json"
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flowglow-images")
+        self._index_lock = threading.Lock()
+        # Downloads by URL and renders by variant path, shared by every caller asking for them
+        self._pending: Dict[Any, "asyncio.Task[Path]"] = {}
+        self._index: Dict[str, str] = self._load_index()
+        # Stored files and their sizes, least recently used first; built from one scan on first use
+        self._usage_lock = threading.Lock()
+        self._usage: Optional["OrderedDict[Path, int]"] = None
+        self._total = 0
+
+    async def fetch(self, url: str, platform: Optional[str] = None) -> str:
+        """Return a local path for the image, downloading and resizing it only once"""
+        original = await self._original(url)
+        if platform is None or Image is None:
+            result = original
+        else:
+            platform = Platform(platform)
+            result = self._variants / platform.value / f"{original.stem}.webp"
+            if not result.exists():
+                size = self.PLATFORM_SIZES[platform]
+                await self._shared(result, lambda: self._variant(original, result, size))
+
+        await self._run(self._touch, result)
+        return str(result)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    async def _original(self, url: str) -> Path:
+        relative = self._index.get(url)
+        if relative and (self._originals / relative).exists():
+            return self._originals / relative
+
+        return await self._shared(url, lambda: self._download(url))
+
+    async def _shared(self, key: Any, start: Callable[[], Awaitable[Path]]) -> Path:
+        """Run one task per key for all concurrent callers
+
+        The task belongs to the store: each caller awaits it through a shield, so a
+        caller that is cancelled leaves without cancelling the work the others wait for.
+        """
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(start())
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Any, task: "asyncio.Task[Path]") -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone
+
+    async def _variant(self, original: Path, variant: Path, size: Tuple[int, int]) -> Path:
+        await self._run(self._render_variant, original, variant, size)
+        await self._run(self._stored, variant)
+        return variant
+
+    async def _download(self, url: str) -> Path:
+        response = await get_http_client().get(url, follow_redirects=True)
+        response.raise_for_status()
+
+        data = response.content
+        digest = hashlib.sha256(data).hexdigest()
+        content_type = response.headers.get("content-type", "").split(";")[0]
+        extension = mimetypes.guess_extension(content_type) or ".jpg"
+        relative = f"{digest[:2]}/{digest}{extension}"
+        path = self._originals / relative
+
+        if not path.exists():
+            await self._run(self._write_atomic, path, data)
+            await self._run(self._stored, path)
+        await self._run(self._remember, url, relative)
+        return path
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _render_variant(self, original: Path, variant: Path, size: Tuple[int, int]) -> None:
+        with Image.open(original) as img:
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            # Never upscale: shrink the target box to fit inside the source
+            scale = min(1.0, img.width / size[0], img.height / size[1])
+            target = (max(1, int(size[0] * scale)), max(1, int(size[1] * scale)))
+            resized = ImageOps.fit(img, target, method=Image.LANCZOS)
+
+        self._replace(variant, lambda file: resized.save(file, format="WEBP", quality=self.quality, method=4))
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        self._replace(path, lambda file: file.write(data))
+
+    def _replace(self, path: Path, write: Callable[[Any], Any]) -> None:
+        """Write through a temp file of its own next to path, then move it into place"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                write(file)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    def _touch(self, path: Path) -> None:
+        # The mtime carries the recency order across restarts
+        try:
+            path.touch()
+        except OSError:
+            pass
+        with self._usage_lock:
+            usage = self._load_usage()
+            if path in usage:
+                usage.move_to_end(path)
+
+    def _stored(self, path: Path) -> None:
+        """Account for a newly written file and evict if it pushed the store over its limit"""
+        with self._usage_lock:
+            usage = self._load_usage()
+            self._total -= usage.pop(path, 0)
+            try:
+                usage[path] = path.stat().st_size
+            except OSError:
+                return
+            self._total += usage[path]
+            if self._total > self.max_bytes:
+                self._evict(path)
+
+    def _load_usage(self) -> "OrderedDict[Path, int]":
+        if self._usage is None:
+            stats = [(p, p.stat()) for d in (self._originals, self._variants) if d.exists()
+                     for p in d.rglob("*") if p.is_file()]
+            stats.sort(key=lambda item: item[1].st_mtime)
+            self._usage = OrderedDict((p, st.st_size) for p, st in stats)
+            self._total = sum(self._usage.values())
+        return self._usage
+
+    def _evict(self, keep: Path) -> None:
+        """Delete least recently used files, except the one being served, until the store fits"""
+        removed = set()
+        for path, size in list(self._usage.items()):
+            if self._total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            del self._usage[path]
+            self._total -= size
+            removed.add(path)
+
+        if any(path.is_relative_to(self._originals) for path in removed):
+            with self._index_lock:
+                self._index = {
+                    url: rel for url, rel in self._index.items()
+                    if self._originals / rel not in removed
+                }
+                self._save_index()
+
+    def _remember(self, url: str, relative: str) -> None:
+        with self._index_lock:
+            self._index[url] = relative
+            self._save_index()
+
+    def _load_index(self) -> Dict[str, str]:
+        try:
+            return json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        self._write_atomic(self._index_path, json.dumps(self._index).encode("utf-8"))
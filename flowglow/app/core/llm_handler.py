@@ -1,73 +1,108 @@
-from langchain_community.llms.ollama import Ollama
-from groq import Groq
-import httpx
-from typing import Optional, Dict, Any, Tuple
+import asyncio
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Optional, Dict, Any, List, Tuple
+from .cache import ResponseCache
+from .coalescing import SingleFlight
 from .config import settings
-from .models import LLMResponse, ModelProvider
+from .image_handler import ImageHandler
+from .models import (
+    ContentRequest, ContentResponse, GenerationProfile, LLMResponse, ModelProvider, Platform, RequestPriority
+)
+from .profiles import generation_profile, resolve_profile
+from .prompts import ContentPromptManager
+from .registry import create_provider
+from .scheduler import GenerationScheduler, SchedulerRejected, get_scheduler, request_priority
+from ..utils.metrics import get_metrics, metric_labels
+from ..utils.validators import StreamingValidator
 from datetime import datetime
 import re
 
+class StreamCleaner:
+    """Incremental counterpart of LLMHandler._process_response for streamed chunks"""
+
+    MARKER = "Assistant:"
+    MAX_TAG_LENGTH = 200
+
+    def __init__(self):
+        self._raw: List[str] = []
+        self._pending = ""
+        self._clean = ""
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the cleaned text generated so far"""
+        self._raw.append(chunk)
+        text = self._pending + chunk
+
+        # Hold back a possibly unfinished tag until its closing bracket arrives
+        cut = len(text)
+        tag_start = text.rfind("<")
+        if tag_start != -1 and ">" not in text[tag_start:] and cut - tag_start < self.MAX_TAG_LENGTH:
+            cut = tag_start
+        self._pending = text[cut:]
+
+        start = max(0, len(self._clean) - len(self.MARKER))
+        self._clean += re.sub(r'<[^>]+>', '', text[:cut])
+        marker = self._clean.rfind(self.MARKER, start)
+        if marker != -1:
+            self._clean = self._clean[marker + len(self.MARKER):]
+
+        return self._clean.strip()
+
+    @property
+    def raw(self) -> str:
+        return "".join(self._raw)
+
+
 class LLMHandler:
-    def __init__(self, provider="ollama"):
+    IMAGE_QUERY_WORDS = 5
+
+    def __init__(self, provider="ollama", scheduler: Optional[GenerationScheduler] = None):
         self.provider = provider
+        self.scheduler = scheduler or get_scheduler()
         self.model = self._initialize_model()
-        self.unsplash_api_url = "https://api.unsplash.com/search/photos"
-        self.unsplash_headers = {
-            "Authorization": f"Client-ID {settings.UNSPLASH_API_KEY}"
-        }
-        self.image_cache = {}
+        self.image_handler = ImageHandler()
+        self.response_cache = self._initialize_cache()
+        self.flights = SingleFlight()
+        self.cancellations = {"requests": 0, "images": 0, "rejected": 0}
+        self.metrics = get_metrics()
 
     def _initialize_model(self):
-        providers = {
-            "ollama": self._init_ollama,
-            "groq": self._init_groq
-        }
-        return providers[self.provider]()
+        return create_provider(self.provider, self.scheduler)
 
-    def _init_ollama(self):
-        return Ollama(
-            base_url=settings.OLLAMA_HOST,
-            model=settings.OLLAMA_MODEL
+    def _initialize_cache(self) -> Optional[ResponseCache]:
+        if not settings.ENABLE_CACHE:
+            return None
+        return ResponseCache(
+            settings.CACHE_PATH,
+            ttl=settings.CACHE_TTL,
+            max_entries=settings.CACHE_MAX_ENTRIES
         )
-    
-    def _init_groq(self):
-        return Groq(
-            api_key=settings.GROQ_API_KEY,
-            model=settings.MODEL_NAME
+
+    def _model_name(self) -> str:
+        return self.model.model_name
+
+    def _cache_key(self, prompt: str, profile: Optional[GenerationProfile] = None) -> str:
+        return ResponseCache.make_key(
+            self.provider,
+            self._model_name(),
+            (profile or resolve_profile()).model_dump(exclude_none=True),
+            prompt
         )
 
     async def get_image(self, 
                        query: str, 
                        size: str = "regular", 
-                       orientation: str = "landscape") -> Optional[str]:
-        """Get relevant image from Unsplash"""
-        cache_key = f"{query}_{size}_{orientation}"
-        
-        if cache_key in self.image_cache:
-            return self.image_cache[cache_key]["url"]
-
+                       orientation: str = "landscape",
+                       platform: Optional[str] = None) -> Optional[str]:
+        """Get relevant image from Unsplash, as a local file when the image store is enabled"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.unsplash_api_url,
-                    headers=self.unsplash_headers,
-                    params={
-                        "query": query,
-                        "per_page": 1,
-                        "orientation": orientation
-                    }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data["results"]:
-                        image_url = data["results"][0]["urls"][size]
-                        self.image_cache[cache_key] = {
-                            "url": image_url,
-                            "author": data["results"][0]["user"]["name"]
-                        }
-                        return image_url
-                return None
+            with self.metrics.span("image_lookup", platform=self._label(platform)):
+                entry = await self.image_handler.search(query, size=size, orientation=orientation)
+                url = entry["url"]
+                if url and settings.IMAGE_STORE_ENABLED:
+                    return await self.image_handler.localize(url, platform) or url
+                return url
         except Exception as e:
             print(f"Error fetching image: {str(e)}")
             return None
@@ -75,33 +110,353 @@ class LLMHandler:
     async def generate(self, 
                       prompt: str, 
                       include_image: bool = False,
-                      image_params: Optional[Dict[str, str]] = None) -> Tuple[str, Optional[str]]:
+                      image_params: Optional[Dict[str, str]] = None,
+                      request: Optional[ContentRequest] = None,
+                      priority: RequestPriority = RequestPriority.INTERACTIVE,
+                      validator: Optional[StreamingValidator] = None,
+                      profile: Optional[GenerationProfile] = None,
+                      raise_errors: bool = False) -> Tuple[str, Optional[str]]:
+        """Generate the full content; a validator stops generation at its first issue
+
+        The request's platform profile sets the generation parameters; profile overrides them.
+        A full backend queue raises SchedulerRejected, so callers can offer its retry-after.
+        Other failures come back as an "Error: ..." content unless raise_errors is set.
+        """
+        image_task = self._start_request_image_lookup(request, image_params) if include_image else None
+        labels = self._metric_labels(request)
         try:
-            if self.provider == "ollama":
-                response = await self.model.agenerate([prompt])
-                content = response.generations[0][0].text
-            else:
-                response = await self.model.generate(prompt)
-                content = response
+            profile = resolve_profile(request, profile)
+            cache_key = self._cache_key(prompt, profile)
+            processed_content = self.response_cache.get(cache_key) if self.response_cache else None
 
-            processed_content = self._process_response(content)
+            if processed_content is None:
+                with self.metrics.span("generation", **labels):
+                    content = await self._collect(cache_key, prompt, priority, labels, validator, profile)
+                if validator and validator.issue:
+                    return self._rejected(validator), None
+                with self.metrics.span("post_processing", **labels):
+                    processed_content = self._process_response(content)
+                if self.response_cache:
+                    self.response_cache.set(cache_key, processed_content)
+            elif validator and (validator.update(processed_content) or validator.finish()):
+                return self._rejected(validator), None
             
             image_url = None
             if include_image:
-                keywords = " ".join(processed_content.split()[:5])
-                image_params = image_params or {}
-                image_url = await self.get_image(
-                    query=keywords,
-                    size=image_params.get("size", "regular"),
-                    orientation=image_params.get("orientation", "landscape")
-                )
+                if image_task is None:
+                    image_task = self._start_image_lookup(
+                        self._image_query_from_text(processed_content), image_params
+                    )
+                image_url = await image_task
             
             return processed_content, image_url
             
+        except asyncio.CancelledError:
+            self.cancellations["requests"] += 1
+            raise
+        except SchedulerRejected:
+            raise
         except ConnectionError as e:
+            if raise_errors:
+                raise
             return f"Connection Error: {str(e)}", None
         except Exception as e:
+            if raise_errors:
+                raise
             return f"Error: {str(e)}", None
+        finally:
+            self._cancel_image_lookup(image_task)
+
+    async def stream(self,
+                     prompt: str,
+                     include_image: bool = False,
+                     image_params: Optional[Dict[str, str]] = None,
+                     request: Optional[ContentRequest] = None,
+                     priority: RequestPriority = RequestPriority.INTERACTIVE,
+                     validator: Optional[StreamingValidator] = None,
+                     profile: Optional[GenerationProfile] = None,
+                     raise_errors: bool = False) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """Yield the cleaned content as it is generated, then the final content and image
+
+        With a validator the model stream is stopped at the first issue and the last
+        item carries the rejection message; the structured reason is left on validator.issue.
+        A full backend queue raises SchedulerRejected, so callers can offer its retry-after.
+        Other failures end the stream with an "Error: ..." item unless raise_errors is set.
+        """
+        content = ""
+        image_task = self._start_request_image_lookup(request, image_params) if include_image else None
+        labels = self._metric_labels(request)
+        started = time.perf_counter()
+        try:
+            profile = resolve_profile(request, profile)
+            cache_key = self._cache_key(prompt, profile)
+            cached = self.response_cache.get(cache_key) if self.response_cache else None
+
+            if cached is not None:
+                if validator and (validator.update(cached) or validator.finish()):
+                    yield self._rejected(validator), None
+                    return
+                content = cached
+            else:
+                cleaner = StreamCleaner()
+                first_chunk_at = None
+                chunk_count = 0
+                # Closing the subscription as soon as the consumer goes away lets the flight cancel the model call
+                chunks = self.flights.stream(
+                    f"stream:{cache_key}", lambda: self._stream_model(prompt, priority, labels, profile)
+                )
+                async with aclosing(chunks):
+                    async for chunk in chunks:
+                        chunk_count += 1
+                        if first_chunk_at is None:
+                            first_chunk_at = time.perf_counter()
+                            self.metrics.observe_stage("ttft", first_chunk_at - started, **labels)
+                        partial = cleaner.feed(chunk)
+                        if validator and validator.update(partial):
+                            break
+                        if include_image and image_task is None:
+                            # Start the lookup as soon as the opening words are known
+                            query = self._image_query_from_text(partial)
+                            if len(query.split()) >= self.IMAGE_QUERY_WORDS:
+                                image_task = self._start_image_lookup(query, image_params)
+                        if partial:
+                            yield partial, None
+                    else:
+                        if validator:
+                            validator.finish()
+
+                self._observe_generation(started, first_chunk_at, chunk_count, labels)
+                if validator and validator.issue:
+                    yield self._rejected(validator), None
+                    return
+                with self.metrics.span("post_processing", **labels):
+                    content = self._process_response(cleaner.raw)
+                if self.response_cache:
+                    self.response_cache.set(cache_key, content)
+
+            image_url = None
+            if include_image:
+                if image_task is None:
+                    image_task = self._start_image_lookup(
+                        self._image_query_from_text(content), image_params
+                    )
+                image_url = await image_task
+
+            yield content, image_url
+
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancellations["requests"] += 1
+            raise
+        except SchedulerRejected:
+            raise
+        except ConnectionError as e:
+            if raise_errors:
+                raise
+            yield f"Connection Error: {str(e)}", None
+        except Exception as e:
+            if raise_errors:
+                raise
+            yield f"Error: {str(e)}", None
+        finally:
+            self._cancel_image_lookup(image_task)
+
+    async def _collect(self,
+                       cache_key: str,
+                       prompt: str,
+                       priority: RequestPriority,
+                       labels: Dict[str, str],
+                       validator: Optional[StreamingValidator] = None,
+                       profile: Optional[GenerationProfile] = None) -> str:
+        """Raw completion text; validated generations are streamed so they can be stopped early"""
+        # Flights are keyed by how they produce chunks too, so a streaming caller never joins a one-chunk completion
+        if validator is None:
+            key, factory = f"complete:{cache_key}", lambda: self._complete(prompt, priority, labels, profile)
+        else:
+            key, factory = f"stream:{cache_key}", lambda: self._stream_model(prompt, priority, labels, profile)
+
+        raw = []
+        cleaner = StreamCleaner() if validator else None
+        async with aclosing(self.flights.stream(key, factory)) as chunks:
+            async for chunk in chunks:
+                raw.append(chunk)
+                if cleaner and validator.update(cleaner.feed(chunk)):
+                    break
+            else:
+                if validator:
+                    validator.finish()
+        return "".join(raw)
+
+    def _rejected(self, validator: StreamingValidator) -> str:
+        self.cancellations["rejected"] += 1
+        return f"Content rejected: {validator.issue.message}"
+
+    async def _stream_model(self,
+                            prompt: str,
+                            priority: RequestPriority = RequestPriority.INTERACTIVE,
+                            labels: Optional[Dict[str, str]] = None,
+                            profile: Optional[GenerationProfile] = None) -> AsyncIterator[str]:
+        # Runs inside the flight's own task, so priority, labels and profile reach every provider call it makes
+        request_priority.set(priority)
+        metric_labels.set(labels or {})
+        generation_profile.set(profile)
+        async with aclosing(self.model.stream(prompt)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def _complete(self,
+                        prompt: str,
+                        priority: RequestPriority = RequestPriority.INTERACTIVE,
+                        labels: Optional[Dict[str, str]] = None,
+                        profile: Optional[GenerationProfile] = None) -> AsyncIterator[str]:
+        """Non-streaming completion shaped as a one-chunk stream so it can be coalesced"""
+        request_priority.set(priority)
+        metric_labels.set(labels or {})
+        generation_profile.set(profile)
+        yield await self.model.generate(prompt)
+
+    def _metric_labels(self, request: Optional[ContentRequest] = None) -> Dict[str, str]:
+        return {
+            "provider": self.provider,
+            "platform": self._label(request.platform if request else None)
+        }
+
+    @staticmethod
+    def _label(platform: Optional[str]) -> str:
+        return Platform(platform).value if platform else "unknown"
+
+    def _observe_generation(self,
+                            started: float,
+                            first_chunk_at: Optional[float],
+                            chunk_count: int,
+                            labels: Dict[str, str]) -> None:
+        finished = time.perf_counter()
+        self.metrics.observe_stage("generation", finished - started, **labels)
+        if first_chunk_at is not None and chunk_count > 1 and finished > first_chunk_at:
+            self.metrics.observe("tokens_per_second", (chunk_count - 1) / (finished - first_chunk_at), **labels)
+
+    async def generate_campaign(self,
+                                request: ContentRequest,
+                                platforms: Optional[List[Platform]] = None,
+                                include_image: bool = False,
+                                image_params: Optional[Dict[str, str]] = None,
+                                concurrency: Optional[int] = None,
+                                priority: RequestPriority = RequestPriority.INTERACTIVE) -> Dict[Platform, ContentResponse]:
+        """Generate one content variant per platform concurrently, sharing a single image lookup"""
+        platforms = [Platform(p) for p in (platforms or list(Platform))]
+        semaphore = asyncio.Semaphore(concurrency or settings.CAMPAIGN_CONCURRENCY)
+        started = time.perf_counter()
+
+        image_task = None
+        if include_image:
+            image_task = asyncio.create_task(
+                self._campaign_images(request, platforms, image_params)
+            )
+
+        async def generate_variant(platform: Platform) -> ContentResponse:
+            variant_request = request.model_copy(update={"platform": platform})
+            with self.metrics.span("prompt_build", platform=platform.value):
+                prompt = ContentPromptManager.get_prompt(variant_request)
+            validator = StreamingValidator(platform) if settings.STREAM_VALIDATION else None
+            rejected = None
+            async with semaphore:
+                variant_started = time.perf_counter()
+                try:
+                    content, _ = await self.generate(
+                        prompt, request=variant_request, priority=priority, validator=validator
+                    )
+                except SchedulerRejected as e:
+                    content, rejected = "", e
+                finished = time.perf_counter()
+            return ContentResponse(
+                content=content,
+                platform=platform,
+                metadata={
+                    "provider": self.provider,
+                    "validation": validator.issue.model_dump(mode="json") if validator and validator.issue else None,
+                    "retry_after": rejected.retry_after if rejected else None,
+                    "timings": {
+                        "queued": variant_started - started,
+                        "generation": finished - variant_started
+                    }
+                }
+            )
+
+        try:
+            variants = await asyncio.gather(*(generate_variant(p) for p in platforms))
+            images = await image_task if image_task else {}
+        finally:
+            self._cancel_image_lookup(image_task)
+
+        campaign_time = time.perf_counter() - started
+        for variant in variants:
+            variant.metadata["image_url"] = images.get(variant.platform)
+            variant.metadata["timings"]["campaign"] = campaign_time
+        return {variant.platform: variant for variant in variants}
+
+    async def _campaign_images(self,
+                               request: ContentRequest,
+                               platforms: List[Platform],
+                               image_params: Optional[Dict[str, str]] = None) -> Dict[Platform, Optional[str]]:
+        """Look up one photo for the whole campaign and prepare a sized copy per platform"""
+        image_params = image_params or {}
+        try:
+            entry = await self.image_handler.search(
+                ImageHandler.query_for_request(request),
+                size=image_params.get("size", "regular"),
+                orientation=image_params.get("orientation", "landscape")
+            )
+        except Exception as e:
+            print(f"Error fetching image: {str(e)}")
+            return {}
+
+        url = entry["url"]
+        if not url or not settings.IMAGE_STORE_ENABLED:
+            return {platform: url for platform in platforms}
+        paths = await asyncio.gather(*(self.image_handler.localize(url, p) for p in platforms))
+        return {platform: path or url for platform, path in zip(platforms, paths)}
+
+    def _start_image_lookup(self,
+                            query: str,
+                            image_params: Optional[Dict[str, str]] = None,
+                            platform: Optional[str] = None) -> "asyncio.Task[Optional[str]]":
+        image_params = image_params or {}
+        orientation = image_params.get("orientation") or ImageHandler.orientation_for_platform(platform)
+        return asyncio.create_task(self.get_image(
+            query=query,
+            size=image_params.get("size", "regular"),
+            orientation=orientation,
+            platform=platform
+        ))
+
+    def _cancel_image_lookup(self, image_task: Optional[asyncio.Task]) -> None:
+        if image_task and not image_task.done():
+            image_task.cancel()
+            self.cancellations["images"] += 1
+
+    def cancellation_stats(self) -> Dict[str, int]:
+        """Requests abandoned by their caller, image lookups and model calls stopped because of it"""
+        return {**self.cancellations, "generations": self.flights.stats["cancelled"]}
+
+    def _start_request_image_lookup(self,
+                                    request: Optional[ContentRequest],
+                                    image_params: Optional[Dict[str, str]] = None) -> Optional["asyncio.Task[Optional[str]]"]:
+        """Start the image search up front when the query can be derived from the request"""
+        if request is None or not settings.IMAGE_QUERY_FROM_REQUEST:
+            return None
+        return self._start_image_lookup(
+            ImageHandler.query_for_request(request), image_params, platform=request.platform
+        )
+
+    def _image_query_from_text(self, content: str) -> str:
+        """Pick the first meaningful words of generated text, skipping labels such as 'Title:'"""
+        words = []
+        for word in content.split():
+            if word.endswith(":") or not re.search(r"[^\W\d_]", word):
+                continue
+            words.append(word.strip("#*_\"'.,!?()[]"))
+            if len(words) == self.IMAGE_QUERY_WORDS:
+                break
+        return " ".join(w for w in words if w)
 
     def _process_response(self, response: str) -> str:
         if not isinstance(response, str):
@@ -116,18 +471,25 @@ class LLMHandler:
     async def generate_with_metadata(self, 
                                    prompt: str, 
                                    include_image: bool = False,
-                                   image_params: Optional[Dict[str, str]] = None) -> LLMResponse:
+                                   image_params: Optional[Dict[str, str]] = None,
+                                   validator: Optional[StreamingValidator] = None) -> LLMResponse:
         try:
-            content, image_url = await self.generate(prompt, include_image, image_params)
+            content, image_url = await self.generate(prompt, include_image, image_params, validator=validator)
+            issue = validator.issue if validator else None
             return LLMResponse(
                 raw_response=content,
-                processed_content=content,
+                processed_content=None if issue else content,
                 image_url=image_url,
+                error=issue.message if issue else None,
                 metadata={
+                    "validation": issue.model_dump(mode="json") if issue else None,
                     "provider": self.provider,
-                    "model": self.model.model_name if hasattr(self.model, 'model_name') else settings.MODEL_NAME,
+                    "model": self._model_name(),
                     "timestamp": datetime.utcnow().isoformat(),
-                    "has_image": bool(image_url)
+                    "has_image": bool(image_url),
+                    "cache": self.response_cache.stats() if self.response_cache else None,
+                    "scheduler": self.scheduler.snapshot(),
+                    "cancellations": self.cancellation_stats()
                 }
             )
         except Exception as e:
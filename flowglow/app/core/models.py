@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from enum import Enum
 from datetime import datetime
 
@@ -17,6 +17,12 @@ class ContentType(str, Enum):
 class ModelProvider(str, Enum):
     OLLAMA = "ollama"
     GROQ = "groq"
+    AUTO = "auto"
+    REPLAY = "replay"
+
+class RequestPriority(str, Enum):
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
 
 class LLMConfig(BaseModel):
     model_name: str
@@ -48,6 +54,22 @@ class ImageParams(BaseModel):
     orientation: str = Field(default="landscape", description="Image orientation")
 
 
+class GenerationProfile(BaseModel):
+    """Generation parameters sent to the provider; unset fields keep the provider's defaults"""
+    max_tokens: Optional[int] = Field(default=None, ge=1, description="Token budget (Ollama num_predict)")
+    temperature: Optional[float] = Field(default=None, ge=0)
+    top_p: Optional[float] = Field(default=None, gt=0, le=1)
+    stop: Optional[List[str]] = None
+    num_ctx: Optional[int] = Field(default=None, ge=1, description="Ollama context window")
+
+    def merged(self, overrides: Optional[Union["GenerationProfile", Dict[str, Any]]]) -> "GenerationProfile":
+        """This profile with the fields set in overrides replaced"""
+        if not overrides:
+            return self
+        if isinstance(overrides, GenerationProfile):
+            overrides = overrides.model_dump(exclude_none=True)
+        return GenerationProfile(**{**self.model_dump(), **overrides})
+
 class ContentRequest(BaseModel):
     topic: str = Field(..., description="Main topic for content generation")
     platform: Platform = Field(..., description="Target platform")
@@ -57,6 +79,7 @@ class ContentRequest(BaseModel):
     content_type: ContentType = Field(default=ContentType.TEXT)
     brand_voice: Optional[Dict[str, Any]] = None
     image_params: Optional[ImageParams] = None
+    generation: Optional[GenerationProfile] = Field(default=None, description="Overrides of the platform profile")
     
     class Config:
         use_enum_values = True
@@ -67,6 +90,14 @@ class ContentResponse(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     generated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class ValidationIssue(BaseModel):
+    code: str = Field(..., description="length_exceeded, thread_too_long or prohibited_content")
+    message: str
+    platform: Platform
+    position: int = Field(..., description="Character offset in the cleaned content where the issue starts")
+    limit: Optional[int] = None
+    match: Optional[str] = None
+
 class LLMResponse(BaseModel):
     raw_response: str
     processed_content: Optional[str] = None
@@ -78,6 +109,7 @@ class ImageGenerationRequest(BaseModel):
     query: str
     style: Optional[str] = None
     size: str = "regular"
+    orientation: str = "landscape"
     count: int = 1
 
 class ImageResponse(BaseModel):
@@ -0,0 +1,39 @@
+import contextvars
+import math
+from typing import Any, Dict, Optional, Union
+from .config import settings
+from .models import ContentRequest, GenerationProfile, Platform
+from ..utils.validators import ContentValidator
+
+# Profile of the generation running in the current task; providers build their request options from it
+generation_profile: contextvars.ContextVar[Optional[GenerationProfile]] = contextvars.ContextVar(
+    "generation_profile", default=None
+)
+
+def default_profile() -> GenerationProfile:
+    return GenerationProfile(
+        max_tokens=settings.MAX_TOKENS,
+        temperature=settings.TEMPERATURE,
+        top_p=settings.TOP_P,
+        stop=list(settings.GENERATION_STOP) or None,
+        num_ctx=settings.OLLAMA_NUM_CTX
+    )
+
+def platform_profile(platform: Union[Platform, str]) -> GenerationProfile:
+    """Default profile with a token budget sized to what the platform can publish"""
+    platform = Platform(platform)
+    profile = default_profile()
+    limit = ContentValidator.PLATFORM_LIMITS.get(platform)
+    if limit and platform == Platform.TWITTER:
+        limit *= settings.TWITTER_MAX_THREAD_TWEETS  # the prompt asks for a thread, limited per tweet
+    if limit:
+        budget = math.ceil(limit / settings.GENERATION_CHARS_PER_TOKEN * settings.GENERATION_TOKEN_HEADROOM)
+        profile = profile.merged({"max_tokens": min(budget, settings.GENERATION_MAX_TOKENS)})
+    return profile.merged(settings.GENERATION_PROFILES.get(platform.value))
+
+def resolve_profile(request: Optional[ContentRequest] = None,
+                    overrides: Optional[Union[GenerationProfile, Dict[str, Any]]] = None) -> GenerationProfile:
+    """Platform profile, then the request's own overrides, then the caller's"""
+    if request is None:
+        return default_profile().merged(overrides)
+    return platform_profile(request.platform).merged(request.generation).merged(overrides)
@@ -1,121 +1,199 @@
 # app/core/prompts.py
-from typing import Dict, Optional
+import hashlib
+import json
+import re
+import textwrap
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from .models import Platform, ContentRequest
 
 class PromptTemplate:
+    """Prompt template compiled once into a static prefix and a formattable suffix"""
+
     def __init__(self, template: str):
-        self.template = template
-    
+        self.template = self._normalize(template)
+        self.prefix, self.suffix = self._split(self.template)
+
     def format(self, **kwargs) -> str:
-        return self.template.format(**kwargs)
+        return self.prefix + self.format_suffix(**kwargs)
+
+    def format_suffix(self, **kwargs) -> str:
+        return self.suffix.format_map(kwargs)
+
+    @staticmethod
+    def _normalize(template: str) -> str:
+        text = textwrap.dedent(template).strip()
+        text = "\n".join(line.rstrip() for line in text.splitlines())
+        return re.sub(r"\n{3,}", "\n\n", text)
+
+    @staticmethod
+    def _split(template: str) -> Tuple[str, str]:
+        """Split at the line holding the first placeholder so the prefix never changes"""
+        match = re.search(r"(?<!\{)\{(?!\{)", template)
+        if not match:
+            return template.replace("{{", "{").replace("}}", "}"), ""
+        line_start = template.rfind("\n", 0, match.start()) + 1
+        prefix = template[:line_start].replace("{{", "{").replace("}}", "}")
+        return prefix, template[line_start:]
 
 class ContentPromptManager:
     PLATFORM_PROMPTS = {
         Platform.BLOG: PromptTemplate("""
-        Generate a professional blog post about {topic} for {audience}.
-        Tone: {tone}
-        
+        You are writing a professional blog post.
+
         Structure:
         1. SEO-optimized title
         2. Engaging introduction with hook
         3. 3-4 main points with subheadings
         4. Actionable conclusion
         5. Meta description
-        
+
         Guidelines:
         - Include statistics and data when relevant
-        - Use {tone} language throughout
+        - Use the requested tone throughout
         - Implement proper keyword density
         - Add internal linking suggestions
         - Include meta descriptions and tags
-        
+
+        Generate a professional blog post about {topic} for {audience}.
+        Tone: {tone}
+
         Additional context: {context}
         """),
-        
+
         Platform.TWITTER: PromptTemplate("""
-        Create a Twitter thread about {topic} for {audience}.
-        Tone: {tone}
-        
+        You are writing a Twitter thread.
+
         Thread structure:
         1. Hook tweet (Tweet 1/N)
         2. Key points (2-5 tweets)
         3. Conclusion with CTA
-        
+
         Guidelines:
         - Each tweet under 280 characters
         - Use engaging hooks
         - Include 2-3 relevant hashtags
         - Break complex ideas across tweets
         - End with clear call-to-action
-        
+
+        Create a Twitter thread about {topic} for {audience}.
+        Tone: {tone}
+
         Additional context: {context}
         """),
-        
+
         Platform.INSTAGRAM: PromptTemplate("""
-        Create an Instagram post about {topic} for {audience}.
-        Tone: {tone}
-        
+        You are writing an Instagram post.
+
         Required elements:
         1. Attention-grabbing first line
         2. Main content (max 2200 characters)
         3. Strategic line breaks
         4. Hashtag set (20-25 tags)
-        
+
         Guidelines:
         - Start with hook before line break
         - Use emojis strategically
         - Include bullet points for readability
         - End with engagement question
         - Separate hashtags from main content
-        
+
+        Create an Instagram post about {topic} for {audience}.
+        Tone: {tone}
+
         Additional context: {context}
         """),
-        
+
         Platform.LINKEDIN: PromptTemplate("""
-        Create a LinkedIn post about {topic} for {audience}.
-        Tone: {tone}
-        
+        You are writing a LinkedIn post.
+
         Structure:
         1. Professional hook
         2. Industry insight/expertise
         3. Data-backed statements
         4. Professional experience tie-in
         5. Business-focused CTA
-        
+
         Guidelines:
         - Keep under 3000 characters
         - Use professional language
         - Include industry-specific terms
         - Mention relevant trends
         - Add 3-5 professional hashtags
-        
+
+        Create a LinkedIn post about {topic} for {audience}.
+        Tone: {tone}
+
         Additional context: {context}
         """)
     }
-    
+
+    BRAND_CONTEXT_CACHE_SIZE = 1024
+    _brand_context_cache: Dict[str, str] = {}
+
     @classmethod
     def get_prompt(cls, request: ContentRequest) -> str:
+        prefix, suffix = cls.get_prompt_parts(request)
+        return prefix + suffix
+
+    @classmethod
+    def get_prompt_parts(cls, request: ContentRequest, context: Optional[str] = None) -> Tuple[str, str]:
+        """Return the static instruction prefix and the request-specific suffix"""
         template = cls.PLATFORM_PROMPTS.get(request.platform)
         if not template:
             raise ValueError(f"No template found for platform: {request.platform}")
-        
-        return template.format(
+
+        return template.prefix, template.format_suffix(
             topic=request.topic,
             audience=request.audience,
             tone=request.tone,
-            context=cls._get_additional_context(request)
+            context=cls._get_additional_context(request) if context is None else context
         )
-    
+
+    @classmethod
+    def get_prompts(cls, requests: Iterable[ContentRequest]) -> List[str]:
+        """Build prompts for many requests, rendering each distinct brand voice once"""
+        prompts = []
+        contexts: Dict[int, Tuple[Any, str]] = {}
+        for request in requests:
+            brand_voice = request.brand_voice
+            cached = contexts.get(id(brand_voice))
+            if cached is None or cached[0] is not brand_voice:
+                cached = (brand_voice, cls._get_additional_context(request))
+                contexts[id(brand_voice)] = cached
+            prefix, suffix = cls.get_prompt_parts(request, context=cached[1])
+            prompts.append(prefix + suffix)
+        return prompts
+
+    @classmethod
+    def _get_additional_context(cls, request: ContentRequest) -> str:
+        if not request.brand_voice:
+            return ""
+
+        key = cls._brand_voice_key(request.brand_voice)
+        context = cls._brand_context_cache.get(key)
+        if context is None:
+            if len(cls._brand_context_cache) >= cls.BRAND_CONTEXT_CACHE_SIZE:
+                cls._brand_context_cache.clear()
+            context = cls._render_brand_voice(request.brand_voice)
+            cls._brand_context_cache[key] = context
+        return context
+
+    @staticmethod
+    def _brand_voice_key(brand_voice: Dict[str, Any]) -> str:
+        """Stable hash of a brand voice, independent of key order"""
+        canonical = json.dumps(brand_voice, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
     @staticmethod
-    def _get_additional_context(request: ContentRequest) -> str:
-        context = ""
-        if request.brand_voice:
-            context += f"\nBrand Voice Guidelines:\n"
-            context += f"Company: {request.brand_voice.get('company_name')}\n"
-            context += f"Tone: {request.brand_voice.get('tone')}\n"
-            context += f"Values: {', '.join(request.brand_voice.get('values', []))}\n"
-            context += f"Keywords: {', '.join(request.brand_voice.get('keywords', []))}"
-            
-            if request.brand_voice.get('style_guide'):
-                context += f"\nStyle Guide: {request.brand_voice['style_guide']}"
-        return context
\ No newline at end of file
+    def _render_brand_voice(brand_voice: Dict[str, Any]) -> str:
+        lines = [
+            "",
+            "Brand Voice Guidelines:",
+            f"Company: {brand_voice.get('company_name')}",
+            f"Tone: {brand_voice.get('tone')}",
+            f"Values: {', '.join(brand_voice.get('values', []))}",
+            f"Keywords: {', '.join(brand_voice.get('keywords', []))}"
+        ]
+        if brand_voice.get('style_guide'):
+            lines.append(f"Style Guide: {brand_voice['style_guide']}")
+        return "\n".join(lines)
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import random
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Optional
+import httpx
+from .cassette import Cassette, CassetteMiss
+from .http_client import get_http_client
+from .profiles import generation_profile
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+GROQ_NAMES = ("AsyncGroq", "APIConnectionError", "APIStatusError")
+
+def _groq():
+    """The Groq SDK, imported on first use so Ollama-only deployments never pay for it"""
+    import groq
+    return groq
+
+def __getattr__(name: str) -> Any:
+    if name in GROQ_NAMES:
+        return getattr(_groq(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class OllamaProvider:
+    """Local Ollama provider over the streaming REST endpoint"""
+
+    def __init__(self, host: str, model: str, timeout: float = 30.0, keep_alive: Optional[str] = None):
+        self.host = host
+        self.model_name = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+
+    async def generate(self, prompt: str) -> str:
+        """Return the full completion for a prompt"""
+        # Reading the stream keeps the call cancellable: closing the connection stops Ollama generating
+        async with aclosing(self.stream(prompt)) as tokens:
+            return "".join([token async for token in tokens])
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield completion tokens from Ollama's streaming generate endpoint"""
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": True
+        }
+        if self.keep_alive is not None:
+            # Every request resets Ollama's unload timer, so it has to carry ours
+            payload["keep_alive"] = self.keep_alive
+        options = self._options()
+        if options:
+            payload["options"] = options
+        async with get_http_client().stream(
+            "POST",
+            f"{self.host}/api/generate",
+            json=payload,
+            timeout=httpx.Timeout(self.timeout, read=None)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(data["error"])
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    @staticmethod
+    def _options() -> dict:
+        profile = generation_profile.get()
+        if profile is None:
+            return {}
+        options = {
+            "num_predict": profile.max_tokens,
+            "temperature": profile.temperature,
+            "top_p": profile.top_p,
+            "stop": profile.stop or None,
+            "num_ctx": profile.num_ctx
+        }
+        return {name: value for name, value in options.items() if value is not None}
+
+class GroqProvider:
+    """Async Groq chat-completions provider with rate-limit aware retries"""
+
+    def __init__(self,
+                 api_key: str,
+                 model: str,
+                 max_tokens: int = 1000,
+                 temperature: float = 0.7,
+                 top_p: float = 0.9,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 20.0):
+        self.api_key = api_key
+        self.model_name = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.top_p = top_p
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client: Optional["AsyncGroq"] = None
+        self._http_client = None
+
+    async def generate(self, prompt: str) -> str:
+        """Return the full completion for a prompt"""
+        completion = await self._with_retries(
+            lambda: self._get_client().chat.completions.create(**self._request(prompt))
+        )
+        return completion.choices[0].message.content or ""
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield completion tokens as Groq produces them"""
+        # Retries only cover opening the stream; a broken stream mid-answer is surfaced
+        chunks = await self._with_retries(
+            lambda: self._get_client().chat.completions.create(**self._request(prompt), stream=True)
+        )
+        try:
+            async for chunk in chunks:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            await chunks.close()
+
+    def _request(self, prompt: str) -> dict:
+        profile = generation_profile.get()
+        request = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "top_p": self.top_p
+        }
+        if profile is not None:
+            request.update(profile.model_dump(include={"max_tokens", "temperature", "top_p"}, exclude_none=True))
+            if profile.stop:
+                request["stop"] = profile.stop[:4]  # the API takes at most four
+        return request
+
+    def _get_client(self) -> "AsyncGroq":
+        # Ride on the pooled HTTP client of the running loop; the SDK's own retries are disabled
+        http_client = get_http_client()
+        if self._client is None or self._http_client is not http_client:
+            self._http_client = http_client
+            self._client = _groq().AsyncGroq(
+                api_key=self.api_key,
+                http_client=http_client,
+                max_retries=0
+            )
+        return self._client
+
+    async def _with_retries(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await call()
+            except (_groq().APIStatusError, _groq().APIConnectionError) as e:
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise  # waiting that long would hold the caller's slot for longer than a retry is worth
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, _groq().APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES
+        return True
+
+    def _retry_delay(self, attempt: int, error: Optional[Exception] = None) -> Optional[float]:
+        """Honor Retry-After when the server sends it, otherwise exponential backoff with full jitter
+
+        None when Retry-After asks for longer than backoff_max: the request gives up instead.
+        """
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.backoff_max else None
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(error: Optional[Exception]) -> Optional[float]:
+        response = getattr(error, "response", None)
+        value = response.headers.get("retry-after") if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class ReplayProvider:
+    """Serve completions from a cassette, recording misses from an upstream provider"""
+
+    MODES = ("replay", "record", "auto")
+
+    def __init__(self,
+                 cassette: Cassette,
+                 upstream: Optional[Any] = None,
+                 mode: str = "auto",
+                 speed: float = 1.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown replay mode: {mode}")
+        if mode != "replay" and upstream is None:
+            raise ValueError(f"Replay mode '{mode}' needs an upstream provider to record from")
+        self.cassette = cassette
+        self.upstream = upstream
+        self.mode = mode
+        self.speed = speed
+        self.model_name = f"replay:{upstream.model_name}" if upstream else "replay"
+        self.stats = {"replayed": 0, "recorded": 0}
+
+    async def generate(self, prompt: str) -> str:
+        """Return the full completion for a prompt"""
+        async with aclosing(self.stream(prompt)) as tokens:
+            return "".join([token async for token in tokens])
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield recorded tokens with their original spacing divided by speed (0 for no delay)"""
+        recording = None if self.mode == "record" else self.cassette.get(prompt)
+        if recording is not None:
+            self.stats["replayed"] += 1
+            for chunk, delay in zip(recording.chunks, recording.delays):
+                if self.speed > 0 and delay > 0:
+                    await asyncio.sleep(delay / self.speed)
+                yield chunk
+            return
+
+        if self.mode == "replay":
+            raise CassetteMiss(f"No recording for prompt {Cassette.key(prompt)[:12]}")
+
+        chunks, delays = [], []
+        last = time.perf_counter()
+        async with aclosing(self.upstream.stream(prompt)) as tokens:
+            async for token in tokens:
+                now = time.perf_counter()
+                chunks.append(token)
+                delays.append(now - last)
+                last = now
+                yield token
+        # Only complete answers are recorded; an abandoned stream never reaches this point
+        self.cassette.record(prompt, chunks, delays)
+        self.stats["recorded"] += 1
@@ -0,0 +1,74 @@
+from typing import Any, Callable, Dict, List
+from .cassette import Cassette
+from .config import settings
+from .providers import GroqProvider, OllamaProvider, ReplayProvider
+from .router import ProviderRouter
+from .scheduler import GenerationScheduler, ScheduledProvider
+
+ProviderFactory = Callable[[GenerationScheduler], Any]
+
+_factories: Dict[str, ProviderFactory] = {}
+
+def register_provider(name: str) -> Callable[[ProviderFactory], ProviderFactory]:
+    """Register a factory building the provider for name from settings and the shared scheduler"""
+    def decorator(factory: ProviderFactory) -> ProviderFactory:
+        _factories[name] = factory
+        return factory
+    return decorator
+
+def available_providers() -> List[str]:
+    return list(_factories)
+
+def create_provider(name: str, scheduler: GenerationScheduler) -> Any:
+    name = getattr(name, "value", name)
+    factory = _factories.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown provider: {name}. Available: {', '.join(_factories)}")
+    return factory(scheduler)
+
+@register_provider("ollama")
+def _ollama(scheduler: GenerationScheduler) -> ScheduledProvider:
+    provider = OllamaProvider(
+        host=settings.OLLAMA_HOST,
+        model=settings.OLLAMA_MODEL,
+        timeout=settings.HTTP_TIMEOUT,
+        keep_alive=settings.get_keep_alive(settings.OLLAMA_MODEL)
+    )
+    return ScheduledProvider(provider, scheduler, "ollama")
+
+@register_provider("groq")
+def _groq(scheduler: GenerationScheduler) -> ScheduledProvider:
+    provider = GroqProvider(
+        api_key=settings.GROQ_API_KEY,
+        model=settings.MODEL_NAME,
+        max_tokens=settings.MAX_TOKENS,
+        temperature=settings.TEMPERATURE,
+        top_p=settings.TOP_P,
+        max_retries=settings.GROQ_MAX_RETRIES,
+        backoff_base=settings.GROQ_BACKOFF_BASE,
+        backoff_max=settings.GROQ_BACKOFF_MAX
+    )
+    return ScheduledProvider(provider, scheduler, "groq")
+
+@register_provider("auto")
+def _router(scheduler: GenerationScheduler) -> ProviderRouter:
+    return ProviderRouter(
+        {name: create_provider(name, scheduler) for name in settings.ROUTER_PROVIDERS},
+        hedging=settings.ROUTER_HEDGING,
+        window=settings.ROUTER_WINDOW,
+        hedge_min_delay=settings.ROUTER_HEDGE_MIN_DELAY,
+        hedge_max_delay=settings.ROUTER_HEDGE_MAX_DELAY,
+        hedge_default_delay=settings.ROUTER_HEDGE_DEFAULT_DELAY
+    )
+
+@register_provider("replay")
+def _replay(scheduler: GenerationScheduler) -> ReplayProvider:
+    upstream = None
+    if settings.REPLAY_MODE != "replay":
+        upstream = create_provider(settings.REPLAY_UPSTREAM, scheduler)
+    return ReplayProvider(
+        Cassette(settings.REPLAY_CASSETTE),
+        upstream=upstream,
+        mode=settings.REPLAY_MODE,
+        speed=settings.REPLAY_SPEED
+    )
@@ -0,0 +1,171 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+class ProviderStats:
+    """Rolling time-to-first-token, latency and error window for one provider"""
+
+    def __init__(self, window: int = 100):
+        self.ttft: Deque[float] = deque(maxlen=window)
+        self.latency: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+
+    def record_success(self, ttft: float, latency: float) -> None:
+        self.ttft.append(ttft)
+        self.latency.append(latency)
+        self.outcomes.append(True)
+
+    def record_error(self) -> None:
+        self.outcomes.append(False)
+
+    def record_slow(self, elapsed: float) -> None:
+        """Count a hedged-away attempt; its real TTFT is at least the time it was given"""
+        self.ttft.append(elapsed)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @staticmethod
+    def percentile(samples: Deque[float], q: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": len(self.outcomes),
+            "error_rate": self.error_rate,
+            "ttft_p50": self.percentile(self.ttft, 0.5),
+            "ttft_p95": self.percentile(self.ttft, 0.95),
+            "latency_p50": self.percentile(self.latency, 0.5),
+            "latency_p95": self.percentile(self.latency, 0.95)
+        }
+
+class ProviderRouter:
+    """Route generations to the best provider by rolling latency and errors, hedging slow starts"""
+
+    MIN_SAMPLES = 5
+    ERROR_PENALTY = 4.0
+
+    def __init__(self,
+                 providers: Dict[str, Any],
+                 hedging: bool = True,
+                 window: int = 100,
+                 hedge_min_delay: float = 0.5,
+                 hedge_max_delay: float = 10.0,
+                 hedge_default_delay: float = 3.0):
+        self.providers = providers
+        self.hedging = hedging
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_delay = hedge_max_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.stats = {name: ProviderStats(window) for name in providers}
+        self.counters = {"hedged": 0, "failovers": 0}
+        self.model_name = "+".join(p.model_name for p in providers.values())
+
+    def rank(self) -> List[str]:
+        """Providers ordered best first; configuration order breaks ties"""
+        order = list(self.providers)
+        return sorted(order, key=lambda name: (self._score(name), order.index(name)))
+
+    def hedge_delay(self, name: str) -> float:
+        """How long to wait for a first token before firing the next provider"""
+        stats = self.stats[name]
+        if len(stats.ttft) < self.MIN_SAMPLES:
+            return self.hedge_default_delay
+        p95 = stats.percentile(stats.ttft, 0.95)
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, p95))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ranking": self.rank(),
+            "providers": {name: stats.snapshot() for name, stats in self.stats.items()},
+            **self.counters
+        }
+
+    async def generate(self, prompt: str) -> str:
+        """Return the full completion from whichever provider wins the routing race"""
+        return "".join([token async for token in self.stream(prompt)])
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield tokens from the best provider, hedged or failed over when it stalls"""
+        name, tokens, first, launched = await self._race(prompt, self.rank())
+        ttft = time.perf_counter() - launched
+        try:
+            if first is not None:
+                yield first
+                async for token in tokens:
+                    yield token
+        except Exception:
+            self.stats[name].record_error()
+            raise
+        finally:
+            await tokens.aclose()
+        self.stats[name].record_success(ttft, time.perf_counter() - launched)
+
+    def _score(self, name: str) -> float:
+        stats = self.stats[name]
+        ttft = stats.percentile(stats.ttft, 0.5)
+        expected = ttft if ttft is not None else self.hedge_default_delay
+        return expected * (1 + self.ERROR_PENALTY * stats.error_rate)
+
+    async def _race(self, prompt: str, order: List[str]) -> Tuple[str, AsyncIterator[str], Optional[str], float]:
+        """Return (provider, stream, first token, launch time) for the first provider to answer"""
+        remaining = list(order)
+        attempts: Dict["asyncio.Future[str]", Tuple[str, AsyncIterator[str], float]] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            name = remaining.pop(0)
+            tokens = self.providers[name].stream(prompt)
+            attempts[asyncio.ensure_future(tokens.__anext__())] = (name, tokens, time.perf_counter())
+
+        launch()
+        primary = order[0]
+        won_at: Optional[float] = None
+        try:
+            while attempts:
+                timeout = self.hedge_delay(primary) if self.hedging and remaining else None
+                done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.counters["hedged"] += 1
+                    launch()
+                    continue
+
+                winner = None
+                for task in done:
+                    name, tokens, launched = attempts.pop(task)
+                    try:
+                        first = task.result()
+                    except StopAsyncIteration:
+                        first = None
+                    except Exception as e:
+                        self.stats[name].record_error()
+                        last_error = e
+                        continue
+                    if winner is None:
+                        winner = (name, tokens, first, launched)
+                    else:
+                        await tokens.aclose()
+
+                if winner is not None:
+                    won_at = winner[3]
+                    return winner
+                if not attempts and remaining:
+                    self.counters["failovers"] += 1
+                    launch()
+            raise last_error
+        finally:
+            for task, (name, tokens, launched) in attempts.items():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await tokens.aclose()
+                # Only attempts that started earlier and still lost tell us something about latency
+                if won_at is not None and launched < won_at:
+                    self.stats[name].record_slow(time.perf_counter() - launched)
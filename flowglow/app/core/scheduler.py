@@ -0,0 +1,189 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from .config import settings
+from .models import RequestPriority
+from ..utils.metrics import get_metrics
+
+PRIORITY_RANK = {
+    RequestPriority.INTERACTIVE: 0,
+    RequestPriority.BULK: 1
+}
+
+# Priority of the generation running in the current task; read when a provider asks for a slot
+request_priority: contextvars.ContextVar[RequestPriority] = contextvars.ContextVar(
+    "request_priority", default=RequestPriority.INTERACTIVE
+)
+
+class SchedulerRejected(Exception):
+    """Raised when a backend queue is full; carries a retry-after hint in seconds"""
+
+    def __init__(self, backend: str, retry_after: float):
+        self.backend = backend
+        self.retry_after = retry_after
+        super().__init__(f"{backend} is at capacity, retry in {retry_after:.0f}s")
+
+class BackendQueue:
+    """Concurrency slots and a bounded priority wait queue for one backend"""
+
+    def __init__(self, concurrency: int, max_queue: int, bulk_queue_share: float = 0.5):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_bulk_queue = int(max_queue * bulk_queue_share)
+        self.active = 0
+        self.service_time = 5.0  # moving average of slot hold time, seconds
+        self.stats = {"admitted": 0, "rejected": 0, "wait_total": 0.0, "wait_max": 0.0}
+        self._waiters: List[list] = []
+        self._queued = {priority: 0 for priority in PRIORITY_RANK}
+        self._sequence = itertools.count()
+
+    @property
+    def depth(self) -> int:
+        return sum(self._queued.values())
+
+    def retry_after(self) -> float:
+        """Rough time until a slot frees up for a request joining the back of the queue"""
+        return self.service_time * (self.depth + 1) / self.concurrency
+
+    def snapshot(self) -> Dict[str, Any]:
+        admitted = self.stats["admitted"]
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "queue_depth": self.depth,
+            "queued": {priority.value: count for priority, count in self._queued.items()},
+            "admitted": admitted,
+            "rejected": self.stats["rejected"],
+            "wait_avg": self.stats["wait_total"] / admitted if admitted else 0.0,
+            "wait_max": self.stats["wait_max"]
+        }
+
+class GenerationScheduler:
+    """Admission control and priority scheduling in front of the generation backends"""
+
+    def __init__(self,
+                 concurrency: Optional[Dict[str, int]] = None,
+                 default_concurrency: int = 4,
+                 max_queue: int = 32,
+                 bulk_queue_share: float = 0.5):
+        self.concurrency = concurrency or {}
+        self.default_concurrency = default_concurrency
+        self.max_queue = max_queue
+        self.bulk_queue_share = bulk_queue_share
+        self._backends: Dict[str, BackendQueue] = {}
+
+    def backend(self, name: str) -> BackendQueue:
+        queue = self._backends.get(name)
+        if queue is None:
+            queue = BackendQueue(
+                self.concurrency.get(name, self.default_concurrency),
+                self.max_queue,
+                self.bulk_queue_share
+            )
+            self._backends[name] = queue
+        return queue
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: queue.snapshot() for name, queue in self._backends.items()}
+
+    @asynccontextmanager
+    async def slot(self, backend: str, priority: Optional[RequestPriority] = None):
+        """Hold one concurrency slot of the backend, waiting in the priority queue if needed"""
+        queue = self.backend(backend)
+        await self._acquire(queue, backend, priority or request_priority.get())
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            queue.service_time = 0.8 * queue.service_time + 0.2 * elapsed
+            self._release(queue)
+
+    async def _acquire(self, queue: BackendQueue, backend: str, priority: RequestPriority) -> None:
+        priority = RequestPriority(priority)
+        if queue.active < queue.concurrency and not queue.depth:
+            queue.active += 1
+            self._record_wait(queue, backend, 0.0)
+            return
+
+        limit = queue.max_queue if priority == RequestPriority.INTERACTIVE else queue.max_bulk_queue
+        if queue.depth >= limit:
+            queue.stats["rejected"] += 1
+            raise SchedulerRejected(backend, queue.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = [PRIORITY_RANK[priority], next(queue._sequence), future, priority]
+        heapq.heappush(queue._waiters, waiter)
+        queue._queued[priority] += 1
+        enqueued = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before the cancellation landed
+                self._release(queue)
+            elif waiter in queue._waiters:
+                # Otherwise _release already popped and uncounted it while skipping the cancelled future
+                future.cancel()
+                queue._waiters.remove(waiter)
+                heapq.heapify(queue._waiters)
+                queue._queued[priority] -= 1
+            raise
+        self._record_wait(queue, backend, time.perf_counter() - enqueued)
+
+    def _release(self, queue: BackendQueue) -> None:
+        while queue._waiters:
+            _, _, future, priority = heapq.heappop(queue._waiters)
+            queue._queued[priority] -= 1
+            if not future.done():
+                future.set_result(None)  # the slot passes straight to the waiter
+                return
+        queue.active -= 1
+
+    @staticmethod
+    def _record_wait(queue: BackendQueue, backend: str, waited: float) -> None:
+        queue.stats["admitted"] += 1
+        queue.stats["wait_total"] += waited
+        queue.stats["wait_max"] = max(queue.stats["wait_max"], waited)
+        get_metrics().observe_stage("queue_wait", waited, backend=backend)
+
+class ScheduledProvider:
+    """Provider wrapper that holds a scheduler slot for the duration of each call"""
+
+    def __init__(self, provider: Any, scheduler: GenerationScheduler, backend: str):
+        self.provider = provider
+        self.scheduler = scheduler
+        self.backend = backend
+        self.model_name = provider.model_name
+
+    async def generate(self, prompt: str) -> str:
+        async with self.scheduler.slot(self.backend):
+            return await self.provider.generate(prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        async with self.scheduler.slot(self.backend):
+            async with aclosing(self.provider.stream(prompt)) as tokens:
+                async for token in tokens:
+                    yield token
+
+_scheduler: Optional[GenerationScheduler] = None
+
+def create_scheduler(max_queue: Optional[int] = None) -> GenerationScheduler:
+    """Scheduler configured from settings, optionally with a longer or shorter wait queue"""
+    return GenerationScheduler(
+        concurrency=settings.SCHEDULER_CONCURRENCY,
+        default_concurrency=settings.SCHEDULER_DEFAULT_CONCURRENCY,
+        max_queue=max_queue if max_queue is not None else settings.SCHEDULER_MAX_QUEUE,
+        bulk_queue_share=settings.SCHEDULER_BULK_QUEUE_SHARE
+    )
+
+def get_scheduler() -> GenerationScheduler:
+    """Get the process-wide scheduler shared by every handler and Gradio session"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = create_scheduler()
+    return _scheduler
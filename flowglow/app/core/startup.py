@@ -0,0 +1,67 @@
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from ..utils.metrics import get_metrics
+
+class StartupTimer:
+    """Wall-clock time spent in each startup phase, in the order the phases ran"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = time.perf_counter() if started is None else started
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self) -> str:
+        total = self.total
+        lines = ["Startup timing:"]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name:<14} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<14} {total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def observe(self) -> None:
+        """Publish the phases on the metrics endpoint next to the request stages"""
+        metrics = get_metrics()
+        for name, seconds in self.phases.items():
+            metrics.observe_stage("startup", seconds, phase=name)
+
+def ollama_ready(host: str, timeout: float = 0.5) -> bool:
+    """Whether Ollama answers its API, not merely whether the port accepts connections"""
+    try:
+        with urllib.request.urlopen(f"{host.rstrip('/')}/api/tags", timeout=timeout) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+def wait_for_ollama(host: str, timeout: float = 30.0, initial_delay: float = 0.05, max_delay: float = 1.0,
+                    process: Optional[subprocess.Popen] = None) -> bool:
+    """Poll Ollama with exponential backoff until it is ready, the timeout passes or the process exits"""
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        if ollama_ready(host, timeout=min(1.0, max(0.05, deadline - time.monotonic()))):
+            return True
+        if process is not None and process.poll() is not None:
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
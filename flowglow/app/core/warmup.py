@@ -0,0 +1,158 @@
+import json
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, time as clock, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+from .config import settings
+from ..utils.metrics import MetricsRegistry, get_metrics
+
+def parse_hours(hours: str) -> Tuple[clock, clock]:
+    """'08:00-20:00' -> (08:00, 20:00); an end before the start wraps past midnight"""
+    start, end = (clock.fromisoformat(part.strip()) for part in hours.split("-", 1))
+    return start, end
+
+def _model_id(name: str) -> str:
+    return name if ":" in name else f"{name}:latest"
+
+def _parse_expiry(value: str) -> Optional[datetime]:
+    # Ollama reports nanoseconds, which fromisoformat does not take
+    value = re.sub(r"(\.\d{6})\d+", r"\1", value.replace("Z", "+00:00"))
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+class ModelKeeper:
+    """Loads Ollama models ahead of the first request and keeps them resident during business hours"""
+
+    def __init__(self,
+                 host: str,
+                 keep_alive: Dict[str, str],
+                 interval: float = 240.0,
+                 hours: str = "08:00-20:00",
+                 days: Iterable[int] = (0, 1, 2, 3, 4),
+                 timeout: float = 120.0,
+                 num_ctx: Optional[int] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.host = host.rstrip("/")
+        self.keep_alive = dict(keep_alive)  # model -> Ollama keep_alive duration
+        self.interval = interval
+        self.hours = parse_hours(hours)
+        self.days = set(days)
+        self.timeout = timeout
+        self.num_ctx = num_ctx
+        self.metrics = metrics or get_metrics()
+        self.residency: Dict[str, Dict[str, Any]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def warm(self, model: str) -> Optional[float]:
+        """Load one model with an empty prompt and return the seconds it took, or None on failure"""
+        payload = {"model": model, "prompt": "", "stream": False, "keep_alive": self.keep_alive[model]}
+        if self.num_ctx:
+            # Loading with another context size than the generations use would only trigger a reload
+            payload["options"] = {"num_ctx": self.num_ctx}
+        started = time.perf_counter()
+        try:
+            self._request("/api/generate", payload)
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+        seconds = time.perf_counter() - started
+        self.metrics.observe_stage("model_load", seconds, model=model)
+        return seconds
+
+    def warm_all(self) -> Dict[str, Optional[float]]:
+        # Sequential on purpose: concurrent loads compete for the same memory bandwidth
+        loads = {model: self.warm(model) for model in self.keep_alive}
+        self.refresh_residency()
+        return loads
+
+    def refresh_residency(self) -> Dict[str, Dict[str, Any]]:
+        """Read Ollama's loaded models and publish residency gauges for the configured ones"""
+        try:
+            loaded = self._request("/api/ps").get("models", [])
+        except (urllib.error.URLError, OSError, ValueError):
+            return self.residency
+        by_id = {_model_id(entry.get("name") or entry.get("model", "")): entry for entry in loaded}
+        now = datetime.now(timezone.utc)
+
+        residency = {}
+        for model in self.keep_alive:
+            entry = by_id.get(_model_id(model))
+            expires = _parse_expiry(entry["expires_at"]) if entry and entry.get("expires_at") else None
+            residency[model] = {
+                "resident": entry is not None,
+                "memory_bytes": (entry or {}).get("size", 0),
+                "vram_bytes": (entry or {}).get("size_vram", 0),
+                "expires_in": max(0.0, (expires - now).total_seconds()) if expires else None
+            }
+            self.metrics.set_gauge("model_resident", 1 if entry else 0, model=model)
+            self.metrics.set_gauge("model_memory_bytes", residency[model]["memory_bytes"], model=model)
+            if residency[model]["expires_in"] is not None:
+                self.metrics.set_gauge("model_expires_in_seconds", residency[model]["expires_in"], model=model)
+        self.residency = residency
+        return residency
+
+    def in_business_hours(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now()
+        start, end = self.hours
+        if start <= end:
+            return now.weekday() in self.days and start <= now.time() < end
+        # Overnight window: the part after midnight belongs to the previous day's shift
+        if now.time() >= start:
+            return now.weekday() in self.days
+        return now.time() < end and (now.weekday() - 1) % 7 in self.days
+
+    def tick(self, now: Optional[datetime] = None) -> None:
+        """Reload models that are gone or about to expire, during business hours only"""
+        residency = self.refresh_residency()
+        if not self.in_business_hours(now):
+            return  # let Ollama unload them on its own keep_alive
+        for model in self.keep_alive:
+            state = residency.get(model, {})
+            expires_in = state.get("expires_in")
+            if not state.get("resident") or (expires_in is not None and expires_in < 2 * self.interval):
+                self.warm(model)
+        self.refresh_residency()
+
+    def start(self, warm_first: bool = True) -> "ModelKeeper":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(warm_first,), name="model-keeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, warm_first: bool) -> None:
+        if warm_first:
+            self.warm_all()
+        while not self._stop.wait(self.interval):
+            self.tick()
+
+    def _request(self, path: str, payload: Optional[dict] = None) -> dict:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.host}{path}", data=data, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read() or b"{}")
+
+def create_model_keeper() -> ModelKeeper:
+    """Keeper for the configured warm-up models, each with its keep_alive from settings"""
+    models = settings.OLLAMA_WARMUP_MODELS or [settings.OLLAMA_MODEL]
+    return ModelKeeper(
+        settings.OLLAMA_HOST,
+        {model: settings.get_keep_alive(model) for model in models},
+        interval=settings.OLLAMA_KEEPER_INTERVAL,
+        hours=settings.OLLAMA_KEEPER_HOURS,
+        days=settings.OLLAMA_KEEPER_DAYS,
+        num_ctx=settings.OLLAMA_NUM_CTX
+    )
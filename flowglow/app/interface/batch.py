@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, TextIO
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.http_client import close_http_clients
+from app.core.llm_handler import LLMHandler
+from app.core.models import ContentRequest, Platform, RequestPriority
+from app.core.prompts import ContentPromptManager
+from app.core.scheduler import create_scheduler
+from app.utils.text_processor import TextProcessor
+from app.utils.validators import ContentValidator, StreamingValidator
+
+# Statuses a resumed run does not redo; errors are retried
+FINISHED = {"ok", "rejected", "invalid"}
+
+@dataclass
+class BatchStats:
+    processed: int = 0
+    skipped: int = 0
+    ok: int = 0
+    rejected: int = 0
+    invalid: int = 0
+    error: int = 0
+
+    def count(self, status: str) -> None:
+        self.processed += 1
+        setattr(self, status, getattr(self, status) + 1)
+
+def load_checkpoint(path: Path) -> Set[str]:
+    """Ids finished by an earlier run; a line torn by a crash is cut off so appends stay valid JSONL"""
+    if not path.exists():
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    done = set()
+    for line in data[:end].splitlines():
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        if result.get("status") in FINISHED:
+            done.add(result["id"])
+    return done
+
+class BatchRunner:
+    """Runs JSONL ContentRequest records through the content pipeline with bounded concurrency
+
+    Results are written one JSON line each, in completion order, as soon as an item
+    finishes; every sink is flushed per line so an interrupted run loses no finished item.
+    """
+
+    def __init__(self, handler: LLMHandler, concurrency: int = 4, include_image: bool = False):
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.include_image = include_image
+        self.stats = BatchStats()
+
+    async def run(self, source: TextIO, sinks: List[TextIO], done: Optional[Set[str]] = None) -> BatchStats:
+        done = done or set()
+        # Bounded, so a multi-thousand line input is never read far ahead of the workers
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def produce() -> None:
+            number = 0
+            try:
+                while line := await asyncio.to_thread(source.readline):
+                    number += 1
+                    if line.strip():
+                        await queue.put((number, line))
+            finally:
+                for _ in range(self.concurrency):
+                    await queue.put(None)
+
+        async def work() -> None:
+            while (item := await queue.get()) is not None:
+                result = await self.process(*item, done)
+                if result is not None:
+                    self.stats.count(result["status"])
+                    line = json.dumps(result, ensure_ascii=False, default=str) + "\n"
+                    for sink in sinks:
+                        sink.write(line)
+                        sink.flush()
+
+        await asyncio.gather(produce(), *(work() for _ in range(self.concurrency)))
+        return self.stats
+
+    async def process(self, number: int, line: str, done: Set[str]) -> Optional[Dict[str, Any]]:
+        """Result record for one input line, or None when a previous run already finished it"""
+        started = time.perf_counter()
+        item_id = f"line-{number}"
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            item_id = str(record.pop("id", item_id))
+        except ValueError as e:
+            return self._result(item_id, "invalid", started, message=f"Invalid JSON: {e}")
+        if item_id in done:
+            self.stats.skipped += 1
+            return None
+
+        try:
+            request = ContentRequest(**record)
+        except ValidationError as e:
+            return self._result(item_id, "invalid", started, message=str(e))
+        valid, message = ContentValidator.validate_request(request)
+        if not valid:
+            return self._result(item_id, "invalid", started, request.platform, message=message)
+
+        prompt = ContentPromptManager.get_prompt(request)
+        validator = StreamingValidator(request.platform) if settings.STREAM_VALIDATION else None
+        image_params = request.image_params.model_dump() if request.image_params else None
+        try:
+            content, image_url = await self.handler.generate(
+                prompt,
+                include_image=self.include_image,
+                image_params=image_params,
+                request=request,
+                priority=RequestPriority.BULK,
+                validator=validator,
+                raise_errors=True
+            )
+        except Exception as e:
+            return self._result(item_id, "error", started, request.platform,
+                                message=str(e), error_type=type(e).__name__)
+
+        if validator and validator.issue:
+            return self._result(item_id, "rejected", started, request.platform,
+                                message=validator.issue.message, issue=validator.issue.model_dump(mode="json"))
+        valid, message = ContentValidator.validate_content(content, request.platform)
+        return self._result(
+            item_id, "ok" if valid else "invalid", started, request.platform,
+            message=message,
+            content=content,
+            formatted=TextProcessor.format_for_platform(content, request.platform),
+            image_url=image_url
+        )
+
+    @staticmethod
+    def _result(item_id: str, status: str, started: float, platform: Optional[str] = None, **fields) -> Dict[str, Any]:
+        return {
+            "id": item_id,
+            "status": status,
+            "platform": Platform(platform).value if platform else None,
+            **{name: value for name, value in fields.items() if value is not None},
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+
+async def run_batch(source: TextIO,
+                    sinks: List[TextIO],
+                    done: Optional[Set[str]] = None,
+                    concurrency: Optional[int] = None,
+                    include_image: bool = False,
+                    provider: Optional[str] = None) -> BatchStats:
+    concurrency = concurrency or settings.BATCH_CONCURRENCY
+    # Bulk requests may only fill part of a backend queue; this run's own scheduler makes room for every worker
+    scheduler = create_scheduler(max_queue=max(
+        settings.SCHEDULER_MAX_QUEUE, math.ceil(concurrency / settings.SCHEDULER_BULK_QUEUE_SHARE)
+    ))
+    handler = LLMHandler(provider or settings.DEFAULT_PROVIDER, scheduler=scheduler)
+    try:
+        return await BatchRunner(handler, concurrency, include_image).run(source, sinks, done)
+    finally:
+        if handler.response_cache:
+            handler.response_cache.close()
+        await close_http_clients()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.interface.batch",
+        description="Generate content for a JSONL file of ContentRequest records without the UI"
+    )
+    parser.add_argument("input", nargs="?", default="-", help="JSONL input, one request per line; '-' reads stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL results in completion order; '-' writes stdout")
+    parser.add_argument("--checkpoint", help="results file to resume from; defaults to --output when it is a file")
+    parser.add_argument("--concurrency", type=int, default=None, help="requests in flight (BATCH_CONCURRENCY)")
+    parser.add_argument("--provider", default=None, help="generation provider (DEFAULT_PROVIDER)")
+    parser.add_argument("--images", action="store_true", help="also look up an image for every item")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    checkpoint = args.checkpoint or (args.output if args.output != "-" else None)
+    checkpoint = Path(checkpoint) if checkpoint else None
+    done = load_checkpoint(checkpoint) if checkpoint else set()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sinks = []
+    if checkpoint:
+        checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        sinks.append(open(checkpoint, "a", encoding="utf-8"))
+    if args.output == "-":
+        sinks.append(sys.stdout)
+    elif checkpoint is None or Path(args.output) != checkpoint:
+        sinks.append(open(args.output, "a", encoding="utf-8"))
+
+    started = time.perf_counter()
+    try:
+        stats = asyncio.run(run_batch(
+            source, sinks, done,
+            concurrency=args.concurrency,
+            include_image=args.images,
+            provider=args.provider
+        ))
+    except KeyboardInterrupt:
+        print("Interrupted; finished items are kept and skipped on the next run", file=sys.stderr)
+        return 130
+    finally:
+        for sink in sinks:
+            if sink is not sys.stdout:
+                sink.flush()
+                os.fsync(sink.fileno())
+                sink.close()
+        if source is not sys.stdin:
+            source.close()
+
+    summary = ", ".join(f"{name} {value}" for name, value in asdict(stats).items())
+    print(f"Batch done in {time.perf_counter() - started:.1f}s: {summary}", file=sys.stderr)
+    return 1 if stats.error else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,16 @@
+from contextlib import aclosing
 import gradio as gr
 from typing import Dict, Any, Tuple, Optional
 from app.core.models import ContentRequest, Platform, ContentType
 from app.core.config import settings
 from app.core.llm_handler import LLMHandler
+from app.core.prompts import ContentPromptManager
+from app.core.http_client import close_http_clients
+from app.core.scheduler import SchedulerRejected
+from app.core.startup import StartupTimer
+from app.utils.metrics import get_metrics, start_metrics_server
+from app.utils.text_processor import StreamingFormatter
+from app.utils.validators import StreamingValidator
 
 class FlowGlowInterface:
     def __init__(self):
@@ -69,6 +77,9 @@ class FlowGlowInterface:
                     interactive=False
                 )
 
+            with gr.Row():
+                preview = gr.HTML(label="Preview")
+
             with gr.Row():
                 image_output = gr.Image(
                     label="Generated Image",
@@ -81,35 +92,8 @@ class FlowGlowInterface:
                     image_orientation: gr.update(visible=include_imgs)
                 }
 
-            async def generate_content(
-                platform, topic, audience, tone, lang, 
-                include_imgs, img_size, img_orientation
-            ):
-                try:
-                    request = ContentRequest(
-                        platform=platform,
-                        topic=topic,
-                        audience=audience,
-                        tone=tone,
-                        language=lang
-                    )
-                    
-                    content, image_url = await self.generator.generate(
-                        str(request),
-                        include_image=include_imgs,
-                        image_params={
-                            "size": img_size,
-                            "orientation": img_orientation
-                        }
-                    )
-                    
-                    return content, image_url
-                    
-                except Exception as e:
-                    return f"Error generating content: {str(e)}", None
-
             def clear_outputs():
-                return "", None
+                return "", "", None
 
             include_image.change(
                 fn=update_image_controls,
@@ -117,26 +101,92 @@ class FlowGlowInterface:
                 outputs=[image_size, image_orientation]
             )
 
-            submit_btn.click(
-                fn=generate_content,
+            submit_event = submit_btn.click(
+                fn=self.generate_content,
                 inputs=[
                     platform, topic, audience, tone, language,
                     include_image, image_size, image_orientation
                 ],
-                outputs=[output, image_output]
+                outputs=[output, preview, image_output]
             )
             
             clear_btn.click(
                 fn=clear_outputs,
-                outputs=[output, image_output]
+                outputs=[output, preview, image_output],
+                cancels=[submit_event]
             )
 
         return interface
 
-def launch_app():
-    interface = FlowGlowInterface()
-    app = interface.create_interface()
-    app.launch(share=True)
+    async def generate_content(self,
+                               platform, topic, audience, tone, lang,
+                               include_imgs, img_size, img_orientation):
+        """Stream (content, preview, image) updates for one submit of the form"""
+        try:
+            request = ContentRequest(
+                platform=platform,
+                topic=topic,
+                audience=audience,
+                tone=tone,
+                language=lang
+            )
+
+            with get_metrics().span("prompt_build", platform=request.platform):
+                prompt = ContentPromptManager.get_prompt(request)
+            validator = StreamingValidator(request.platform) if settings.STREAM_VALIDATION else None
+            formatter = StreamingFormatter(request.platform)
+            updates = self.generator.stream(
+                prompt,
+                include_image=include_imgs,
+                image_params={
+                    "size": img_size,
+                    "orientation": img_orientation
+                },
+                request=request,
+                validator=validator,
+                raise_errors=True
+            )
+            final = None
+            # Closed right away when Gradio cancels the event, so the model call stops with it
+            async with aclosing(updates):
+                async for content, image_url in updates:
+                    if validator and validator.issue:
+                        yield content, "", image_url  # the rejection message
+                        return
+                    final = content, image_url
+                    yield formatter.update(content), formatter.html, image_url
+            if final:
+                content, image_url = final
+                content = formatter.finish(content)
+                yield content, formatter.html, image_url
+
+        except SchedulerRejected as e:
+            yield f"The generator is busy right now, please retry in about {e.retry_after:.0f} seconds.", "", None
+        except Exception as e:
+            yield f"Error generating content: {str(e)}", "", None
+
+def launch_app(timer: Optional[StartupTimer] = None):
+    timer = timer or StartupTimer()
+    with timer.phase("provider_init"):
+        interface = FlowGlowInterface()
+    with timer.phase("ui_build"):
+        app = interface.create_interface()
+        # Gradio's queue bounds the sessions; the generation scheduler bounds the backends behind them
+        app.queue(
+            default_concurrency_limit=settings.GRADIO_CONCURRENCY_LIMIT,
+            max_size=settings.GRADIO_MAX_QUEUE
+        )
+    metrics_server = start_metrics_server()
+    timer.observe()
+    print(timer.report())
+    try:
+        server_app, _, _ = app.launch(share=True, prevent_thread_lock=True)
+        # Pooled clients belong to Gradio's event loop, so they are closed by its shutdown, on that loop
+        server_app.router.on_shutdown.append(close_http_clients)
+        app.block_thread()
+    finally:
+        if metrics_server:
+            metrics_server.stop()
 
 if __name__ == "__main__":
     launch_app()
\ No newline at end of file
@@ -0,0 +1,135 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+from app.core.config import settings
+
+class LexiconTerm(NamedTuple):
+    term: str
+    category: str = "prohibited"
+    word_boundary: bool = True  # False also matches inside longer words ("spam" in "spammer")
+
+class LexiconMatch(NamedTuple):
+    term: str  # canonical lexicon entry
+    category: str
+    start: int  # offsets into the original text
+    end: int
+    text: str  # the text as written in the document
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation shaped like a trie, so each position is matched in one pass over shared prefixes"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Optional tails are greedy, so the longest term sharing a prefix wins
+        return f"(?:{body})?" if terminal else body
+
+    return build(trie)
+
+class LexiconMatcher:
+    """Term lexicon compiled once into a single case-insensitive trie regex"""
+
+    def __init__(self, terms: Iterable[LexiconTerm]):
+        # Each term is matched in lower case and, where it differs, in its full case fold ("straße", "strasse")
+        self.terms: Dict[str, LexiconTerm] = {}
+        for entry in terms:
+            term = " ".join(entry.term.split())
+            if term:
+                entry = entry._replace(term=term)
+                self.terms[term.lower()] = entry
+                self.terms.setdefault(term.casefold(), entry)
+        self.max_term_length = max((len(term) for term in self.terms), default=0)
+        self.pattern = self._compile()
+
+    def is_bounded(self, term: str) -> bool:
+        entry = self.terms.get(term.lower())
+        return entry is None or entry.word_boundary
+
+    def __len__(self) -> int:
+        return len({entry.term for entry in self.terms.values()})
+
+    @classmethod
+    def from_files(cls, paths: Sequence[str]) -> "LexiconMatcher":
+        """Load .json lexicons ({"category", "word_boundary", "terms"}) and .txt word lists"""
+        terms: List[LexiconTerm] = []
+        for path in paths:
+            terms.extend(load_lexicon(path))
+        return cls(terms)
+
+    def _compile(self) -> Optional["re.Pattern[str]"]:
+        bounded = [term for term, entry in self.terms.items() if entry.word_boundary]
+        unbounded = [term for term, entry in self.terms.items() if not entry.word_boundary]
+        parts = []
+        if bounded:
+            parts.append(rf"(?<!\w)(?:{_trie_pattern(bounded)})(?!\w)")
+        if unbounded:
+            parts.append(f"(?:{_trie_pattern(unbounded)})")
+        if not parts:
+            return None
+        # Whitespace inside multi-word terms matches any run of whitespace in the text
+        source = "|".join(parts).replace(r"\ ", r"\s+")
+        return re.compile(source, re.IGNORECASE)
+
+    def finditer(self, text: str) -> Iterator[LexiconMatch]:
+        """Non-overlapping matches, left to right, in a single scan of the text"""
+        if self.pattern is None:
+            return
+        for match in self.pattern.finditer(text):
+            found = match.group()
+            normalized = " ".join(found.split())
+            entry = self.terms.get(normalized.lower()) or self.terms.get(normalized.casefold()) or LexiconTerm(found)
+            yield LexiconMatch(entry.term, entry.category, match.start(), match.end(), found)
+
+    def search(self, text: str) -> Optional[LexiconMatch]:
+        return next(self.finditer(text), None)
+
+    def find_all(self, text: str) -> List[LexiconMatch]:
+        return list(self.finditer(text))
+
+    def contains(self, text: str) -> bool:
+        return self.pattern is not None and self.pattern.search(text) is not None
+
+    def match_many(self, documents: Iterable[str], first_only: bool = False) -> List[List[LexiconMatch]]:
+        """Matches for each document in a batch, reusing the compiled pattern"""
+        if first_only:
+            return [[m] if (m := self.search(doc)) else [] for doc in documents]
+        return [self.find_all(doc) for doc in documents]
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+def load_lexicon(path: str) -> List[LexiconTerm]:
+    """Terms from one lexicon file; text files hold one term per line and '#' comments"""
+    file = Path(path)
+    if not file.is_absolute() and not file.exists():
+        file = PROJECT_ROOT / file  # shipped lexicons resolve from any working directory
+    if file.suffix == ".json":
+        data = json.loads(file.read_text(encoding="utf-8"))
+        category = data.get("category", file.stem)
+        word_boundary = data.get("word_boundary", True)
+        return [LexiconTerm(term, category, word_boundary) for term in data.get("terms", [])]
+
+    terms = []
+    for line in file.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            terms.append(LexiconTerm(line, file.stem))
+    return terms
+
+_prohibited: Optional[LexiconMatcher] = None
+
+def get_prohibited_lexicon() -> LexiconMatcher:
+    """Prohibited-content matcher built from the configured lexicon files on first use"""
+    global _prohibited
+    if _prohibited is None:
+        _prohibited = LexiconMatcher.from_files(settings.PROHIBITED_LEXICONS)
+    return _prohibited
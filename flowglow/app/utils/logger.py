@@ -1,51 +1,185 @@
+import atexit
+import copy
+import json
 import logging
-from datetime import datetime
-from typing import Any, Dict
+import logging.handlers
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 from pathlib import Path
+from app.core.config import settings
+
+# Payload fields holding generated bodies; only a sample of them is logged in full
+CONTENT_FIELDS = ("content", "processed_content", "raw_response")
+
+class LazyPayload:
+    """Structured log payload rendered by the background writer, not by the caller"""
+
+    def __init__(self, data: Any, sample_rate: float = 1.0):
+        self.data = data
+        self.sampled = sample_rate >= 1.0 or random.random() < sample_rate
+
+    def render(self, max_chars: int) -> Any:
+        data = self.data
+        if hasattr(data, "model_dump"):
+            data = data.model_dump(mode="json")
+        return _truncate(data, max_chars, keep_content=self.sampled)
+
+def _truncate(value: Any, max_chars: int, keep_content: bool = True, key: Optional[str] = None) -> Any:
+    if isinstance(value, dict):
+        return {k: _truncate(v, max_chars, keep_content, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_truncate(v, max_chars, keep_content) for v in value]
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = value if isinstance(value, str) else str(value)
+    if key in CONTENT_FIELDS and not keep_content:
+        return {"chars": len(text), "preview": text[:200]}
+    if len(text) > max_chars:
+        return f"{text[:max_chars]}...[+{len(text) - max_chars} chars]"
+    return text
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the lazy payload rendered at write time"""
+
+    def __init__(self, max_field_chars: int = 2000):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        payload = getattr(record, "payload", None)
+        if payload is not None:
+            entry["payload"] = (
+                payload.render(self.max_field_chars) if isinstance(payload, LazyPayload)
+                else _truncate(payload, self.max_field_chars)
+            )
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SizeTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotate when the file grows past max_bytes or has been open longer than interval seconds"""
+
+    def __init__(self, filename: str, max_bytes: int, interval: float, backup_count: int):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep msg, args and payload unformatted; only the traceback has to be rendered here
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+_lock = threading.Lock()
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(log_dir: Optional[str] = None) -> logging.handlers.QueueHandler:
+    """Start the background writer once per process and return the shared queue handler"""
+    global _queue_handler, _listener
+    with _lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        directory = Path(log_dir or settings.LOG_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        file_handler = SizeTimeRotatingFileHandler(
+            str(directory / settings.LOG_FILE),
+            max_bytes=settings.LOG_MAX_BYTES,
+            interval=settings.LOG_ROTATE_INTERVAL,
+            backup_count=settings.LOG_BACKUP_COUNT
+        )
+        file_handler.setFormatter(JsonFormatter(settings.LOG_MAX_FIELD_CHARS))
+        handlers = [file_handler]
+        if settings.LOG_CONSOLE:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            ))
+            handlers.append(console_handler)
+
+        _listener = logging.handlers.QueueListener(
+            queue.SimpleQueue(), *handlers, respect_handler_level=True
+        )
+        _queue_handler = _LazyQueueHandler(_listener.queue)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _queue_handler
+
+def shutdown_logging() -> None:
+    """Flush queued records and close the log files"""
+    global _queue_handler, _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        for logger in logging.Logger.manager.loggerDict.values():
+            if isinstance(logger, logging.Logger) and _queue_handler in logger.handlers:
+                logger.removeHandler(_queue_handler)
+        _queue_handler = None
+        _listener = None
 
 class FlowGlowLogger:
     """Custom logger for FlowGlow application"""
-    
+
     def __init__(self, name: str = "FlowGlow"):
         self.logger = logging.getLogger(name)
         self._setup_logger()
-        
+
     def _setup_logger(self):
-        """Configure logger settings"""
-        # Create logs directory if it doesn't exist
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        
-        # Create handlers
-        file_handler = logging.FileHandler(
-            log_dir / f"flowglow_{datetime.now().strftime('%Y%m%d')}.log"
-        )
-        console_handler = logging.StreamHandler()
-        
-        # Create formatters
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers to logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-        self.logger.setLevel(logging.INFO)
-    
+        """Attach the shared queue handler; safe to call from every instance"""
+        handler = setup_logging()
+        if handler not in self.logger.handlers:
+            self.logger.addHandler(handler)
+        self.logger.setLevel(settings.LOG_LEVEL)
+        self.logger.propagate = False
+
     def log_request(self, request: Dict[str, Any]):
         """Log content generation request"""
-        self.logger.info(f"Content Request: {request}")
-    
+        self.logger.info("Content request", extra={"payload": LazyPayload(request)})
+
     def log_response(self, response: Dict[str, Any]):
         """Log content generation response"""
-        self.logger.info(f"Content Response: {response}")
-    
+        if self.logger.isEnabledFor(logging.INFO):
+            payload = LazyPayload(response, sample_rate=settings.LOG_CONTENT_SAMPLE_RATE)
+            self.logger.info("Content response", extra={"payload": payload})
+
     def log_error(self, error: Exception, context: Dict[str, Any] = None):
         """Log error with context"""
-        self.logger.error(f"Error: {str(error)}", extra={"context": context})
-    
+        self.logger.error(
+            "Error: %s", error,
+            exc_info=(type(error), error, error.__traceback__) if error.__traceback__ else None,
+            extra={"payload": LazyPayload({"error_type": type(error).__name__, "context": context})}
+        )
+
     def log_performance(self, operation: str, duration: float):
         """Log performance metrics"""
-        self.logger.info(f"Performance - {operation}: {duration:.2f}s")
\ No newline at end of file
+        self.logger.info(
+            "Performance - %s: %.2fs", operation, duration,
+            extra={"payload": {"operation": operation, "duration": duration}}
+        )
@@ -0,0 +1,217 @@
+import re
+from html import escape
+from typing import List, NamedTuple, Optional
+
+HEADING_RE = re.compile(r" {0,3}(#{1,6})(?:\s+(.*?))?(?:\s+#+)?\s*$")
+RULE_RE = re.compile(r" {0,3}([-*_])(?:\s*\1){2,}\s*$")
+FENCE_RE = re.compile(r" {0,3}(`{3,}|~{3,})\s*([\w+-]*)")
+LIST_ITEM_RE = re.compile(r"(\s*)(?:([-*+])|(\d{1,9})[.)])\s+(.*)$")
+QUOTE_RE = re.compile(r" {0,3}>\s?(.*)$")
+
+# Code spans first, so their contents are never formatted; emphasis contents are formatted recursively
+INLINE_RE = re.compile(
+    r"(?P<code>`+)(?P<code_text>.+?)(?P=code)"
+    r"|!?\[(?P<label>[^\]]+)\]\((?P<url>[^)\s]+)(?:\s+\"(?P<title>[^\"]*)\")?\)"
+    r"|(?P<strong>\*\*|__)(?=\S)(?P<strong_text>.+?)(?<=\S)(?P=strong)"
+    r"|(?<![\w*])\*(?=[^\s*])(?P<em_star>.+?)(?<=[^\s*])\*(?!\w)"
+    r"|(?<![\w_])_(?=[^\s_])(?P<em_under>.+?)(?<=[^\s_])_(?!\w)"
+)
+SAFE_URL_RE = re.compile(r"(?:https?:|mailto:|[/#?.]|(?![\w+.-]*:))", re.IGNORECASE)
+
+def _safe_url(url: str) -> str:
+    return escape(url) if SAFE_URL_RE.match(url) else "#"
+
+def render_inline(text: str) -> str:
+    """Emphasis, code spans and links within one line, in a single left-to-right scan"""
+    parts: List[str] = []
+    last = 0
+    for match in INLINE_RE.finditer(text):
+        parts.append(escape(text[last:match.start()], quote=False))
+        if match.group("code"):
+            parts.append(f"<code>{escape(match.group('code_text').strip(), quote=False)}</code>")
+        elif match.group("label") is not None:
+            title = match.group("title")
+            title = f' title="{escape(title)}"' if title else ""
+            url = _safe_url(match.group("url"))
+            if match.group().startswith("!"):
+                parts.append(f'<img src="{url}" alt="{escape(match.group("label"))}"{title}>')
+            else:
+                parts.append(f'<a href="{url}"{title}>{render_inline(match.group("label"))}</a>')
+        elif match.group("strong"):
+            parts.append(f"<strong>{render_inline(match.group('strong_text'))}</strong>")
+        else:
+            inner = match.group("em_star") or match.group("em_under")
+            parts.append(f"<em>{render_inline(inner)}</em>")
+        last = match.end()
+    parts.append(escape(text[last:], quote=False))
+    return "".join(parts)
+
+class _OpenList(NamedTuple):
+    tag: str
+    indent: int
+
+class MarkdownStream:
+    """Markdown to HTML converter fed chunk by chunk
+
+    Each line is converted as soon as its newline arrives, so streamed output can be
+    rendered while generating; feeding a whole document and calling finish() is the
+    batch conversion, which makes both outputs identical by construction.
+    """
+
+    def __init__(self):
+        self._pending: List[str] = []  # pieces of the current, unfinished line
+        self._paragraph = False
+        self._lists: List[_OpenList] = []  # innermost last
+        self._quote = False
+        self._fence: Optional[str] = None  # opening fence while inside a code block
+        self._blank = False  # the previous line was blank
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the HTML for the lines it completed"""
+        if "\n" not in chunk:
+            self._pending.append(chunk)
+            return ""
+        self._pending.append(chunk)
+        *lines, rest = "".join(self._pending).split("\n")
+        self._pending = [rest] if rest else []
+        out: List[str] = []
+        for line in lines:
+            self._line(line.rstrip("\r"), out)
+        return "".join(out)
+
+    def finish(self) -> str:
+        """Convert the last line and close every open element"""
+        out: List[str] = []
+        if self._pending:
+            self._line("".join(self._pending).rstrip("\r"), out)
+            self._pending = []
+        if self._fence is not None:
+            out.append("</code></pre>\n")
+            self._fence = None
+        self._close_blocks(out)
+        return "".join(out)
+
+    def pending(self) -> str:
+        """The unfinished line, not converted yet"""
+        return "".join(self._pending)
+
+    def _line(self, line: str, out: List[str]) -> None:
+        if self._fence is not None:
+            if line.strip().startswith(self._fence):
+                out.append("</code></pre>\n")
+                self._fence = None
+            else:
+                out.append(escape(line, quote=False) + "\n")
+            return
+
+        blank = not line.strip()
+        try:
+            self._block(line, blank, out)
+        finally:
+            self._blank = blank
+
+    def _block(self, line: str, blank: bool, out: List[str]) -> None:
+        if blank:
+            self._close_paragraph(out)
+            self._close_quote(out)
+            return
+
+        fence = FENCE_RE.match(line)
+        if fence:
+            self._close_blocks(out)
+            self._fence = fence.group(1)
+            language = f' class="language-{escape(fence.group(2))}"' if fence.group(2) else ""
+            out.append(f"<pre><code{language}>")
+            return
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            self._close_blocks(out)
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{render_inline(heading.group(2) or '')}</h{level}>\n")
+            return
+
+        if RULE_RE.match(line):
+            self._close_blocks(out)
+            out.append("<hr>\n")
+            return
+
+        item = LIST_ITEM_RE.match(line)
+        if item:
+            self._list_item(item, out)
+            return
+
+        quote = QUOTE_RE.match(line)
+        if quote:
+            self._close_lists(out)
+            if not self._quote:
+                self._close_paragraph(out)
+                out.append("<blockquote>\n")
+                self._quote = True
+            if quote.group(1).strip():
+                self._text(quote.group(1), out)
+            else:
+                self._close_paragraph(out)
+            return
+
+        if self._lists and (line[:1].isspace() or not self._blank):
+            # Indented or lazy continuation of the open list item
+            out.append("\n" + render_inline(line.strip()))
+            return
+        self._close_lists(out)
+        if self._quote and not self._paragraph:
+            self._close_quote(out)
+        self._text(line, out)
+
+    def _text(self, line: str, out: List[str]) -> None:
+        text = render_inline(line.strip())
+        if self._paragraph:
+            out.append("\n" + text)
+        else:
+            out.append("<p>" + text)
+            self._paragraph = True
+
+    def _list_item(self, item: "re.Match[str]", out: List[str]) -> None:
+        self._close_paragraph(out)
+        self._close_quote(out)
+        indent = len(item.group(1).expandtabs(4))
+        tag = "ul" if item.group(2) else "ol"
+
+        while self._lists and self._lists[-1].indent > indent:
+            out.append(f"</li>\n</{self._lists.pop().tag}>\n")
+        if self._lists and self._lists[-1].indent == indent:
+            if self._lists[-1].tag == tag:
+                out.append("</li>\n")
+            else:
+                out.append(f"</li>\n</{self._lists.pop().tag}>\n")
+        if not self._lists or self._lists[-1].indent < indent:
+            start = item.group(3)
+            attributes = f' start="{int(start)}"' if start and int(start) != 1 else ""
+            out.append(f"{chr(10) if self._lists else ''}<{tag}{attributes}>\n")
+            self._lists.append(_OpenList(tag, indent))
+        out.append("<li>" + render_inline(item.group(4).strip()))
+
+    def _close_paragraph(self, out: List[str]) -> None:
+        if self._paragraph:
+            out.append("</p>\n")
+            self._paragraph = False
+
+    def _close_lists(self, out: List[str]) -> None:
+        while self._lists:
+            out.append(f"</li>\n</{self._lists.pop().tag}>\n")
+
+    def _close_quote(self, out: List[str]) -> None:
+        if self._quote:
+            self._close_paragraph(out)
+            out.append("</blockquote>\n")
+            self._quote = False
+
+    def _close_blocks(self, out: List[str]) -> None:
+        self._close_paragraph(out)
+        self._close_lists(out)
+        self._close_quote(out)
+
+def markdown_to_html(text: str) -> str:
+    """Convert a whole Markdown document in one pass"""
+    converter = MarkdownStream()
+    return converter.feed(text) + converter.finish()
@@ -0,0 +1,247 @@
+import bisect
+import contextvars
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from app.core.config import settings
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RATE_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0)
+
+# name -> (help text, bucket upper bounds)
+METRICS = {
+    "stage_duration_seconds": ("Time spent in each generation stage", SECONDS_BUCKETS),
+    "tokens_per_second": ("Streamed chunks per second after the first token", RATE_BUCKETS)
+}
+
+# name -> help text; gauges hold the latest value of each labelled series
+GAUGES = {
+    "model_resident": "Whether the model is loaded in Ollama (1) or not (0)",
+    "model_memory_bytes": "Memory the loaded model occupies, VRAM included",
+    "model_expires_in_seconds": "Time until Ollama unloads the model unless it is used again"
+}
+
+# Labels of the generation running in the current task, merged into everything it observes
+metric_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("metric_labels", default={})
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """Cumulative buckets for Prometheus plus a sliding sample window for exact quantiles"""
+
+    def __init__(self, buckets: Tuple[float, ...], window: int = 1024):
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+class MetricsRegistry:
+    """Thread-safe store of labelled histograms and gauges, rendered as Prometheus text or JSON"""
+
+    QUANTILES = (0.5, 0.95, 0.99)
+    PREFIX = "flowglow_"
+
+    def __init__(self, window: int = 1024, log_spans: bool = False):
+        self.window = window
+        self.log_spans = log_spans
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {name: {} for name in METRICS}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {name: {} for name in GAUGES}
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        labels = {**metric_labels.get(), **labels}
+        key: LabelKey = tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(METRICS[name][1], self.window)
+            histogram.observe(value)
+        if self.log_spans:
+            self._log(name, value, key)
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        key: LabelKey = tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+        with self._lock:
+            self._gauges[name][key] = value
+
+    def observe_stage(self, stage: str, seconds: float, **labels: Any) -> None:
+        self.observe("stage_duration_seconds", seconds, stage=stage, **labels)
+
+    @contextmanager
+    def span(self, stage: str, **labels: Any) -> Iterator[None]:
+        """Time the enclosed block as one stage, including when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            return {
+                name: [{"labels": dict(key), **histogram.snapshot()} for key, histogram in series.items()]
+                for name, series in self._histograms.items()
+            } | {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._gauges.items()
+            }
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                metric = self.PREFIX + name
+                lines.append(f"# HELP {metric} {METRICS[name][0]}")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    for bound, count in histogram.cumulative():
+                        le = "+Inf" if bound == math.inf else repr(bound)
+                        lines.append(f"{metric}_bucket{self._labels(key, le=le)} {count}")
+                    lines.append(f"{metric}_sum{self._labels(key)} {histogram.sum}")
+                    lines.append(f"{metric}_count{self._labels(key)} {histogram.count}")
+
+                quantiles = metric + "_quantile"
+                lines.append(f"# HELP {quantiles} Quantiles of {metric} over the last {self.window} samples")
+                lines.append(f"# TYPE {quantiles} gauge")
+                for key, histogram in series.items():
+                    for q in self.QUANTILES:
+                        value = histogram.quantile(q)
+                        if value is not None:
+                            lines.append(f"{quantiles}{self._labels(key, quantile=str(q))} {value}")
+
+            for name, series in self._gauges.items():
+                metric = self.PREFIX + name
+                lines.append(f"# HELP {metric} {GAUGES[name]}")
+                lines.append(f"# TYPE {metric} gauge")
+                for key, value in series.items():
+                    lines.append(f"{metric}{self._labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {name: {} for name in METRICS}
+            self._gauges = {name: {} for name in GAUGES}
+
+    @staticmethod
+    def _labels(key: LabelKey, **extra: str) -> str:
+        pairs = list(key) + list(extra.items())
+        if not pairs:
+            return ""
+        escaped = (f'{k}="{MetricsRegistry._escape(v)}"' for k, v in pairs)
+        return "{" + ",".join(escaped) + "}"
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def _log(self, name: str, value: float, key: LabelKey) -> None:
+        if self._logger is None:
+            from app.utils.logger import FlowGlowLogger
+            self._logger = FlowGlowLogger()
+        labels = ",".join(f"{k}={v}" for k, v in key)
+        self._logger.log_performance(f"{name}[{labels}]", value)
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        registry = self.server.registry
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(registry.snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class MetricsServer:
+    """Local HTTP endpoint serving /metrics (Prometheus) and /metrics.json from a daemon thread"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> "MetricsServer":
+        if self._server is None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _MetricsRequestHandler)
+            self._server.daemon_threads = True
+            self._server.registry = self.registry
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+_registry: Optional[MetricsRegistry] = None
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry(window=settings.METRICS_WINDOW, log_spans=settings.METRICS_LOG_SPANS)
+    return _registry
+
+def start_metrics_server() -> Optional[MetricsServer]:
+    """Serve the registry on the configured address; None when metrics are disabled or the port is taken"""
+    if not settings.METRICS_ENABLED:
+        return None
+    try:
+        return MetricsServer(get_metrics(), settings.METRICS_HOST, settings.METRICS_PORT).start()
+    except OSError as e:
+        # Metrics are optional; the app keeps running without the endpoint
+        from app.utils.logger import FlowGlowLogger
+        FlowGlowLogger().logger.warning(
+            "Metrics endpoint disabled, cannot listen on %s:%s: %s", settings.METRICS_HOST, settings.METRICS_PORT, e
+        )
+        return None
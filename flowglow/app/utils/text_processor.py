@@ -1,5 +1,11 @@
 from typing import Dict, List, Optional
+from app.core.config import settings
 from app.core.models import ContentRequest, ContentResponse, Platform
+from app.utils.markdown import MarkdownStream, markdown_to_html, render_inline
+from app.utils.thread_splitter import (
+    TWEET_NUMBER_WINDOW, ThreadSplitter, format_thread, split_thread, strip_tweet_numbers,
+    thread_prefix, tweet_number
+)
 import re
 
 class TextProcessor:
@@ -21,30 +27,8 @@ class TextProcessor:
     @staticmethod
     def _format_for_twitter(content: str) -> str:
         """Format content for Twitter, including thread creation"""
-        # Split into tweets if necessary
-        max_length = 280
-        tweets = []
-        words = content.split()
-        current_tweet = []
-        current_length = 0
-        
-        for word in words:
-            if current_length + len(word) + 1 <= max_length:
-                current_tweet.append(word)
-                current_length += len(word) + 1
-            else:
-                tweets.append(" ".join(current_tweet))
-                current_tweet = [word]
-                current_length = len(word)
-                
-        if current_tweet:
-            tweets.append(" ".join(current_tweet))
-            
-        # Add thread numbering if needed
-        if len(tweets) > 1:
-            return "\n\n".join(f"{i+1}/{len(tweets)} {tweet}" 
-                             for i, tweet in enumerate(tweets))
-        return tweets[0]
+        # Weighted lengths, with room reserved for the "i/N " numbering that replaces the model's own
+        return format_thread(split_thread(strip_tweet_numbers(content)))
     
     @staticmethod
     def _format_for_instagram(content: str) -> str:
@@ -79,16 +63,7 @@ class TextProcessor:
     @staticmethod
     def _format_for_blog(content: str) -> str:
         """Format content for blog posts, including HTML conversion"""
-        # Convert markdown-style formatting to HTML
-        html_content = content
-        # Convert headers
-        html_content = re.sub(r'## (.*?)\n', r'<h2>\1</h2>\n', html_content)
-        html_content = re.sub(r'# (.*?)\n', r'<h1>\1</h1>\n', html_content)
-        
-        # Convert paragraphs
-        html_content = re.sub(r'\n\n(.*?)\n\n', r'\n<p>\1</p>\n', html_content)
-        
-        return html_content
+        return markdown_to_html(content)
     
     @staticmethod
     def _extract_hashtags(content: str) -> List[str]:
@@ -98,4 +73,101 @@ class TextProcessor:
     @staticmethod
     def _remove_hashtags(content: str) -> str:
         """Remove hashtags from main content"""
-        return re.sub(r'#\w+\s*', '', content).strip()
\ No newline at end of file
+        return re.sub(r'#\w+\s*', '', content).strip()
+
+class StreamingFormatter:
+    """Platform formatting for content that is still being generated
+
+    update() takes the cleaned text so far and returns what to show: a Twitter thread
+    shows each tweet as soon as it is complete, other platforms the text as it is.
+    finish() formats the final content like TextProcessor.format_for_platform, except
+    for blog posts, which keep their Markdown while html carries the rendered preview.
+    """
+    
+    TAIL = 32  # trailing characters compared to tell appended text from a rewrite
+    
+    def __init__(self, platform: Platform):
+        self.platform = Platform(platform)
+        self.reset()
+    
+    def update(self, text: str) -> str:
+        """Feed the whole text so far; only the part not seen yet is formatted"""
+        if len(text) < self.length or not text.startswith(self._tail, self.length - len(self._tail)):
+            # The text was rewritten (e.g. a cleaned prefix was dropped): start over
+            self.reset()
+        delta = text[self.length:]
+        self.length = len(text)
+        self._tail = text[-self.TAIL:]
+        if self.platform == Platform.TWITTER:
+            return self._update_thread(delta)
+        if self.platform == Platform.BLOG:
+            self._html.append(self._markdown.feed(delta))
+        return text
+    
+    @property
+    def html(self) -> str:
+        """Rendered preview of a blog post so far, the unfinished line shown as plain text"""
+        if self.platform != Platform.BLOG:
+            return ""
+        return "".join(self._html) + render_inline(self._markdown.pending())
+    
+    def finish(self, content: str) -> str:
+        if self.platform == Platform.BLOG:
+            self._html, self._markdown = [markdown_to_html(content)], MarkdownStream()
+            return content
+        return TextProcessor.format_for_platform(content, self.platform)
+    
+    def reset(self) -> None:
+        self.length = 0
+        self._tail = ""
+        self._splitter = ThreadSplitter(max_tweets=settings.TWITTER_MAX_THREAD_TWEETS)
+        self._tweets: List[str] = []
+        self._held = ""  # start of a line, held until it is clear whether it opens with the model's numbering
+        self._line_start = True
+        self._position = 0  # tweets the model has started so far
+        self._new_tweet = True  # at the start, or after a blank line
+        self._total: Optional[int] = None  # thread length the model wrote in its numbering
+        self._markdown = MarkdownStream()
+        self._html: List[str] = []  # converted lines of a blog post
+    
+    def _start_line(self) -> None:
+        """Drop the model's numbering where a line starts its next tweet, as strip_tweet_numbers does
+
+        The thread's length is not known yet, so a written total has to match the one on
+        the model's earlier numbers instead.
+        """
+        newline = self._held.find("\n")
+        if not (self._held if newline < 0 else self._held[:newline]).strip():
+            self._new_tweet = True
+            return
+        position = self._position + 1
+        number = tweet_number(self._held)
+        if number and number[0] == position and self._total in (None, number[1]):
+            self._held = self._held[number[2]:]
+            self._total = self._total or number[1]
+            self._position = position
+        elif self._new_tweet:
+            self._position = position
+        self._new_tweet = False
+    
+    def _update_thread(self, delta: str) -> str:
+        self._held += delta
+        ready = ""
+        while self._held:
+            if self._line_start:
+                if "\n" not in self._held and len(self._held) < TWEET_NUMBER_WINDOW:
+                    break
+                self._start_line()
+                self._line_start = False
+            newline = self._held.find("\n")
+            if newline < 0:
+                ready, self._held = ready + self._held, ""
+            else:
+                ready, self._held = ready + self._held[:newline + 1], self._held[newline + 1:]
+                self._line_start = True
+        self._tweets.extend(self._splitter.feed(ready))
+        shown = [thread_prefix(index + 1) + tweet for index, tweet in enumerate(self._tweets)]
+        pending = self._splitter.pending()
+        if pending:
+            shown.append(pending)
+        return "\n\n".join(shown)
@@ -0,0 +1,296 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator, Iterator, List, Optional, Tuple
+
+# Twitter's weighted length (twitter-text v3): most scripts weigh 1, CJK, emoji and
+# everything else outside the light ranges weigh 2, and any URL weighs 23
+MAX_TWEET_WEIGHT = 280
+URL_WEIGHT = 23
+SCALE = 100  # weights are tracked in hundredths, as twitter-text does
+LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+
+URL_RE = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+URL_TRAILING = ".,:;!?)]}'\"’”"
+SENTENCE_END_RE = re.compile(r"[.!?…]+[\"')\]’”»]*$")
+WORD_RE = re.compile(r"(\S+)(\s+)")
+# Where the model starts the next tweet of a thread it wrote itself: a blank line, or a
+# new line opening with its own numbering ("2/5", "(2/5)", "2/", "Tweet 2:")
+TWEET_MARKER = r"(?:\(?\d{1,2}/(?:\d{1,2}|N)?\)?|Tweet\s*\d{1,2}\b)"
+TWEET_BREAK_RE = re.compile(rf"\n[ \t]*\n\s*|\n(?=[ \t]*{TWEET_MARKER})", re.IGNORECASE)
+# The model's numbering at the start of a tweet, dropped before the thread is renumbered
+TWEET_NUMBER_RE = re.compile(
+    r"[ \t]*(?:Tweet\s*(?P<tweet>\d{1,2})(?:/(?P<tweet_total>\d{1,2}|N))?|\(?(?P<index>\d{1,2})/(?P<total>\d{1,2}|N)?\)?)"
+    r"[:.)]?(?:[ \t]+|(?=\n)|$)",
+    re.IGNORECASE
+)
+TWEET_NUMBER_WINDOW = 16  # longer than any numbering TWEET_NUMBER_RE accepts
+
+ZWJ = "\u200d"
+REGIONAL_INDICATORS = (0x1F1E6, 0x1F1FF)
+
+def _is_extender(char: str) -> bool:
+    """Code points that never start a grapheme cluster of their own"""
+    code = ord(char)
+    if code < 0x300:  # nothing below the combining diacritics extends a cluster
+        return False
+    return (
+        unicodedata.category(char) in ("Mn", "Me", "Mc")
+        or 0xFE00 <= code <= 0xFE0F  # variation selectors
+        or 0x1F3FB <= code <= 0x1F3FF  # skin tone modifiers
+        or 0xE0020 <= code <= 0xE007F  # tag sequences (subdivision flags)
+        or 0xE0100 <= code <= 0xE01EF
+    )
+
+def _is_regional_indicator(char: str) -> bool:
+    return REGIONAL_INDICATORS[0] <= ord(char) <= REGIONAL_INDICATORS[1]
+
+def graphemes(text: str) -> Iterator[str]:
+    """User-perceived characters: combining marks, emoji ZWJ sequences, modifiers and flags stay together"""
+    cluster = ""
+    for char in text:
+        if cluster and (
+            _is_extender(char)
+            or cluster[-1] == ZWJ
+            or char == ZWJ
+            or (cluster[-1] == "\r" and char == "\n")
+            or (_is_regional_indicator(char) and len(cluster) == 1 and _is_regional_indicator(cluster))
+        ):
+            cluster += char
+            continue
+        if cluster:
+            yield cluster
+        cluster = char
+    if cluster:
+        yield cluster
+
+def _is_emoji(cluster: str) -> bool:
+    code = ord(cluster[0])
+    return (
+        0x1F000 <= code <= 0x1FAFF
+        or (0x2600 <= code <= 0x27BF and (len(cluster) > 1 or unicodedata.category(cluster[0]) == "So"))
+        or "\ufe0f" in cluster  # emoji presentation selector
+        or ZWJ in cluster
+    )
+
+def _char_weight(char: str) -> int:
+    code = ord(char)
+    for low, high in LIGHT_RANGES:
+        if low <= code <= high:
+            return SCALE
+    return 2 * SCALE
+
+def _cluster_weight(cluster: str) -> int:
+    if _is_emoji(cluster):
+        return 2 * SCALE  # a whole emoji sequence counts once
+    return sum(_char_weight(char) for char in cluster)
+
+def _text_weight(text: str) -> int:
+    if text.isascii():
+        return len(text) * SCALE  # no clusters or heavy characters to look for
+    return sum(_cluster_weight(cluster) for cluster in graphemes(text))
+
+def _weight(text: str) -> int:
+    """Weight in hundredths, with every URL counted at its fixed length"""
+    weight, last = 0, 0
+    for match in URL_RE.finditer(text):
+        url = match.group().rstrip(URL_TRAILING)
+        weight += _text_weight(text[last:match.start()]) + URL_WEIGHT * SCALE
+        last = match.start() + len(url)
+    return weight + _text_weight(text[last:])
+
+@lru_cache(maxsize=8192)
+def _word_weight(word: str) -> int:
+    return _weight(word)  # words repeat a lot in real text, so most lookups skip the scan
+
+def weighted_length(text: str) -> int:
+    """Length of text as Twitter counts it against the 280 limit"""
+    return _weight(unicodedata.normalize("NFC", text)) // SCALE
+
+def thread_tweets(text: str) -> List[str]:
+    """The tweets of a thread as the model wrote them, numbering included"""
+    return [tweet.strip() for tweet in TWEET_BREAK_RE.split(text) if tweet.strip()]
+
+def tweet_number(tweet: str) -> Optional[Tuple[int, Optional[int], int]]:
+    """Numbering the model wrote at the start of a tweet: (index, total or None, end of the number)"""
+    match = TWEET_NUMBER_RE.match(tweet)
+    if not match:
+        return None
+    index = int(match.group("tweet") or match.group("index"))
+    written = match.group("tweet_total") or match.group("total")
+    total = int(written) if written and written.isdigit() else None
+    if total is not None and total < index:
+        return None  # "24/7 support" is not a tweet number
+    return index, total, match.end()
+
+def strip_tweet_number(tweet: str, position: int, total: Optional[int] = None) -> str:
+    """Drop the model's own "2/5 " numbering from the start of the tweet at position
+
+    Only a number that fits the thread is dropped: its index must be the tweet's position
+    and its total, when there is one, the thread's length. A tweet opening with
+    "3/4 of people agree" or "1/2 price" keeps its fraction otherwise.
+    """
+    number = tweet_number(tweet)
+    if number is None or number[0] != position or number[1] not in (None, total):
+        return tweet
+    return tweet[number[2]:]
+
+def strip_tweet_numbers(text: str) -> str:
+    """The thread the model wrote, one tweet per paragraph, without its own numbering"""
+    tweets = thread_tweets(text)
+    return "\n\n".join(strip_tweet_number(tweet, index + 1, len(tweets)) for index, tweet in enumerate(tweets))
+
+def thread_prefix(index: int, total: Optional[int] = None) -> str:
+    return f"{index}/{total} " if total else f"{index}/ "
+
+class ThreadSplitter:
+    """Incremental thread splitter: feed streamed text, get each tweet back as soon as it is complete
+
+    Tweets hold whole sentences where they fit, fall back to word boundaries for long
+    sentences and to grapheme boundaries for words longer than a tweet. Room for the
+    "i/N " numbering is reserved up front, so numbered tweets never exceed the limit.
+    """
+
+    def __init__(self, max_weight: int = MAX_TWEET_WEIGHT, numbering: bool = True, max_tweets: int = 99):
+        reserve = weighted_length(thread_prefix(max_tweets, max_tweets)) if numbering else 0
+        self.budget = (max_weight - reserve) * SCALE
+        self._partial = ""  # an unfinished word at the end of the streamed text
+        self._gap = ""  # whitespace after the last complete word
+        self._tweet: List[str] = []  # complete sentences of the tweet being filled
+        self._tweet_weight = 0
+        self._sentence: List[str] = []
+        self._sentence_weights: List[int] = []
+        self._sentence_weight = 0
+        self.count = 0
+
+    def feed(self, delta: str) -> List[str]:
+        """Consume streamed text and return the tweets it completed"""
+        text = self._partial + delta
+        ready: List[str] = []
+        # Whitespace only arrives at the start when the previous chunk ended on a complete word
+        last = len(text) - len(text.lstrip())
+        if last:
+            self._gap += text[:last]
+            self._check_paragraph()
+        for match in WORD_RE.finditer(text, last):
+            word, self._gap = match.groups()
+            self._add_word(word, ready)
+            if SENTENCE_END_RE.search(word):
+                self._end_sentence()
+            self._check_paragraph()
+            last = match.end()
+        self._partial = text[last:]
+        return ready
+
+    def finish(self) -> List[str]:
+        """Flush the last word, sentence and tweet once the stream has ended"""
+        ready: List[str] = []
+        if self._partial:
+            self._add_word(self._partial, ready)
+            self._partial = ""
+        self._end_sentence()
+        if self._tweet:
+            ready.append(self._emit(self._tweet))
+            self._tweet, self._tweet_weight = [], 0
+        return ready
+
+    def pending(self) -> str:
+        """Text fed so far that is not part of a complete tweet yet"""
+        return " ".join(self._tweet + self._sentence + ([self._partial] if self._partial else []))
+
+    def _check_paragraph(self) -> None:
+        if self._gap.count("\n") >= 2:
+            self._end_sentence()
+
+    def _separator(self, used: int) -> int:
+        return SCALE if used else 0
+
+    def _add_word(self, word: str, ready: List[str]) -> None:
+        word = unicodedata.normalize("NFC", word)
+        weight = _word_weight(word)
+        self._sentence.append(word)
+        self._sentence_weights.append(weight)
+        self._sentence_weight += self._separator(len(self._sentence) > 1) + weight
+
+        pending = self._tweet_weight + self._separator(self._tweet_weight) + self._sentence_weight
+        if pending <= self.budget:
+            return
+        # The open sentence no longer fits next to the finished ones, so that tweet is complete
+        if self._tweet:
+            ready.append(self._emit(self._tweet))
+            self._tweet, self._tweet_weight = [], 0
+        if self._sentence_weight > self.budget:
+            self._split_sentence(ready)
+
+    def _split_sentence(self, ready: List[str]) -> None:
+        """Emit word-boundary tweets from a sentence too long for one, keeping the tail open"""
+        words, weights = self._sentence, self._sentence_weights
+        start, used = 0, 0
+        for index, weight in enumerate(weights[:-1]):
+            cost = self._separator(used) + weight
+            if used + cost > self.budget:
+                ready.append(self._emit(words[start:index]))
+                start, used, cost = index, 0, weight
+            used += cost
+        self._sentence, self._sentence_weights = words[start:], weights[start:]
+        self._sentence_weight = sum(self._sentence_weights) + SCALE * (len(self._sentence) - 1)
+
+        if self._sentence_weight > self.budget and len(self._sentence) > 1:
+            # The last word does not fit after the others; the others make a tweet on their own
+            ready.append(self._emit(self._sentence[:-1]))
+            self._sentence, self._sentence_weights = self._sentence[-1:], self._sentence_weights[-1:]
+            self._sentence_weight = self._sentence_weights[0]
+        if self._sentence_weight > self.budget:
+            self._split_word(ready)
+
+    def _split_word(self, ready: List[str]) -> None:
+        """Break a single over-long word at grapheme boundaries"""
+        piece, used = "", 0
+        for cluster in graphemes(self._sentence[0]):
+            weight = _cluster_weight(cluster)
+            if used + weight > self.budget:
+                ready.append(self._emit([piece]))
+                piece, used = "", 0
+            piece += cluster
+            used += weight
+        self._sentence, self._sentence_weights, self._sentence_weight = [piece], [used], used
+
+    def _end_sentence(self) -> None:
+        if not self._sentence:
+            return
+        self._tweet_weight += self._separator(self._tweet_weight) + self._sentence_weight
+        self._tweet.append(" ".join(self._sentence))
+        self._sentence, self._sentence_weights, self._sentence_weight = [], [], 0
+
+    def _emit(self, parts: List[str]) -> str:
+        self.count += 1
+        return " ".join(parts)
+
+def split_thread(text: str, max_weight: int = MAX_TWEET_WEIGHT) -> List[str]:
+    """Split text into tweet bodies that still fit once numbered as "i/N " """
+    total = weighted_length(" ".join(text.split()))
+    if total <= max_weight:
+        return [" ".join(text.split())] if text.strip() else []
+    digits = len(str(-(-total // max_weight)))
+    while True:
+        # Reserve room for the widest "N/N " prefix; retry in the rare case N gains a digit
+        splitter = ThreadSplitter(max_weight, max_tweets=10 ** digits - 1)
+        tweets = splitter.feed(text) + splitter.finish()
+        if len(str(len(tweets))) <= digits:
+            return tweets
+        digits = len(str(len(tweets)))
+
+def format_thread(tweets: List[str]) -> str:
+    if len(tweets) <= 1:
+        return tweets[0] if tweets else ""
+    return "\n\n".join(thread_prefix(i + 1, len(tweets)) + tweet for i, tweet in enumerate(tweets))
+
+async def stream_thread(chunks: AsyncIterable[str], max_weight: int = MAX_TWEET_WEIGHT,
+                        max_tweets: int = 99) -> AsyncIterator[str]:
+    """Yield tweet bodies from a streamed completion as soon as each one is complete"""
+    splitter = ThreadSplitter(max_weight, max_tweets=max_tweets)
+    async for chunk in chunks:
+        for tweet in splitter.feed(chunk):
+            yield tweet
+    for tweet in splitter.finish():
+        yield tweet
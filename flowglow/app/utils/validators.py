@@ -1,5 +1,9 @@
-from typing import Dict, Optional, Tuple
-from app.core.models import ContentRequest, ContentType, Platform
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.models import ContentRequest, ContentType, Platform, ValidationIssue
+from app.utils.lexicon import LexiconMatcher, get_prohibited_lexicon
+from app.utils.metrics import get_metrics
+from app.utils.thread_splitter import TWEET_BREAK_RE, thread_tweets, weighted_length
 import re
 
 class ContentValidator:
@@ -35,16 +39,23 @@ class ContentValidator:
     @classmethod
     def validate_content(cls, content: str, platform: Platform) -> Tuple[bool, Optional[str]]:
         """Validate generated content"""
-        # Check content length
-        max_length = cls.PLATFORM_LIMITS.get(platform)
-        if max_length and len(content) > max_length:
-            return False, f"Content exceeds maximum length for {platform}"
-            
-        # Check for prohibited content
-        if cls._contains_prohibited_content(content):
-            return False, "Content contains prohibited elements"
-            
-        return True, None
+        with get_metrics().span("validation", platform=Platform(platform).value):
+            # Check content length; a Twitter thread is limited per tweet and in tweet count
+            max_length = cls.PLATFORM_LIMITS.get(platform)
+            if Platform(platform) == Platform.TWITTER:
+                tweets = thread_tweets(content)
+                if any(weighted_length(tweet) > max_length for tweet in tweets):
+                    return False, f"Content exceeds maximum length for {platform}"
+                if len(tweets) > settings.TWITTER_MAX_THREAD_TWEETS:
+                    return False, f"Thread exceeds {settings.TWITTER_MAX_THREAD_TWEETS} tweets"
+            elif max_length and len(content) > max_length:
+                return False, f"Content exceeds maximum length for {platform}"
+                
+            # Check for prohibited content
+            if cls._contains_prohibited_content(content):
+                return False, "Content contains prohibited elements"
+                
+            return True, None
     
     @staticmethod
     def _validate_twitter(request: ContentRequest) -> Tuple[bool, Optional[str]]:
@@ -61,13 +72,125 @@ class ContentValidator:
         return True, None
     
     @staticmethod
-    def _contains_prohibited_content(content: str) -> bool:
+    def prohibited_lexicon() -> LexiconMatcher:
+        return get_prohibited_lexicon()
+    
+    @classmethod
+    def validate_many(cls, contents: List[str], platform: Platform) -> List[Tuple[bool, Optional[str]]]:
+        """Validate a batch of generated contents against one platform"""
+        return [cls.validate_content(content, platform) for content in contents]
+    
+    @classmethod
+    def _contains_prohibited_content(cls, content: str) -> bool:
         """Check for prohibited content patterns"""
-        prohibited_patterns = [
-            r'(?i)spam',
-            r'(?i)abuse',
-            r'(?i)explicit',
-            # Add more patterns as needed
-        ]
+        return cls.prohibited_lexicon().contains(content)
+
+class StreamingValidator:
+    """Incremental counterpart of ContentValidator.validate_content for text that is still being generated"""
+    
+    def __init__(self, platform: Platform, max_length: Optional[int] = None, max_tweets: Optional[int] = None):
+        self.platform = Platform(platform)
+        self.max_length = max_length if max_length is not None else ContentValidator.PLATFORM_LIMITS.get(self.platform)
+        # Twitter output is a thread: max_length applies to each tweet, max_tweets to the thread
+        self.thread = self.platform == Platform.TWITTER
+        self.max_tweets = max_tweets if max_tweets is not None else settings.TWITTER_MAX_THREAD_TWEETS
+        self.tweets = 0  # complete tweets so far
+        self._tweet = ""  # the tweet still being written
+        self._tweet_start = 0
+        self.lexicon = ContentValidator.prohibited_lexicon()
+        # Trailing characters rescanned with each chunk so terms spanning two chunks are found
+        self.overlap = max(self.lexicon.max_term_length, 1) + 1
+        self.length = 0
+        self.issue: Optional[ValidationIssue] = None
+        self._tail = ""
+    
+    def feed(self, delta: str) -> Optional[ValidationIssue]:
+        """Scan newly generated text; returns the first issue found, which stays set"""
+        if self.issue is not None or not delta:
+            return self.issue
         
-        return any(re.search(pattern, content) for pattern in prohibited_patterns)
\ No newline at end of file
+        window = self._tail + delta
+        self._check_prohibited(window, self.length - len(self._tail))
+        self.length += len(delta)
+        if self.issue is None and self.thread:
+            self._check_thread(delta)
+        elif self.issue is None and self.max_length and self.length > self.max_length:
+            self.issue = ValidationIssue(
+                code="length_exceeded",
+                message=f"Content exceeds maximum length for {self.platform.value}",
+                platform=self.platform,
+                position=self.max_length,
+                limit=self.max_length
+            )
+        
+        self._tail = window[-self.overlap:]
+        return self.issue
+    
+    def finish(self) -> Optional[ValidationIssue]:
+        """Settle a whole-word term left at the very end of the stream"""
+        if self.issue is None and self._tail:
+            self._check_prohibited(self._tail, self.length - len(self._tail), final=True)
+        return self.issue
+    
+    def _check_thread(self, delta: str) -> None:
+        text = self._tweet + delta
+        breaks = list(TWEET_BREAK_RE.finditer(text))
+        starts = [0] + [match.end() for match in breaks]
+        ends = [match.start() for match in breaks] + [len(text)]
+        for index, (start, end) in enumerate(zip(starts, ends)):
+            tweet = text[start:end].strip()
+            if not tweet:
+                continue
+            position = self._tweet_start + start
+            if self.tweets >= self.max_tweets:
+                self.issue = ValidationIssue(
+                    code="thread_too_long",
+                    message=f"Thread exceeds {self.max_tweets} tweets",
+                    platform=self.platform,
+                    position=position,
+                    limit=self.max_tweets
+                )
+                return
+            if self.max_length and weighted_length(tweet) > self.max_length:
+                self.issue = ValidationIssue(
+                    code="length_exceeded",
+                    message=f"Tweet {self.tweets + 1} exceeds maximum length for {self.platform.value}",
+                    platform=self.platform,
+                    position=position,
+                    limit=self.max_length
+                )
+                return
+            if index < len(breaks):
+                self.tweets += 1
+        self._tweet = text[starts[-1]:]
+        self._tweet_start += starts[-1]
+    
+    def _check_prohibited(self, window: str, offset: int, final: bool = False) -> None:
+        for match in self.lexicon.finditer(window):
+            # A whole-word term touching the end may still grow into a longer, harmless word
+            if not final and match.end == len(window) and self.lexicon.is_bounded(match.term):
+                continue
+            self.issue = ValidationIssue(
+                code="prohibited_content",
+                message="Content contains prohibited elements",
+                platform=self.platform,
+                position=offset + match.start,
+                match=match.term
+            )
+            return
+    
+    def update(self, text: str) -> Optional[ValidationIssue]:
+        """Feed the whole text so far; only the part not seen yet is scanned"""
+        if len(text) >= self.length and text.startswith(self._tail, self.length - len(self._tail)):
+            return self.feed(text[self.length:])
+        # The text was rewritten (e.g. a cleaned prefix was dropped): start over
+        self.reset()
+        return self.feed(text)
+    
+    def reset(self) -> None:
+        self.length = 0
+        self.issue = None
+        self._tail = ""
+        self.tweets = 0
+        self._tweet = ""
+        self._tweet_start = 0
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""Offline load benchmarks against local stand-ins for Ollama and Unsplash"""
+import os
+
+# The stub Unsplash server accepts any key; a real one is not needed to run offline
+os.environ.setdefault("UNSPLASH_API_KEY", "benchmark")
+
+from .runner import BenchmarkConfig, run_benchmark
+from .stubs import StubConfig, StubOllamaServer, StubUnsplashServer
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+from .runner import SCENARIOS, BenchmarkConfig, compare, format_report, run_benchmark, save_results
+from .stubs import StubConfig
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Load-test FlowGlow against local stub Ollama and Unsplash servers"
+    )
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="stream")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--distinct", type=int, default=0, help="distinct prompts; 0 makes every request unique")
+    parser.add_argument("--cache", action="store_true", help="enable the response and image caches")
+    parser.add_argument("--backend-concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--token-rate", type=float, default=100.0)
+    parser.add_argument("--tokens", type=int, default=120)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--image-latency", type=float, default=0.03)
+    parser.add_argument("--image-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--trace-memory", action="store_true", help="also report the Python heap peak (slower)")
+    parser.add_argument(
+        "--output",
+        help="JSON report path, a directory, or a template using {scenario} and {time}; "
+             "defaults to benchmarks/results/{scenario}-{time}.json"
+    )
+    parser.add_argument("--compare", help="earlier JSON report of the same scenario to diff against")
+    args = parser.parse_args(argv)
+    if args.scenario == "all" and args.output and not _is_template(args.output) and args.output.endswith(".json"):
+        parser.error("--output names a single file; with --scenario all use a directory or a {scenario} template")
+    return args
+
+def _is_template(output: str) -> bool:
+    return "{scenario}" in output
+
+def output_path(output: Optional[str], scenario: str, stamp: str, several: bool = False) -> str:
+    """Where the report of one scenario goes; several reports never share a path"""
+    if not output:
+        output = "benchmarks/results/{scenario}-{time}.json"
+    elif not _is_template(output) and (several or os.path.isdir(output) or not output.endswith(".json")):
+        output = os.path.join(output, "{scenario}-{time}.json")
+    return output.format(scenario=scenario, time=stamp)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    scenarios = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    for scenario in scenarios:
+        config = BenchmarkConfig(
+            scenario=scenario,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            distinct=args.distinct,
+            cache=args.cache,
+            backend_concurrency=args.backend_concurrency,
+            llm=StubConfig(args.llm_latency, args.token_rate, args.tokens, args.llm_error_rate, args.seed),
+            images=StubConfig(latency=args.image_latency, error_rate=args.image_error_rate, seed=args.seed),
+            trace_memory=args.trace_memory
+        )
+        report = run_benchmark(config)
+        path = save_results(report, output_path(args.output, scenario, stamp, several=len(scenarios) > 1))
+        print(format_report(report))
+        print(f"saved        {path}")
+
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)
+            if baseline["benchmark"]["scenario"] == scenario:
+                print("\n".join(compare(report, baseline)))
+        print()
+
+if __name__ == "__main__":
+    main()
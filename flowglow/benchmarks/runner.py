@@ -0,0 +1,287 @@
+import asyncio
+import json
+import math
+import platform as platform_info
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import aclosing, contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+from app.core import image_handler as image_handler_module
+from app.core import scheduler as scheduler_module
+from app.core.cache import ImageCache
+from app.core.config import settings
+from app.core.http_client import close_http_clients
+from app.core.llm_handler import LLMHandler
+from app.core.models import ContentRequest, Platform
+from app.core.prompts import ContentPromptManager
+from app.utils.metrics import get_metrics
+from app.utils.validators import ContentValidator
+from .stubs import StubConfig, StubOllamaServer, StubUnsplashServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+@dataclass
+class BenchmarkConfig:
+    """One benchmark run: the scenario, the load and the behaviour of the stub backends"""
+    scenario: str = "stream"
+    requests: int = 50
+    concurrency: int = 8
+    warmup: int = 2
+    distinct: int = 0  # distinct prompts/queries; 0 makes every request unique
+    cache: bool = False
+    backend_concurrency: int = 8
+    llm: StubConfig = field(default_factory=StubConfig)
+    images: StubConfig = field(default_factory=lambda: StubConfig(latency=0.03))
+    trace_memory: bool = False
+
+@dataclass
+class Sample:
+    latency: float
+    ttft: Optional[float] = None
+    ok: bool = True
+
+class BenchmarkContext:
+    """Everything a scenario needs to issue request number i"""
+
+    def __init__(self, config: BenchmarkConfig, handler: LLMHandler):
+        self.config = config
+        self.handler = handler
+
+    def key(self, index: int) -> int:
+        return index % self.config.distinct if self.config.distinct else index
+
+    def request(self, index: int) -> ContentRequest:
+        platforms = list(Platform)
+        key = self.key(index)
+        return ContentRequest(
+            platform=platforms[key % len(platforms)],
+            topic=f"Benchmark topic {key}",
+            audience="performance engineers",
+            tone="professional"
+        )
+
+    def prompt(self, index: int) -> str:
+        return ContentPromptManager.get_prompt(self.request(index))
+
+async def _generate(ctx: BenchmarkContext, index: int) -> Sample:
+    started = time.perf_counter()
+    await ctx.handler.generate(ctx.prompt(index), raise_errors=True)
+    return Sample(time.perf_counter() - started)
+
+async def _stream(ctx: BenchmarkContext, index: int) -> Sample:
+    started = time.perf_counter()
+    ttft = None
+    async with aclosing(ctx.handler.stream(ctx.prompt(index), raise_errors=True)) as updates:
+        async for _ in updates:
+            if ttft is None:
+                ttft = time.perf_counter() - started
+    return Sample(time.perf_counter() - started, ttft)
+
+async def _images(ctx: BenchmarkContext, index: int) -> Sample:
+    started = time.perf_counter()
+    await ctx.handler.image_handler.search(f"benchmark photo {ctx.key(index)}")
+    return Sample(time.perf_counter() - started)
+
+async def _pipeline(ctx: BenchmarkContext, index: int) -> Sample:
+    """Prompt build, streamed generation with an image, and validation, as the UI runs them"""
+    started = time.perf_counter()
+    request = ctx.request(index)
+    prompt = ContentPromptManager.get_prompt(request)
+    ttft, content = None, ""
+    updates = ctx.handler.stream(prompt, include_image=True, request=request, raise_errors=True)
+    async with aclosing(updates):
+        async for content, _ in updates:
+            if ttft is None:
+                ttft = time.perf_counter() - started
+    ContentValidator.validate_content(content, request.platform)
+    return Sample(time.perf_counter() - started, ttft)
+
+SCENARIOS: Dict[str, Callable[[BenchmarkContext, int], Awaitable[Sample]]] = {
+    "generate": _generate,
+    "stream": _stream,
+    "images": _images,
+    "pipeline": _pipeline
+}
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    return {
+        "p50": rank(0.5),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "mean": sum(ordered) / len(ordered),
+        "max": ordered[-1]
+    }
+
+async def _drive(ctx: BenchmarkContext, scenario: Callable, count: int, offset: int) -> List[Sample]:
+    """Issue count requests with at most config.concurrency in flight"""
+    indices = iter(range(offset, offset + count))
+    samples: List[Sample] = []
+
+    async def worker() -> None:
+        for index in indices:
+            started = time.perf_counter()
+            try:
+                samples.append(await scenario(ctx, index))
+            except Exception:  # scenarios raise on failure, including a full backend queue
+                samples.append(Sample(time.perf_counter() - started, ok=False))
+
+    await asyncio.gather(*(worker() for _ in range(min(ctx.config.concurrency, count) or 1)))
+    return samples
+
+async def _run(config: BenchmarkConfig) -> Dict[str, Any]:
+    handler = LLMHandler()
+    ctx = BenchmarkContext(config, handler)
+    scenario = SCENARIOS[config.scenario]
+
+    try:
+        if config.warmup:
+            await _drive(ctx, scenario, config.warmup, offset=config.requests)
+        get_metrics().reset()
+
+        started = time.perf_counter()
+        samples = await _drive(ctx, scenario, config.requests, offset=0)
+        wall = time.perf_counter() - started
+    finally:
+        if handler.response_cache:
+            handler.response_cache.close()
+        await close_http_clients()
+
+    succeeded = [s for s in samples if s.ok]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(succeeded),
+        "wall_time": wall,
+        "throughput": len(succeeded) / wall if wall else 0.0,
+        "latency": summarize([s.latency for s in succeeded]),
+        "ttft": summarize([s.ttft for s in succeeded if s.ttft is not None]),
+        "stages": get_metrics().snapshot(),
+        "coalescing": dict(handler.flights.stats),
+        "scheduler": handler.scheduler.snapshot()
+    }
+
+@contextmanager
+def _isolated(config: BenchmarkConfig, ollama_url: str, unsplash_url: str) -> Iterator[None]:
+    """Point the app at the stubs with fresh shared state, restoring everything afterwards"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        overrides = {
+            "OLLAMA_HOST": ollama_url,
+            "UNSPLASH_API_URL": unsplash_url,
+            "ENABLE_CACHE": config.cache,
+            "CACHE_PATH": str(Path(cache_dir) / "responses.db"),
+            "IMAGE_STORE_ENABLED": False,
+            "SCHEDULER_CONCURRENCY": {"ollama": config.backend_concurrency, "groq": config.backend_concurrency},
+            "SCHEDULER_MAX_QUEUE": max(settings.SCHEDULER_MAX_QUEUE, config.concurrency)
+        }
+        saved = {name: getattr(settings, name) for name in overrides}
+        singletons = (scheduler_module._scheduler, image_handler_module._image_cache)
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+        scheduler_module._scheduler = None
+        image_handler_module._image_cache = ImageCache(max_entries=10_000, ttl=3600) if config.cache else ImageCache(0)
+        try:
+            yield
+        finally:
+            for name, value in saved.items():
+                setattr(settings, name, value)
+            scheduler_module._scheduler, image_handler_module._image_cache = singletons
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(config: BenchmarkConfig) -> Dict[str, Any]:
+    """Run one scenario against fresh stub servers and return a JSON-serialisable report"""
+    if config.scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {config.scenario}")
+
+    with StubOllamaServer(config.llm, model=settings.OLLAMA_MODEL) as ollama, \
+            StubUnsplashServer(config.images) as unsplash, \
+            _isolated(config, ollama.url, unsplash.url):
+        if config.trace_memory:
+            tracemalloc.start()
+        try:
+            results = asyncio.run(_run(config))
+            if config.trace_memory:
+                results["python_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            if config.trace_memory:
+                tracemalloc.stop()
+        results["aborted_streams"] = ollama.stats.get("aborted", 0)
+
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return {
+        "benchmark": asdict(config),
+        "environment": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform_info.python_version(),
+            "platform": platform_info.platform(),
+            "commit": _git_commit()
+        },
+        "results": results
+    }
+
+def save_results(report: Dict[str, Any], path: str) -> Path:
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    return output
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Relative change of the headline numbers against an earlier report"""
+    lines = []
+    current, previous = report["results"], baseline["results"]
+    for metric, stats in (("latency", ("p50", "p95", "p99")), ("ttft", ("p50", "p95", "p99"))):
+        for stat in stats:
+            lines.append(_delta(f"{metric}.{stat}", current[metric][stat], previous[metric][stat]))
+    lines.append(_delta("throughput", current["throughput"], previous["throughput"]))
+    return [line for line in lines if line]
+
+def _delta(name: str, value: Optional[float], baseline: Optional[float]) -> Optional[str]:
+    if value is None or baseline is None:
+        return None
+    change = (value - baseline) / baseline * 100 if baseline else 0.0
+    return f"{name:<12} {baseline:10.4f} -> {value:10.4f} ({change:+.1f}%)"
+
+def format_report(report: Dict[str, Any]) -> str:
+    results = report["results"]
+    lines = [
+        f"scenario     {report['benchmark']['scenario']}  "
+        f"({results['requests']} requests, concurrency {report['benchmark']['concurrency']})",
+        f"errors       {results['errors']}",
+        f"throughput   {results['throughput']:.2f} req/s",
+    ]
+    for metric in ("latency", "ttft"):
+        stats = results[metric]
+        if stats["p50"] is not None:
+            lines.append(f"{metric:<12} p50 {stats['p50']:.4f}s  p95 {stats['p95']:.4f}s  p99 {stats['p99']:.4f}s")
+    if results.get("peak_rss_mb") is not None:
+        lines.append(f"peak rss     {results['peak_rss_mb']:.1f} MB")
+    if results.get("python_peak_mb") is not None:
+        lines.append(f"python peak  {results['python_peak_mb']:.1f} MB")
+    return "\n".join(lines)
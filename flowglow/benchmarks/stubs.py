@@ -0,0 +1,214 @@
+import json
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+WORDS = (
+    "content strategy audience growth brand story insight engagement campaign "
+    "platform creative trend value community launch design data impact"
+).split()
+
+UNITS = {"s": 1, "m": 60, "h": 3600}
+
+@dataclass
+class StubConfig:
+    """Behaviour of a stand-in backend"""
+    latency: float = 0.05  # seconds before the first byte (prompt evaluation, API round trip)
+    token_rate: float = 100.0  # streamed tokens per second
+    tokens: int = 120  # tokens per completion
+    error_rate: float = 0.0  # share of requests answered with HTTP 500
+    seed: Optional[int] = None
+
+def _duration(keep_alive) -> float:
+    """Seconds in an Ollama keep_alive: a number of seconds or a duration like "30m"; negative never expires"""
+    if isinstance(keep_alive, str) and keep_alive[-1:] in UNITS:
+        seconds = float(keep_alive[:-1]) * UNITS[keep_alive[-1]]
+    else:
+        seconds = float(keep_alive)
+    return seconds if seconds >= 0 else 10 * 365 * 86400
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def config(self) -> StubConfig:
+        return self.server.config
+
+    def _inject_error(self) -> bool:
+        with self.server.lock:
+            failed = self.server.random.random() < self.config.error_rate
+        if failed:
+            self._send_json({"error": "injected failure"}, status=500)
+        return failed
+
+    def _send_json(self, data, status: int = 200) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class _OllamaHandler(_StubHandler):
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": f"{self.server.model}:latest"}]})
+        elif self.path == "/api/ps":
+            with self.server.lock:
+                self._send_json({"models": list(self.server.loaded.values())})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.config.latency)
+        if self._inject_error():
+            return
+        self._load(request)
+        if not request.get("prompt"):
+            # An empty prompt only loads the model, as Ollama does
+            self._send_json({"model": request.get("model"), "response": "", "done": True, "done_reason": "load"})
+            return
+
+        tokens = [random.choice(WORDS) + " " for _ in range(self.config.tokens)]
+        if not request.get("stream", True):
+            time.sleep(len(tokens) / self.config.token_rate)
+            self._send_json({"model": request.get("model"), "response": "".join(tokens), "done": True})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in tokens:
+                self._write_chunk({"model": request.get("model"), "response": token, "done": False})
+                time.sleep(1 / self.config.token_rate)
+            self._write_chunk({"model": request.get("model"), "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away, which is exactly what a cancelled generation looks like
+            with self.server.lock:
+                self.server.stats["aborted"] += 1
+
+    def _load(self, request: dict) -> None:
+        seconds = _duration(request.get("keep_alive", "5m"))
+        name = request.get("model", self.server.model)
+        name = name if ":" in name else f"{name}:latest"
+        expires = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+        with self.server.lock:
+            self.server.loaded[name] = {
+                "name": name, "model": name, "size": 4_000_000_000, "size_vram": 4_000_000_000,
+                "expires_at": expires.isoformat()
+            }
+
+    def _write_chunk(self, data) -> None:
+        line = (json.dumps(data) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+class _UnsplashHandler(_StubHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/search/photos":
+            self.send_error(404)
+            return
+        time.sleep(self.config.latency)
+        if self._inject_error():
+            return
+
+        params = parse_qs(url.query)
+        query = params.get("query", [""])[0]
+        per_page = int(params.get("per_page", ["10"])[0])
+        base = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}/photos"
+        photo = zlib.crc32(query.encode("utf-8"))
+        results = [
+            {
+                "id": f"{photo}-{i}",
+                "urls": {size: f"{base}/{photo}-{i}.jpg?size={size}"
+                         for size in ("raw", "full", "regular", "small", "thumb")},
+                "user": {"name": "Stub Photographer"}
+            }
+            for i in range(per_page)
+        ]
+        self._send_json({"total": 1000, "total_pages": 1000 // max(per_page, 1), "results": results})
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 turns reconnect bursts into 1s SYN retries
+
+class StubServer:
+    """Threaded local HTTP server emulating one external backend"""
+
+    handler_class = _StubHandler
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StubConfig()
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stats(self) -> dict:
+        return self._server.stats if self._server else {}
+
+    def start(self) -> "StubServer":
+        server = _Server((self.host, self.port), self.handler_class)
+        server.config = self.config
+        server.random = random.Random(self.config.seed)
+        server.lock = threading.Lock()
+        server.stats = {"aborted": 0}
+        self._configure(server)
+        self._server = server
+        self.port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _configure(self, server: ThreadingHTTPServer) -> None:
+        pass
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+class StubOllamaServer(StubServer):
+    """Ollama's /api/generate (streaming, not streaming and model loads), /api/tags and /api/ps"""
+
+    handler_class = _OllamaHandler
+
+    def __init__(self, config: Optional[StubConfig] = None, model: str = "mistral", **kwargs):
+        super().__init__(config, **kwargs)
+        self.model = model
+
+    def _configure(self, server: ThreadingHTTPServer) -> None:
+        server.model = self.model
+        server.loaded = {}  # model -> /api/ps entry
+
+class StubUnsplashServer(StubServer):
+    """Unsplash's /search/photos"""
+
+    handler_class = _UnsplashHandler
@@ -1,71 +1,85 @@
 # flowglow/main.py
-import subprocess
 import time
+STARTED = time.perf_counter()
+
+import subprocess
 import sys
-import os
-from app.interface.gradio_app import launch_app
 import atexit
-
-def is_ollama_running():
-    """Check if Ollama service is running"""
-    try:
-        import socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        result = sock.connect_ex(('127.0.0.1', 11434))
-        sock.close()
-        return result == 0
-    except:
-        return False
+from app.core.config import settings
+from app.core.startup import StartupTimer, ollama_ready, wait_for_ollama
+from app.core.warmup import create_model_keeper
 
 def start_ollama():
     """Start Ollama service"""
     try:
         print("Starting Ollama service...")
-        # Start Ollama as a background process
-        process = subprocess.Popen(
+        # Start Ollama as a background process; unread pipes would eventually block its logging
+        return subprocess.Popen(
             ['ollama', 'serve'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
         )
-        
-        # Wait for service to start
-        time.sleep(2)
-        return process
     except Exception as e:
         print(f"Error starting Ollama: {e}")
         return None
 
 def stop_ollama(process):
     """Stop Ollama service"""
-    if process:
+    if process and process.poll() is None:
         process.terminate()
         process.wait()
         print("\nOllama service stopped")
 
 def main():
+    timer = StartupTimer(STARTED)
+    timer.record("imports", time.perf_counter() - STARTED)
+    with timer.phase("settings"):
+        settings.load()
+
     # Check if Ollama is already running
     ollama_process = None
-    if not is_ollama_running():
+    if not ollama_ready(settings.OLLAMA_HOST):
         ollama_process = start_ollama()
         if not ollama_process:
             print("Failed to start Ollama service. Please start it manually with 'ollama serve'")
             sys.exit(1)
-        
-        # Wait for Ollama to fully start
-        time.sleep(5)
-        print("Ollama service started successfully")
-    
-    # Register cleanup function
-    if ollama_process:
         atexit.register(lambda: stop_ollama(ollama_process))
-    
+
+    # The UI stack is the slowest import, so it loads while Ollama boots
+    with timer.phase("imports"):
+        from app.interface.gradio_app import launch_app
+
+    if ollama_process:
+        with timer.phase("ollama_ready"):
+            ready = wait_for_ollama(
+                settings.OLLAMA_HOST,
+                timeout=settings.OLLAMA_STARTUP_TIMEOUT,
+                initial_delay=settings.OLLAMA_POLL_INITIAL_DELAY,
+                max_delay=settings.OLLAMA_POLL_MAX_DELAY,
+                process=ollama_process
+            )
+        if not ready:
+            print("Ollama service did not become ready. Please start it manually with 'ollama serve'")
+            stop_ollama(ollama_process)
+            sys.exit(1)
+        print("Ollama service started successfully")
+
+    # Load the models before the first request needs them, and keep them loaded during business hours
+    if settings.OLLAMA_WARMUP:
+        keeper = create_model_keeper()
+        if settings.OLLAMA_WARMUP_BLOCKING:
+            with timer.phase("warmup"):
+                keeper.warm_all()
+        keeper.start(warm_first=not settings.OLLAMA_WARMUP_BLOCKING)
+        atexit.register(keeper.stop)
+
     # Launch the Gradio app
     try:
-        launch_app()
+        launch_app(timer)
     except KeyboardInterrupt:
         if ollama_process:
             stop_ollama(ollama_process)
         sys.exit(0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
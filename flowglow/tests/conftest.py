@@ -0,0 +1,17 @@
+import os
+import pytest
+
+# Settings require an Unsplash key; tests never reach the real API
+os.environ.setdefault("UNSPLASH_API_KEY", "test-key")
+
+from app.core.config import settings
+from app.core.llm_handler import LLMHandler
+
+@pytest.fixture
+def no_response_cache(monkeypatch):
+    """Handlers built in the test skip the persistent response cache, which lives in the working tree"""
+    monkeypatch.setattr(settings, "ENABLE_CACHE", False)
+
+@pytest.fixture
+def llm_handler(no_response_cache):
+    return LLMHandler()
@@ -0,0 +1,41 @@
+import json
+import pytest
+from app.core.config import settings
+from benchmarks import BenchmarkConfig, StubConfig, run_benchmark
+from benchmarks.__main__ import output_path, parse_args
+from benchmarks.runner import save_results
+
+FAST_LLM = StubConfig(latency=0.005, token_rate=2000, tokens=10)
+FAST_IMAGES = StubConfig(latency=0.005)
+
+@pytest.mark.parametrize("scenario", ["generate", "stream", "images", "pipeline"])
+def test_scenarios_run_offline(scenario):
+    host = settings.OLLAMA_HOST
+    report = run_benchmark(BenchmarkConfig(
+        scenario=scenario, requests=6, concurrency=3, warmup=0, llm=FAST_LLM, images=FAST_IMAGES
+    ))
+
+    results = report["results"]
+    assert results["requests"] == 6
+    assert results["errors"] == 0
+    assert results["latency"]["p99"] >= results["latency"]["p50"] > 0
+    assert settings.OLLAMA_HOST == host  # settings are restored after the run
+
+def test_injected_errors_are_counted_and_report_saved(tmp_path):
+    report = run_benchmark(BenchmarkConfig(
+        scenario="stream", requests=10, concurrency=2, warmup=0,
+        llm=StubConfig(latency=0.005, token_rate=2000, tokens=10, error_rate=1.0), images=FAST_IMAGES
+    ))
+    assert report["results"]["errors"] == 10
+
+    path = save_results(report, str(tmp_path / "report.json"))
+    assert json.loads(path.read_text())["benchmark"]["scenario"] == "stream"
+
+def test_output_names_one_report_per_scenario(tmp_path):
+    assert output_path(None, "stream", "t") == "benchmarks/results/stream-t.json"
+    assert output_path("report.json", "stream", "t") == "report.json"
+    assert output_path(str(tmp_path), "images", "t") == str(tmp_path / "images-t.json")
+    assert output_path("out/{scenario}.json", "images", "t", several=True) == "out/images.json"
+    assert output_path("out", "stream", "t", several=True) != output_path("out", "images", "t", several=True)
+    with pytest.raises(SystemExit):
+        parse_args(["--scenario", "all", "--output", "report.json"])
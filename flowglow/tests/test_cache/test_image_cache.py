@@ -0,0 +1,73 @@
+import asyncio
+import time
+import httpx
+import pytest
+from app.core import image_handler
+from app.core.cache import ImageCache
+from app.core.image_handler import ImageHandler
+from app.core.models import ImageGenerationRequest
+
+def test_key_normalizes_query():
+    assert ImageCache.make_key("  AI   Tools ", "regular", "landscape") == \
+        ImageCache.make_key("ai tools", "regular", "landscape")
+
+def test_lru_eviction_and_stats():
+    cache = ImageCache(max_entries=2)
+    cache.set("a", {"url": "a"})
+    cache.set("b", {"url": "b"})
+    cache.get("a")
+    cache.set("c", {"url": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"url": "a"}
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+def test_ttl_expiry():
+    cache = ImageCache(ttl=-1)
+    cache.set("a", {"url": "a"})
+    assert cache.get("a") is None
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "images.json")
+    cache = ImageCache(path=path)
+    cache.set("a", {"url": "a"})
+    cache.flush()
+    assert ImageCache(path=path).get("a") == {"url": "a"}
+
+def test_saves_are_batched_off_the_caller(tmp_path):
+    path = tmp_path / "images.json"
+    cache = ImageCache(path=str(path), save_delay=0.05)
+    for key in "abc":
+        cache.set(key, {"url": key})
+    assert not path.exists()
+
+    time.sleep(0.3)
+    assert [ImageCache(path=str(path)).get(key) for key in "abc"] == [{"url": key} for key in "abc"]
+    assert cache._timer is None
+
+def test_handler_serves_repeat_queries_from_cache(monkeypatch):
+    calls = []
+
+    def unsplash(request):
+        calls.append(request)
+        return httpx.Response(200, json={
+            "total": 2,
+            "results": [
+                {"urls": {"regular": "https://img/1"}, "user": {"name": "Ana"}},
+                {"urls": {"regular": "https://img/2"}, "user": {"name": "Luis"}}
+            ]
+        })
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(unsplash))
+    monkeypatch.setattr(image_handler, "get_http_client", lambda: client)
+    handler = ImageHandler(cache=ImageCache())
+
+    async def run():
+        first = await handler.search("AI tools")
+        response = await handler.get_images(ImageGenerationRequest(query="ai  TOOLS", count=2))
+        return first, response
+
+    first, response = asyncio.run(run())
+    assert len(calls) == 1
+    assert first["author"] == "Ana"
+    assert response.urls == ["https://img/1", "https://img/2"]
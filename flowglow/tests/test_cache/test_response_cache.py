@@ -0,0 +1,43 @@
+import pytest
+from app.core.cache import ResponseCache
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"), ttl=60, max_entries=3)
+    yield cache
+    cache.close()
+
+def test_hit_and_miss_counters(cache):
+    key = ResponseCache.make_key("ollama", "mistral", 0.7, 0.9, "prompt")
+    assert cache.get(key) is None
+    cache.set(key, "content")
+    assert cache.get(key) == "content"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_key_depends_on_generation_parameters():
+    assert ResponseCache.make_key("ollama", "mistral", 0.7, 0.9, "p") != \
+        ResponseCache.make_key("ollama", "mistral", 0.2, 0.9, "p")
+
+def test_ttl_expiry(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"), ttl=-1)
+    cache.set("key", "content")
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+def test_lru_eviction(cache):
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")
+    assert cache.stats()["entries"] == 3
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "responses.db")
+    first = ResponseCache(path)
+    first.set("key", "content")
+    first.close()
+    assert ResponseCache(path).get("key") == "content"
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from app.core.coalescing import SingleFlight
+
+class Source:
+    def __init__(self, chunks, delay=0.01, error=None):
+        self.chunks = chunks
+        self.delay = delay
+        self.error = error
+        self.started = 0
+        self.cancelled = False
+
+    async def stream(self):
+        self.started += 1
+        try:
+            for chunk in self.chunks:
+                await asyncio.sleep(self.delay)
+                yield chunk
+            if self.error:
+                raise self.error
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+async def _collect(flights, key, source):
+    return [chunk async for chunk in flights.stream(key, source.stream)]
+
+def test_identical_requests_share_one_generation():
+    flights, source = SingleFlight(), Source(["a", "b", "c"])
+
+    async def run():
+        return await asyncio.gather(*(_collect(flights, "key", source) for _ in range(3)))
+
+    assert asyncio.run(run()) == [["a", "b", "c"]] * 3
+    assert source.started == 1
+    assert flights.stats["coalesced"] == 2
+    assert flights.in_flight() == 0
+
+def test_late_subscriber_replays_earlier_chunks():
+    flights, source = SingleFlight(), Source(["a", "b", "c"], delay=0.02)
+
+    async def run():
+        first = asyncio.create_task(_collect(flights, "key", source))
+        await asyncio.sleep(0.03)
+        return await asyncio.gather(first, _collect(flights, "key", source))
+
+    assert asyncio.run(run()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert source.started == 1
+
+def test_generation_cancelled_only_when_last_subscriber_leaves():
+    flights, source = SingleFlight(), Source(["a"] * 10, delay=0.02)
+
+    async def run():
+        leaver = asyncio.create_task(_collect(flights, "key", source))
+        stayer = asyncio.create_task(_collect(flights, "key", source))
+        await asyncio.sleep(0.05)
+        leaver.cancel()
+        await asyncio.sleep(0.05)
+        assert not source.cancelled
+        stayer.cancel()
+        await asyncio.gather(leaver, stayer, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert source.cancelled
+    assert flights.stats["cancelled"] == 1
+
+def test_errors_reach_every_subscriber():
+    flights, source = SingleFlight(), Source(["a"], error=RuntimeError("boom"))
+
+    async def run():
+        return await asyncio.gather(
+            _collect(flights, "key", source), _collect(flights, "key", source),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+def test_resubmit_right_after_the_last_subscriber_leaves_starts_a_new_flight():
+    flights, source = SingleFlight(), Source(["a", "b"], delay=0.02)
+
+    async def run():
+        abandoned = flights.stream("key", source.stream)
+        await abandoned.__anext__()
+        # Clear, then an immediate resubmit: nothing runs in between to unwind the cancelled task
+        await abandoned.aclose()
+        return await _collect(flights, "key", source)
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert source.started == 2
+    assert flights.stats["cancelled"] == 1
@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from app.core.http_client import HTTPClientPool
+
+def test_client_is_reused_within_a_loop():
+    pool = HTTPClientPool(max_connections=5, http2=False)
+
+    async def run():
+        first, second = pool.client(), pool.client()
+        await pool.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert first.is_closed
+
+def test_each_loop_gets_its_own_client():
+    pool = HTTPClientPool(http2=False)
+
+    async def run():
+        client = pool.client()
+        await pool.aclose()
+        return client
+
+    assert asyncio.run(run()) is not asyncio.run(run())
+
+def test_closed_client_is_replaced():
+    pool = HTTPClientPool(http2=False)
+
+    async def run():
+        client = pool.client()
+        await client.aclose()
+        replacement = pool.client()
+        await pool.aclose()
+        return client, replacement
+
+    client, replacement = asyncio.run(run())
+    assert client is not replacement
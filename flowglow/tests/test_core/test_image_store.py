@@ -0,0 +1,138 @@
+import asyncio
+import io
+from pathlib import Path
+import httpx
+import pytest
+from app.core import image_store
+from app.core.image_store import ImageStore
+from app.core.models import Platform
+
+Image = pytest.importorskip("PIL.Image")
+
+def _jpeg(width=2000, height=1500) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "orange").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+@pytest.fixture
+def downloads(monkeypatch):
+    calls = []
+    payload = _jpeg()
+
+    def photos(request):
+        calls.append(str(request.url))
+        return httpx.Response(200, content=payload, headers={"content-type": "image/jpeg"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(photos))
+    monkeypatch.setattr(image_store, "get_http_client", lambda: client)
+    return calls
+
+def test_downloads_once_and_serves_platform_variants(tmp_path, downloads):
+    store = ImageStore(str(tmp_path))
+
+    async def run():
+        first = await store.fetch("https://img/a", Platform.INSTAGRAM)
+        second = await store.fetch("https://img/a", Platform.TWITTER)
+        again = await store.fetch("https://img/a", Platform.INSTAGRAM)
+        return first, second, again
+
+    first, second, again = asyncio.run(run())
+    assert len(downloads) == 1
+    assert first == again and first.endswith(".webp")
+    with Image.open(first) as img:
+        assert img.size == (1080, 1080)
+    with Image.open(second) as img:
+        assert img.size == (1200, 675)
+
+def test_identical_content_is_stored_once(tmp_path, downloads):
+    store = ImageStore(str(tmp_path))
+
+    async def run():
+        return await asyncio.gather(store.fetch("https://img/a"), store.fetch("https://img/b"))
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert len(list((tmp_path / "originals").rglob("*.jpg"))) == 1
+
+def test_eviction_keeps_store_under_limit(tmp_path, downloads):
+    store = ImageStore(str(tmp_path), max_bytes=1)
+    served = asyncio.run(store.fetch("https://img/a", Platform.BLOG))
+    files = [str(p) for p in tmp_path.rglob("*") if p.is_file() and p.name != "index.json"]
+    assert files == [served]
+
+def test_hits_skip_the_disk_scan_and_eviction_follows_recency(tmp_path, monkeypatch):
+    photos = {url: _jpeg(400, 300 + i) for i, url in enumerate(["https://img/a", "https://img/b", "https://img/c"])}
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, content=photos[str(request.url)], headers={"content-type": "image/jpeg"})
+    ))
+    monkeypatch.setattr(image_store, "get_http_client", lambda: client)
+    scans = []
+    rglob = Path.rglob
+    monkeypatch.setattr(Path, "rglob", lambda self, pattern: scans.append(self) or rglob(self, pattern))
+    store = ImageStore(str(tmp_path), max_bytes=int(max(map(len, photos.values())) * 2.5))
+
+    async def run():
+        a = await store.fetch("https://img/a")
+        b = await store.fetch("https://img/b")
+        await store.fetch("https://img/a")
+        c = await store.fetch("https://img/c")
+        return a, b, c
+
+    a, b, c = asyncio.run(run())
+    assert len(scans) <= 2  # the originals and variants directories, once
+    assert Path(a).exists() and Path(c).exists()
+    assert not Path(b).exists()
+    assert "https://img/b" not in store._index
+
+@pytest.fixture
+def slow_download(monkeypatch):
+    """A download that waits until the test releases it"""
+    state = {"calls": 0, "release": None}
+    payload = _jpeg(400, 300)
+
+    async def photos(request):
+        state["calls"] += 1
+        await state["release"].wait()
+        return httpx.Response(200, content=payload, headers={"content-type": "image/jpeg"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(photos))
+    monkeypatch.setattr(image_store, "get_http_client", lambda: client)
+    return state
+
+@pytest.mark.parametrize("cancelled", ["leader", "waiter"])
+def test_cancelling_one_caller_leaves_the_shared_download_to_the_others(tmp_path, slow_download, cancelled):
+    store = ImageStore(str(tmp_path))
+
+    async def run():
+        slow_download["release"] = asyncio.Event()
+        leader = asyncio.create_task(store.fetch("https://img/a"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(store.fetch("https://img/a"))
+        await asyncio.sleep(0.01)
+        gone, kept = (leader, waiter) if cancelled == "leader" else (waiter, leader)
+        gone.cancel()
+        await asyncio.sleep(0)
+        slow_download["release"].set()
+        with pytest.raises(asyncio.CancelledError):
+            await gone
+        return await kept
+
+    path = asyncio.run(run())
+    assert Path(path).exists()
+    assert slow_download["calls"] == 1
+    assert store._pending == {}
+
+def test_concurrent_fetches_render_a_variant_once(tmp_path, downloads, monkeypatch):
+    store = ImageStore(str(tmp_path))
+    renders = []
+    render = store._render_variant
+    monkeypatch.setattr(store, "_render_variant", lambda *args: renders.append(args) or render(*args))
+
+    async def run():
+        await store.fetch("https://img/a")
+        return await asyncio.gather(*(store.fetch("https://img/a", Platform.TWITTER) for _ in range(4)))
+
+    paths = asyncio.run(run())
+    assert len(set(paths)) == 1 and Path(paths[0]).exists()
+    assert len(renders) == 1
+    assert not list(tmp_path.rglob("*.tmp"))
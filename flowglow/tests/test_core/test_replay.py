@@ -0,0 +1,70 @@
+import asyncio
+import time
+import pytest
+from app.core.cassette import Cassette, CassetteMiss
+from app.core.llm_handler import LLMHandler
+from app.core.providers import ReplayProvider
+from app.core import registry
+from app.core.registry import available_providers, create_provider, register_provider
+
+class Upstream:
+    model_name = "upstream"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def stream(self, prompt):
+        self.calls += 1
+        for token in ["Hello", " from", f" {prompt}"]:
+            await asyncio.sleep(0.02)
+            yield token
+
+async def _collect(provider, prompt):
+    return [token async for token in provider.stream(prompt)]
+
+def test_records_misses_then_replays_from_disk(tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    upstream = Upstream()
+    recorder = ReplayProvider(Cassette(str(path)), upstream=upstream, mode="auto")
+
+    assert asyncio.run(_collect(recorder, "p1")) == ["Hello", " from", " p1"]
+    assert asyncio.run(_collect(recorder, "p1")) == ["Hello", " from", " p1"]
+    assert upstream.calls == 1
+    assert recorder.stats == {"replayed": 1, "recorded": 1}
+
+    cassette = Cassette(str(path))
+    assert len(cassette) == 1
+    assert all(delay >= 0.015 for delay in cassette.get("p1").delays)
+
+def test_replay_speed_scales_recorded_timing(tmp_path):
+    cassette = Cassette(str(tmp_path / "c.jsonl.gz"))
+    cassette.record("p", ["a", "b"], [0.1, 0.1])
+
+    async def timed(speed):
+        started = time.perf_counter()
+        text = await ReplayProvider(cassette, mode="replay", speed=speed).generate("p")
+        return text, time.perf_counter() - started
+
+    text, fast = asyncio.run(timed(10.0))
+    assert text == "ab"
+    assert fast < 0.1
+    assert asyncio.run(timed(0))[1] < 0.01
+
+def test_strict_replay_raises_on_miss(tmp_path):
+    provider = ReplayProvider(Cassette(str(tmp_path / "empty.jsonl.gz")), mode="replay")
+    with pytest.raises(CassetteMiss):
+        asyncio.run(_collect(provider, "unknown"))
+
+def test_registry_builds_custom_providers(no_response_cache):
+    @register_provider("echo")
+    def _echo(scheduler):
+        return Upstream()
+
+    try:
+        assert "echo" in available_providers()
+        handler = LLMHandler(provider="echo")
+        assert handler.model.model_name == "upstream"
+        with pytest.raises(ValueError):
+            create_provider("missing", handler.scheduler)
+    finally:
+        registry._factories.pop("echo")
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from app.core.models import RequestPriority
+from app.core.scheduler import GenerationScheduler, ScheduledProvider, SchedulerRejected, request_priority
+
+class SlowProvider:
+    model_name = "slow"
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            return prompt
+        finally:
+            self.active -= 1
+
+    async def stream(self, prompt):
+        yield await self.generate(prompt)
+
+def test_backend_concurrency_is_bounded():
+    provider = SlowProvider()
+    scheduled = ScheduledProvider(provider, GenerationScheduler({"ollama": 2}), "ollama")
+
+    async def run():
+        return await asyncio.gather(*(scheduled.generate(str(i)) for i in range(6)))
+
+    assert asyncio.run(run()) == [str(i) for i in range(6)]
+    assert provider.peak == 2
+
+def test_interactive_requests_jump_ahead_of_bulk():
+    scheduler = GenerationScheduler({"ollama": 1})
+    order = []
+
+    async def job(name, priority):
+        async with scheduler.slot("ollama", priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        holder = asyncio.create_task(job("first", RequestPriority.BULK))
+        await asyncio.sleep(0)
+        bulk = asyncio.create_task(job("bulk", RequestPriority.BULK))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(job("interactive", RequestPriority.INTERACTIVE))
+        await asyncio.gather(holder, bulk, interactive)
+
+    asyncio.run(run())
+    assert order == ["first", "interactive", "bulk"]
+
+def test_priority_comes_from_context():
+    scheduler = GenerationScheduler({"groq": 1}, max_queue=2, bulk_queue_share=0.5)
+
+    async def run():
+        async with scheduler.slot("groq"):
+            request_priority.set(RequestPriority.BULK)
+            waiter = asyncio.create_task(scheduler.slot("groq").__aenter__())
+            await asyncio.sleep(0)
+            assert scheduler.backend("groq").snapshot()["queued"]["bulk"] == 1
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(run())
+
+def test_full_queue_rejects_with_retry_hint():
+    scheduler = GenerationScheduler({"ollama": 1}, max_queue=2, bulk_queue_share=0.5)
+
+    async def run():
+        async with scheduler.slot("ollama"):
+            waiters = [asyncio.create_task(scheduler.slot("ollama").__aenter__()) for _ in range(2)]
+            await asyncio.sleep(0)
+            # Bulk only gets half of the queue, interactive is turned away once it is full
+            with pytest.raises(SchedulerRejected) as bulk:
+                await scheduler.slot("ollama", RequestPriority.BULK).__aenter__()
+            with pytest.raises(SchedulerRejected) as interactive:
+                await scheduler.slot("ollama").__aenter__()
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+            return bulk.value, interactive.value
+
+    bulk, interactive = asyncio.run(run())
+    assert bulk.backend == "ollama"
+    assert interactive.retry_after > 0
+    assert scheduler.backend("ollama").snapshot()["rejected"] == 2
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = GenerationScheduler({"ollama": 1})
+
+    async def run():
+        async with scheduler.slot("ollama"):
+            waiter = asyncio.create_task(scheduler.slot("ollama").__aenter__())
+            await asyncio.sleep(0)
+            assert scheduler.backend("ollama").depth == 1
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            assert scheduler.backend("ollama").depth == 0
+        return scheduler.backend("ollama").snapshot()
+
+    snapshot = asyncio.run(run())
+    assert snapshot["active"] == 0
+    assert snapshot["queue_depth"] == 0
+
+def test_waiter_cancelled_as_the_slot_is_released():
+    scheduler = GenerationScheduler({"ollama": 1})
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("ollama"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(scheduler.slot("ollama").__aenter__())
+        await asyncio.sleep(0)
+        # Same loop turn: the release pops the waiter whose future the cancel already cancelled
+        release.set()
+        waiter.cancel()
+        return await asyncio.gather(holder, waiter, return_exceptions=True)
+
+    _, waited = asyncio.run(run())
+    assert isinstance(waited, asyncio.CancelledError)
+    snapshot = scheduler.backend("ollama").snapshot()
+    assert snapshot["active"] == 0
+    assert snapshot["queued"] == {"interactive": 0, "bulk": 0}
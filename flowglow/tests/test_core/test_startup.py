@@ -0,0 +1,57 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from app.core.startup import StartupTimer, ollama_ready, wait_for_ollama
+from benchmarks.stubs import StubOllamaServer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+def test_wait_returns_as_soon_as_ollama_answers():
+    server = StubOllamaServer()
+    server.start()
+    url = server.url
+    server.stop()
+    assert not ollama_ready(url)
+
+    late = StubOllamaServer(port=int(url.rsplit(":", 1)[1]))
+    threading.Timer(0.2, late.start).start()
+    try:
+        started = time.perf_counter()
+        assert wait_for_ollama(url, timeout=5.0, initial_delay=0.02, max_delay=0.1)
+        assert time.perf_counter() - started < 1.0
+    finally:
+        late.stop()
+
+def test_wait_gives_up_when_the_process_exits():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+
+    started = time.perf_counter()
+    assert not wait_for_ollama("http://127.0.0.1:9", timeout=5.0, process=process)
+    assert time.perf_counter() - started < 1.0
+
+def test_importing_the_handler_loads_neither_settings_nor_groq():
+    code = (
+        "import sys\n"
+        "from app.core.config import settings\n"
+        "import app.core.llm_handler\n"
+        "assert not settings.loaded\n"
+        "assert 'groq' not in sys.modules\n"
+        "settings.ENABLE_CACHE = False\n"
+        "app.core.llm_handler.LLMHandler()\n"
+        "assert settings.loaded and 'groq' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                            env={"UNSPLASH_API_KEY": "test-key", "PATH": ""})
+    assert result.returncode == 0, result.stderr
+
+def test_timer_report_lists_phases_in_order():
+    timer = StartupTimer()
+    with timer.phase("settings"):
+        pass
+    timer.record("ollama_ready", 0.25)
+
+    lines = timer.report().splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["settings", "ollama_ready", "total"]
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime
+from app.core.http_client import close_http_clients
+from app.core.providers import OllamaProvider
+from app.core.warmup import ModelKeeper
+from app.utils.metrics import MetricsRegistry
+from benchmarks.stubs import StubConfig, StubOllamaServer
+
+MONDAY_MORNING = datetime(2024, 6, 3, 10, 0)
+SATURDAY = datetime(2024, 6, 8, 10, 0)
+
+def _keeper(url, registry, **kwargs):
+    return ModelKeeper(url, {"mistral": "30m"}, metrics=registry, **kwargs)
+
+def test_warm_up_loads_models_and_reports_residency():
+    registry = MetricsRegistry()
+    with StubOllamaServer(StubConfig(latency=0.01)) as ollama:
+        keeper = _keeper(ollama.url, registry)
+        assert keeper.refresh_residency()["mistral"]["resident"] is False
+
+        loads = keeper.warm_all()
+
+    assert loads["mistral"] is not None
+    assert keeper.residency["mistral"]["resident"] is True
+    assert 1790 < keeper.residency["mistral"]["expires_in"] <= 1800
+    text = registry.render_prometheus()
+    assert 'flowglow_model_resident{model="mistral"} 1' in text
+    assert 'flowglow_model_memory_bytes{model="mistral"} 4000000000' in text
+    stages = {series["labels"]["stage"] for series in registry.snapshot()["stage_duration_seconds"]}
+    assert "model_load" in stages
+
+def test_keeper_only_reloads_during_business_hours():
+    with StubOllamaServer(StubConfig(latency=0.01)) as ollama:
+        keeper = _keeper(ollama.url, MetricsRegistry())
+
+        keeper.tick(now=SATURDAY)
+        assert keeper.residency["mistral"]["resident"] is False
+
+        keeper.tick(now=MONDAY_MORNING)
+        assert keeper.residency["mistral"]["resident"] is True
+
+def test_business_hours_windows():
+    keeper = _keeper("http://127.0.0.1:9", MetricsRegistry())
+    assert keeper.in_business_hours(MONDAY_MORNING)
+    assert not keeper.in_business_hours(MONDAY_MORNING.replace(hour=21))
+    assert not keeper.in_business_hours(SATURDAY)
+
+    night = _keeper("http://127.0.0.1:9", MetricsRegistry(), hours="22:00-06:00", days=[4])
+    assert night.in_business_hours(datetime(2024, 6, 7, 23, 0))  # Friday night
+    assert night.in_business_hours(datetime(2024, 6, 8, 5, 0))  # the same shift after midnight
+    assert not night.in_business_hours(datetime(2024, 6, 9, 5, 0))
+
+def test_generations_carry_the_keep_alive():
+    with StubOllamaServer(StubConfig(latency=0.01, tokens=3)) as ollama:
+        provider = OllamaProvider(ollama.url, "mistral", keep_alive="1h")
+
+        async def generate():
+            try:
+                return await provider.generate("hello")
+            finally:
+                await close_http_clients()
+
+        assert asyncio.run(generate())
+        keeper = _keeper(ollama.url, MetricsRegistry())
+        assert keeper.refresh_residency()["mistral"]["expires_in"] > 3500
@@ -0,0 +1,107 @@
+import asyncio
+import io
+import json
+from app.core.config import settings
+from app.core.models import RequestPriority
+from app.interface import batch
+from app.interface.batch import BatchRunner, load_checkpoint
+
+LINES = [
+    {"id": "a", "topic": "Remote work", "platform": "linkedin", "audience": "founders"},
+    "not json",
+    {"id": "b", "topic": "Remote work", "platform": "myspace", "audience": "founders"},
+    {"topic": "Product launch", "platform": "blog", "audience": "developers"},
+]
+
+def _input(lines):
+    return io.StringIO("".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines))
+
+def _handler(handler, monkeypatch, prompts):
+    async def fake_stream(prompt, priority=None, labels=None, profile=None):
+        assert priority == RequestPriority.BULK
+        prompts.append(prompt)
+        for _ in range(3):
+            yield "Remote teams ship faster when they write things down. "
+
+    monkeypatch.setattr(handler, "_stream_model", fake_stream)
+    return handler
+
+def test_batch_writes_one_result_per_line(llm_handler, monkeypatch):
+    prompts = []
+    output = io.StringIO()
+
+    stats = asyncio.run(BatchRunner(_handler(llm_handler, monkeypatch, prompts), concurrency=2).run(_input(LINES), [output]))
+
+    results = {result["id"]: result for result in map(json.loads, output.getvalue().splitlines())}
+    assert set(results) == {"a", "line-2", "b", "line-4"}
+    assert results["a"]["status"] == "ok" and results["a"]["platform"] == "linkedin"
+    assert results["a"]["formatted"]
+    assert results["line-2"]["status"] == "invalid" and "Invalid JSON" in results["line-2"]["message"]
+    assert results["b"]["status"] == "invalid"
+    assert results["line-4"]["platform"] == "blog"
+    assert len(prompts) == 2
+    assert (stats.processed, stats.ok, stats.invalid) == (4, 2, 2)
+
+def test_checkpoint_skips_finished_items_and_retries_errors(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text(
+        json.dumps({"id": "a", "status": "ok"}) + "\n"
+        + json.dumps({"id": "line-4", "status": "error"}) + "\n"
+        + '{"id": "line-2", "sta'
+    )
+
+    assert load_checkpoint(path) == {"a"}
+    assert path.read_text().endswith('"error"}\n')
+
+def test_main_resumes_from_its_output(llm_handler, monkeypatch, tmp_path):
+    prompts = []
+    handler = _handler(llm_handler, monkeypatch, prompts)
+    monkeypatch.setattr(batch, "LLMHandler", lambda provider, scheduler=None: handler)
+    source = tmp_path / "requests.jsonl"
+    output = tmp_path / "results.jsonl"
+    source.write_text(_input(LINES[:1]).getvalue())
+
+    assert batch.main([str(source), "-o", str(output)]) == 0
+    source.write_text(_input(LINES).getvalue())
+    assert batch.main([str(source), "-o", str(output), "--concurrency", "3"]) == 0
+
+    ids = [json.loads(line)["id"] for line in output.read_text().splitlines()]
+    assert sorted(ids) == ["a", "b", "line-2", "line-4"]
+    assert len(prompts) == 2
+
+def test_failures_are_classified_by_exception_not_by_text(llm_handler, monkeypatch):
+    async def stream(prompt, priority=None, labels=None, profile=None):
+        if "Outages" in prompt:
+            raise ConnectionError("ollama is down")
+        yield "Error: the most expensive word in a post-mortem is 'assumed'."
+
+    monkeypatch.setattr(llm_handler, "_stream_model", stream)
+    requests = [
+        {"id": "down", "topic": "Outages", "platform": "linkedin", "audience": "founders"},
+        {"id": "quote", "topic": "Post-mortems", "platform": "linkedin", "audience": "founders"},
+    ]
+    output = io.StringIO()
+
+    asyncio.run(BatchRunner(llm_handler).run(_input(requests), [output]))
+
+    results = {result["id"]: result for result in map(json.loads, output.getvalue().splitlines())}
+    assert results["down"]["status"] == "error"
+    assert results["down"]["error_type"] == "ConnectionError"
+    assert results["quote"]["status"] == "ok"
+    assert results["quote"]["content"].startswith("Error:")
+
+def test_run_sizes_its_own_scheduler_queue(llm_handler, monkeypatch):
+    schedulers = []
+
+    def handler(provider, scheduler=None):
+        schedulers.append(scheduler)
+        return llm_handler
+
+    monkeypatch.setattr(batch, "LLMHandler", handler)
+    configured = settings.SCHEDULER_MAX_QUEUE
+    concurrency = configured * 2
+
+    asyncio.run(batch.run_batch(io.StringIO(""), [], concurrency=concurrency))
+
+    assert schedulers[0].max_queue * settings.SCHEDULER_BULK_QUEUE_SHARE >= concurrency
+    assert settings.SCHEDULER_MAX_QUEUE == configured
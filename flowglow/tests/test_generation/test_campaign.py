@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from app.core.models import ContentRequest, Platform
+
+@pytest.fixture
+def handler(llm_handler, monkeypatch):
+    handler = llm_handler
+    handler.prompts = []
+    handler.image_queries = []
+    handler.active = handler.peak = 0
+
+    async def fake_generate(prompt, include_image=False, image_params=None, request=None, priority=None, validator=None):
+        handler.prompts.append(prompt)
+        handler.active += 1
+        handler.peak = max(handler.peak, handler.active)
+        await asyncio.sleep(0.05)
+        handler.active -= 1
+        return f"content for {len(handler.prompts)}", None
+
+    async def fake_search(query, size="regular", orientation="landscape"):
+        handler.image_queries.append(query)
+        return {"url": "https://images.example/photo.jpg"}
+
+    async def fake_localize(url, platform=None):
+        return f"assets/images/{platform.value}.webp"
+
+    monkeypatch.setattr(handler, "generate", fake_generate)
+    monkeypatch.setattr(handler.image_handler, "search", fake_search)
+    monkeypatch.setattr(handler.image_handler, "localize", fake_localize)
+    return handler
+
+def _request():
+    return ContentRequest(topic="AI Tools", platform=Platform.BLOG, audience="marketers")
+
+def test_campaign_covers_every_platform_concurrently(handler):
+    results = asyncio.run(handler.generate_campaign(_request(), include_image=True))
+
+    assert set(results) == set(Platform)
+    assert handler.peak == len(Platform)
+    assert handler.image_queries == ["AI Tools"]
+    for platform, response in results.items():
+        assert response.platform == platform
+        assert response.metadata["image_url"] == f"assets/images/{platform.value}.webp"
+        assert response.metadata["timings"]["generation"] >= 0.05
+    assert any("Twitter thread" in prompt for prompt in handler.prompts)
+
+def test_campaign_respects_concurrency_limit(handler):
+    platforms = [Platform.TWITTER, Platform.LINKEDIN]
+    results = asyncio.run(handler.generate_campaign(_request(), platforms=platforms, concurrency=1))
+
+    assert list(results) == platforms
+    assert handler.peak == 1
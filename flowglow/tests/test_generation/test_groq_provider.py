@@ -0,0 +1,95 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.core import providers
+from app.core.providers import GroqProvider
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "mixtral-8x7b-32768",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }]
+    }
+
+def _stream_body(tokens):
+    events = []
+    for token in tokens:
+        chunk = {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "mixtral-8x7b-32768",
+            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+        }
+        events.append(f"data: {json.dumps(chunk)}\n\n")
+    events.append("data: [DONE]\n\n")
+    return "".join(events)
+
+@pytest.fixture
+def groq_api(monkeypatch):
+    calls = []
+    responses = []
+
+    def handler(request):
+        calls.append(json.loads(request.content))
+        return responses.pop(0)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(providers, "get_http_client", lambda: client)
+    return calls, responses
+
+def _provider(**kwargs):
+    return GroqProvider(api_key="key", model="mixtral-8x7b-32768", max_tokens=64, **kwargs)
+
+def test_generate_retries_rate_limits_honoring_retry_after(groq_api):
+    calls, responses = groq_api
+    responses.extend([
+        httpx.Response(429, headers={"retry-after": "0"}, json={"error": {"message": "slow down"}}),
+        httpx.Response(200, json=_completion("Hello there"))
+    ])
+
+    assert asyncio.run(_provider().generate("Hi")) == "Hello there"
+    assert len(calls) == 2
+    assert calls[0]["max_tokens"] == 64
+    assert calls[0]["top_p"] == 0.9
+
+def test_generate_gives_up_after_max_retries(groq_api):
+    calls, responses = groq_api
+    responses.extend([httpx.Response(429, headers={"retry-after": "0"}, json={}) for _ in range(2)])
+
+    with pytest.raises(providers.APIStatusError):
+        asyncio.run(_provider(max_retries=1).generate("Hi"))
+    assert len(calls) == 2
+
+def test_long_retry_after_gives_up_instead_of_waiting(groq_api):
+    calls, responses = groq_api
+    responses.append(httpx.Response(429, headers={"retry-after": "3600"}, json={}))
+
+    with pytest.raises(providers.APIStatusError):
+        asyncio.run(asyncio.wait_for(_provider(backoff_max=4.0).generate("Hi"), timeout=5))
+    assert len(calls) == 1
+
+def test_stream_yields_tokens(groq_api):
+    _, responses = groq_api
+    responses.append(httpx.Response(
+        200,
+        text=_stream_body(["Hel", "lo"]),
+        headers={"content-type": "text/event-stream"}
+    ))
+
+    async def collect():
+        return [token async for token in _provider().stream("Hi")]
+
+    assert asyncio.run(collect()) == ["Hel", "lo"]
+
+def test_backoff_is_bounded_with_jitter():
+    provider = _provider(backoff_base=1.0, backoff_max=4.0)
+    delays = [provider._retry_delay(attempt) for attempt in range(10)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
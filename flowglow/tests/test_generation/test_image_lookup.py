@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+from app.core.image_handler import ImageHandler
+from app.core.models import ContentRequest, Platform
+
+def _request(**kwargs):
+    return ContentRequest(
+        topic="Remote work",
+        platform=Platform.INSTAGRAM,
+        audience="founders",
+        **kwargs
+    )
+
+def test_query_for_request_uses_topic_and_brand_keywords():
+    request = _request(brand_voice={"keywords": ["teams", "focus", "async", "extra"]})
+    assert ImageHandler.query_for_request(request) == "Remote work teams focus async"
+
+def test_image_query_from_text_skips_labels(llm_handler):
+    assert llm_handler._image_query_from_text("Title: **Remote** work 101 for modern teams today") == \
+        "Remote work for modern teams"
+
+def test_image_lookup_starts_before_generation_finishes(llm_handler, monkeypatch):
+    handler = llm_handler
+    events = []
+
+    async def fake_generate(prompt):
+        events.append("generation started")
+        await asyncio.sleep(0.05)
+        events.append("generation finished")
+        raise RuntimeError("stop")
+
+    async def fake_get_image(query, size="regular", orientation="landscape", platform=None):
+        events.append(("image", query, orientation))
+        return "https://img/1"
+
+    monkeypatch.setattr(handler.model, "generate", fake_generate)
+    monkeypatch.setattr(handler, "get_image", fake_get_image)
+
+    asyncio.run(handler.generate("prompt", include_image=True, request=_request()))
+    assert events.index(("image", "Remote work", "squarish")) < events.index("generation finished")
@@ -2,15 +2,11 @@ import pytest
 from app.core.llm_handler import LLMHandler
 from app.core.models import ModelProvider, LLMResponse
 
-@pytest.fixture
-def llm_handler():
-    return LLMHandler()
-
 async def test_ollama_initialization(llm_handler):
     assert llm_handler.provider == ModelProvider.OLLAMA
     assert llm_handler.model is not None
 
-async def test_model_switching():
+async def test_model_switching(no_response_cache):
     handler = LLMHandler(provider=ModelProvider.GROQ)
     assert handler.provider == ModelProvider.GROQ
 
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import httpx
+from app.core import providers
+from app.core.config import settings
+from app.core.models import ContentRequest, GenerationProfile, Platform
+from app.core.profiles import generation_profile, platform_profile, resolve_profile
+from app.core.providers import GroqProvider, OllamaProvider
+
+def _request(platform, **kwargs):
+    return ContentRequest(topic="Remote work", platform=platform, audience="founders", **kwargs)
+
+def test_token_budgets_follow_platform_limits(monkeypatch):
+    twitter = platform_profile(Platform.TWITTER)
+    linkedin = platform_profile(Platform.LINKEDIN)
+
+    assert twitter.max_tokens < linkedin.max_tokens <= settings.GENERATION_MAX_TOKENS
+    assert platform_profile(Platform.BLOG).max_tokens == settings.GENERATION_MAX_TOKENS
+    # Twitter output is a thread, so its budget covers every tweet the validator accepts
+    thread = 280 * settings.TWITTER_MAX_THREAD_TWEETS
+    assert twitter.max_tokens * settings.GENERATION_CHARS_PER_TOKEN >= thread
+    assert twitter.temperature == settings.TEMPERATURE and twitter.stop == settings.GENERATION_STOP
+
+    monkeypatch.setattr(settings, "GENERATION_PROFILES", {"twitter": {"max_tokens": 60, "temperature": 0.2}})
+    assert platform_profile(Platform.TWITTER).max_tokens == 60
+    assert platform_profile(Platform.TWITTER).temperature == 0.2
+
+def test_request_and_call_overrides_win():
+    request = _request(Platform.TWITTER, generation=GenerationProfile(max_tokens=40, stop=["###"]))
+
+    profile = resolve_profile(request, {"temperature": 0.1})
+
+    assert (profile.max_tokens, profile.stop, profile.temperature) == (40, ["###"], 0.1)
+    assert profile.top_p == settings.TOP_P
+
+def test_providers_send_the_profile(monkeypatch):
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, text=json.dumps({"response": "hi", "done": True}) + "\n")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(providers, "get_http_client", lambda: client)
+
+    async def call():
+        generation_profile.set(GenerationProfile(max_tokens=100, temperature=0.3, stop=["\nUser:"], num_ctx=4096))
+        return await OllamaProvider("http://ollama", "mistral").generate("prompt")
+
+    assert asyncio.run(call()) == "hi"
+    assert bodies[0]["options"] == {"num_predict": 100, "temperature": 0.3, "stop": ["\nUser:"], "num_ctx": 4096}
+
+    groq = GroqProvider(api_key="key", model="mixtral-8x7b-32768", max_tokens=1000)
+    token = generation_profile.set(GenerationProfile(max_tokens=100, stop=["a", "b", "c", "d", "e"]))
+    try:
+        request = groq._request("prompt")
+    finally:
+        generation_profile.reset(token)
+    assert request["max_tokens"] == 100 and request["stop"] == ["a", "b", "c", "d"]
+    assert request["temperature"] == groq.temperature
+
+def test_each_platform_generates_and_caches_with_its_own_profile(llm_handler, monkeypatch):
+    seen = []
+
+    async def fake_complete(prompt, priority=None, labels=None, profile=None):
+        seen.append(profile.max_tokens)
+        yield "content"
+
+    handler = llm_handler
+    monkeypatch.setattr(handler, "_complete", fake_complete)
+
+    async def generate():
+        for platform in (Platform.TWITTER, Platform.LINKEDIN):
+            await handler.generate("same prompt", request=_request(platform))
+
+    asyncio.run(generate())
+    assert seen == [platform_profile(Platform.TWITTER).max_tokens, platform_profile(Platform.LINKEDIN).max_tokens]
+    assert handler._cache_key("p", platform_profile(Platform.TWITTER)) != \
+        handler._cache_key("p", platform_profile(Platform.LINKEDIN))
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from app.core.router import ProviderRouter
+
+class FakeProvider:
+    def __init__(self, name, delay=0.0, error=None):
+        self.model_name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.closed = 0
+
+    async def stream(self, prompt):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            for token in [self.model_name, " says ", prompt]:
+                yield token
+        finally:
+            self.closed += 1
+
+def _router(**providers):
+    return ProviderRouter(providers, hedge_default_delay=0.05, hedge_min_delay=0.01)
+
+def test_hedges_to_secondary_when_primary_stalls():
+    slow, fast = FakeProvider("slow", delay=1.0), FakeProvider("fast")
+    router = _router(slow=slow, fast=fast)
+
+    assert asyncio.run(router.generate("hi")) == "fast says hi"
+    assert router.counters["hedged"] == 1
+    assert slow.closed == 1
+    assert router.stats["fast"].outcomes[-1] is True
+
+def test_fails_over_on_provider_error():
+    broken, backup = FakeProvider("broken", error=RuntimeError("down")), FakeProvider("backup")
+    router = _router(broken=broken, backup=backup)
+
+    assert asyncio.run(router.generate("hi")) == "backup says hi"
+    assert router.stats["broken"].error_rate == 1.0
+    assert router.counters["failovers"] == 1
+
+def test_ranking_follows_observed_latency():
+    router = _router(first=FakeProvider("first"), second=FakeProvider("second"))
+    assert router.rank() == ["first", "second"]
+    for _ in range(ProviderRouter.MIN_SAMPLES):
+        router.stats["first"].record_success(ttft=2.0, latency=3.0)
+        router.stats["second"].record_success(ttft=0.2, latency=1.0)
+    assert router.rank() == ["second", "first"]
+    assert router.hedge_delay("second") == 0.2
+
+def test_raises_when_every_provider_fails():
+    router = _router(a=FakeProvider("a", error=RuntimeError("a")), b=FakeProvider("b", error=RuntimeError("b")))
+    with pytest.raises(RuntimeError):
+        asyncio.run(router.generate("hi"))
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from app.core.llm_handler import StreamCleaner
+
+def _feed_all(chunks):
+    cleaner = StreamCleaner()
+    partials = [cleaner.feed(chunk) for chunk in chunks]
+    return cleaner, partials
+
+def test_stream_cleaner_strips_tags_across_chunks():
+    cleaner, partials = _feed_all(["Hello <b", "old>world</bold> ", "again"])
+    assert partials[0] == "Hello"
+    assert partials[-1] == "Hello world again"
+
+def test_stream_cleaner_drops_text_before_assistant_marker():
+    cleaner, partials = _feed_all(["User: hi\nAssis", "tant: Sure, ", "here it is"])
+    assert partials[-1] == "Sure, here it is"
+
+def test_stream_yields_partials_then_final_content(llm_handler, monkeypatch):
+    chunks = ["Assistant: <p>Title", "</p>\n\nBody < text", " done"]
+
+    async def fake_stream(prompt, priority=None, labels=None, profile=None):
+        for chunk in chunks:
+            yield chunk
+
+    handler = llm_handler
+    monkeypatch.setattr(handler, "_stream_model", fake_stream)
+
+    async def collect():
+        return [item async for item in handler.stream("prompt")]
+
+    results = asyncio.run(collect())
+    assert results[0] == ("Title", None)
+    assert results[-1] == (handler._process_response("".join(chunks)), None)
+
+def test_closing_the_stream_cancels_the_model_call(llm_handler):
+    from app.core.scheduler import GenerationScheduler, ScheduledProvider
+
+    class EndlessProvider:
+        model_name = "endless"
+        closed = False
+
+        async def stream(self, prompt):
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+                    yield "word "
+            finally:
+                EndlessProvider.closed = True
+
+    scheduler = GenerationScheduler({"ollama": 1})
+    handler = llm_handler
+    handler.model = ScheduledProvider(EndlessProvider(), scheduler, "ollama")
+
+    async def abandon():
+        updates = handler.stream("prompt")
+        first = await updates.__anext__()
+        await updates.aclose()
+        await asyncio.sleep(0.05)
+        return first
+
+    assert asyncio.run(abandon()) == ("word", None)
+    assert EndlessProvider.closed
+    assert handler.cancellation_stats()["requests"] == 1
+    assert handler.cancellation_stats()["generations"] == 1
+    assert scheduler.backend("ollama").active == 0
+
+def test_full_backend_queue_reaches_the_caller(llm_handler):
+    from app.core.scheduler import GenerationScheduler, ScheduledProvider, SchedulerRejected
+
+    class OneWordProvider:
+        model_name = "one-word"
+
+        async def stream(self, prompt):
+            yield "word"
+
+    scheduler = GenerationScheduler({"ollama": 1}, max_queue=0)
+    llm_handler.model = ScheduledProvider(OneWordProvider(), scheduler, "ollama")
+
+    async def busy():
+        async with scheduler.slot("ollama"):
+            with pytest.raises(SchedulerRejected) as streamed:
+                [item async for item in llm_handler.stream("prompt")]
+            with pytest.raises(SchedulerRejected):
+                await llm_handler.generate("prompt")
+            return streamed.value
+
+    assert asyncio.run(busy()).retry_after > 0
+
+def test_stream_does_not_join_a_running_completion(llm_handler, monkeypatch):
+    async def fake_complete(prompt, priority=None, labels=None, profile=None):
+        await asyncio.sleep(0.05)
+        yield "Remote teams ship faster when they write things down."
+
+    async def fake_stream(prompt, priority=None, labels=None, profile=None):
+        for word in "Remote teams ship faster when they write things down.".split(" "):
+            await asyncio.sleep(0)
+            yield word + " "
+
+    monkeypatch.setattr(llm_handler, "_complete", fake_complete)
+    monkeypatch.setattr(llm_handler, "_stream_model", fake_stream)
+
+    async def run():
+        completion = asyncio.create_task(llm_handler.generate("prompt"))
+        await asyncio.sleep(0.01)
+        partials = [content async for content, _ in llm_handler.stream("prompt")]
+        await completion
+        return partials
+
+    assert len(asyncio.run(run())) > 2
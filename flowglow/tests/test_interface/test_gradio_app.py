@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+
+pytest.importorskip("gradio")
+
+from app.core.scheduler import GenerationScheduler, ScheduledProvider
+from app.interface.gradio_app import FlowGlowInterface
+from app.utils.markdown import markdown_to_html
+
+FORM = ("linkedin", "Remote work", "founders", "professional", "en", False, "regular", "landscape")
+
+@pytest.fixture
+def interface(no_response_cache):
+    return FlowGlowInterface()
+
+async def _submit(interface, platform="linkedin"):
+    return [update async for update in interface.generate_content(platform, *FORM[1:])]
+
+def test_submit_streams_the_generated_post(interface, monkeypatch):
+    async def fake_stream(prompt, priority=None, labels=None, profile=None):
+        for chunk in ["Remote teams ", "ship faster ", "when they write things down."]:
+            yield chunk
+
+    monkeypatch.setattr(interface.generator, "_stream_model", fake_stream)
+
+    updates = asyncio.run(_submit(interface))
+    assert updates[0] == ("Remote teams", "", None)
+    assert updates[-1] == ("Remote teams ship faster when they write things down.", "", None)
+
+def test_busy_backend_asks_the_user_to_retry(interface):
+    class OneWordProvider:
+        model_name = "one-word"
+
+        async def stream(self, prompt):
+            yield "word"
+
+    scheduler = GenerationScheduler({"ollama": 1}, max_queue=0)
+    interface.generator.model = ScheduledProvider(OneWordProvider(), scheduler, "ollama")
+
+    async def busy():
+        async with scheduler.slot("ollama"):
+            return await _submit(interface)
+
+    [(message, preview, image)] = asyncio.run(busy())
+    assert message.startswith("The generator is busy right now, please retry in about")
+    assert image is None
+
+def test_twitter_thread_shows_tweets_before_the_stream_ends(interface, monkeypatch):
+    sentences = [f"{i}/6 " + f"Point {i} on remote work, with enough detail to fill most of a tweet. " * 2 + "\n\n"
+                 for i in range(1, 7)]
+
+    async def fake_stream(prompt, priority=None, labels=None, profile=None):
+        for sentence in sentences:
+            for word in sentence.split(" "):
+                yield word + " "
+
+    monkeypatch.setattr(interface.generator, "_stream_model", fake_stream)
+
+    updates = [content for content, _, _ in asyncio.run(_submit(interface, "twitter"))]
+    first_tweet = next(index for index, content in enumerate(updates) if content.startswith("1/ "))
+    assert first_tweet < len(updates) // 2
+    assert "1/6" not in updates[first_tweet]  # the model's numbering is replaced
+    assert updates[-1].startswith("1/")
+    assert all(len(tweet) <= 280 for tweet in updates[-1].split("\n\n"))
+
+def test_generation_errors_are_reported(interface, monkeypatch):
+    async def failing_stream(prompt, priority=None, labels=None, profile=None):
+        raise ConnectionError("ollama is down")
+        yield
+
+    monkeypatch.setattr(interface.generator, "_stream_model", failing_stream)
+
+    [(message, preview, image)] = asyncio.run(_submit(interface))
+    assert message == "Error generating content: ollama is down"
+    assert image is None
+
+def test_blog_post_is_rendered_while_it_streams(interface, monkeypatch):
+    post = "# Remote work\n\nTeams that **write things down** ship faster.\n\n- Docs over meetings\n- Owners over committees\n"
+
+    async def fake_stream(prompt, priority=None, labels=None, profile=None):
+        for line in post.splitlines(keepends=True):
+            yield line
+
+    monkeypatch.setattr(interface.generator, "_stream_model", fake_stream)
+
+    updates = asyncio.run(_submit(interface, "blog"))
+    assert any("<h1>Remote work</h1>" in preview and "Owners" not in preview for _, preview, _ in updates)
+    content, preview, image = updates[-1]
+    assert content.startswith("# Remote work")
+    assert preview == markdown_to_html(content)
+    assert "<li>Owners over committees</li>" in preview
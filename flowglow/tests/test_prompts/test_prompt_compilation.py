@@ -0,0 +1,39 @@
+import pytest
+from app.core.models import ContentRequest, Platform
+from app.core.prompts import ContentPromptManager
+
+BRAND_VOICE = {
+    "company_name": "FlowGlow",
+    "tone": "bold",
+    "values": ["clarity"],
+    "keywords": ["ai", "content"],
+    "style_guide": {"emoji": False}
+}
+
+def _request(topic, brand_voice=None, platform=Platform.LINKEDIN):
+    return ContentRequest(topic=topic, platform=platform, audience="marketers", brand_voice=brand_voice)
+
+def test_static_prefix_is_shared_between_requests():
+    first, _ = ContentPromptManager.get_prompt_parts(_request("AI"))
+    second, suffix = ContentPromptManager.get_prompt_parts(_request("Cloud", BRAND_VOICE))
+    assert first == second
+    assert "{" not in first
+    assert "Cloud" in suffix and "Brand Voice Guidelines" in suffix
+
+def test_templates_are_whitespace_normalized():
+    prompt = ContentPromptManager.get_prompt(_request("AI", platform=Platform.BLOG))
+    assert not any(line.startswith(" ") for line in prompt.splitlines())
+    assert "\n\n\n" not in prompt
+
+def test_brand_voice_context_is_memoized_independent_of_key_order():
+    reordered = dict(reversed(list(BRAND_VOICE.items())))
+    first = ContentPromptManager._get_additional_context(_request("AI", BRAND_VOICE))
+    second = ContentPromptManager._get_additional_context(_request("AI", reordered))
+    assert first is second
+    assert "Style Guide: {'emoji': False}" in first
+
+def test_bulk_prompts_match_single_prompts():
+    requests = [_request(f"Topic {i}", BRAND_VOICE if i % 2 else None) for i in range(6)]
+    assert ContentPromptManager.get_prompts(requests) == [
+        ContentPromptManager.get_prompt(r) for r in requests
+    ]
@@ -0,0 +1,47 @@
+import json
+from app.core.models import Platform
+from app.utils.lexicon import LexiconMatcher, LexiconTerm, load_lexicon
+from app.utils.validators import ContentValidator, StreamingValidator
+
+def test_longest_term_wins_and_word_boundaries_apply():
+    matcher = LexiconMatcher([LexiconTerm("scam"), LexiconTerm("scam artist"), LexiconTerm("ban")])
+
+    matches = matcher.find_all("A SCAM   artist asked for a ban, not a banana.")
+
+    assert [(m.term, m.text) for m in matches] == [("scam artist", "SCAM   artist"), ("ban", "ban")]
+    assert matches[0].start == 2
+    assert not matcher.contains("bananas and scammers")
+
+def test_unbounded_terms_match_inside_words_and_case_folds():
+    matcher = LexiconMatcher([LexiconTerm("spam", word_boundary=False), LexiconTerm("straße")])
+
+    assert matcher.search("no spammers").term == "spam"
+    assert matcher.search("Visit STRASSE 5").term == "straße"
+    assert matcher.match_many(["clean", "spam here", "straße"], first_only=True) == [
+        [], [matcher.search("spam here")], [matcher.search("straße")]
+    ]
+
+def test_lexicon_files(tmp_path):
+    words = tmp_path / "brands.txt"
+    words.write_text("# competitors\nAcme Corp\n\nglobex  # trailing comment\n", encoding="utf-8")
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"category": "spam", "word_boundary": False, "terms": ["clickbait"]}))
+
+    assert load_lexicon(str(words)) == [LexiconTerm("Acme Corp", "brands"), LexiconTerm("globex", "brands")]
+    matcher = LexiconMatcher.from_files([str(words), str(rules)])
+    assert len(matcher) == 3
+    assert [m.category for m in matcher.find_all("acme corp clickbaits")] == ["brands", "spam"]
+
+def test_streaming_waits_for_a_whole_word_to_end(monkeypatch):
+    lexicon = LexiconMatcher([LexiconTerm("ban")])
+    monkeypatch.setattr(ContentValidator, "prohibited_lexicon", staticmethod(lambda: lexicon))
+
+    validator = StreamingValidator(Platform.LINKEDIN)
+    assert validator.feed("no ban") is None
+    assert validator.feed("ana here") is None
+    assert validator.finish() is None
+
+    validator = StreamingValidator(Platform.LINKEDIN)
+    assert validator.feed("lift the ban") is None
+    issue = validator.finish()
+    assert issue.match == "ban" and issue.position == 9
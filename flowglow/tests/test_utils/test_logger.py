@@ -0,0 +1,56 @@
+import json
+import threading
+import pytest
+from app.utils import logger as logger_module
+from app.utils.logger import FlowGlowLogger, LazyPayload, SizeTimeRotatingFileHandler, setup_logging, shutdown_logging
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger_module.settings, "LOG_CONSOLE", False)
+    shutdown_logging()
+    setup_logging(str(tmp_path))
+    yield tmp_path
+    shutdown_logging()
+
+def _records(log_dir):
+    shutdown_logging()  # flushes the queue
+    lines = (log_dir / "flowglow.log").read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+def test_instances_share_one_handler(log_dir):
+    first, second = FlowGlowLogger(), FlowGlowLogger()
+    assert first.logger is second.logger
+    assert len(first.logger.handlers) == 1
+
+    first.log_performance("generation", 1.234)
+    records = _records(log_dir)
+    assert len(records) == 1
+    assert records[0]["message"] == "Performance - generation: 1.23s"
+    assert records[0]["payload"] == {"operation": "generation", "duration": 1.234}
+
+def test_payload_is_rendered_off_the_calling_thread(log_dir):
+    rendered_on = []
+
+    class Payload:
+        def model_dump(self, mode=None):
+            rendered_on.append(threading.current_thread())
+            return {"topic": "x" * 5000}
+
+    FlowGlowLogger().log_request(Payload())
+    records = _records(log_dir)
+    assert rendered_on and rendered_on[0] is not threading.current_thread()
+    assert records[0]["payload"]["topic"].endswith("...[+3000 chars]")
+
+def test_unsampled_content_is_summarized():
+    payload = LazyPayload({"content": "body " * 100, "platform": "blog"}, sample_rate=0.0)
+    rendered = payload.render(max_chars=2000)
+    assert rendered["content"]["chars"] == 500
+    assert rendered["platform"] == "blog"
+
+def test_file_rotates_by_size(tmp_path):
+    handler = SizeTimeRotatingFileHandler(str(tmp_path / "app.log"), max_bytes=100, interval=0, backup_count=2)
+    record = logger_module.logging.LogRecord("t", 20, __file__, 1, "x" * 80, None, None)
+    for _ in range(3):
+        handler.emit(record)
+    handler.close()
+    assert (tmp_path / "app.log.1").exists()
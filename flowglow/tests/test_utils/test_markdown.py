@@ -0,0 +1,59 @@
+from app.core.models import Platform
+from app.utils.markdown import MarkdownStream, markdown_to_html, render_inline
+from app.utils.text_processor import StreamingFormatter, TextProcessor
+
+DOCUMENT = """# Growing *fast*
+
+First paragraph.
+Still the first.
+
+Second paragraph.
+
+Third paragraph.
+
+## Steps
+1. Plan
+2. Ship
+   - measure
+3. Repeat
+
+```
+a < b
+```
+"""
+
+def test_every_paragraph_is_converted():
+    html = TextProcessor.format_for_platform(DOCUMENT, Platform.BLOG)
+
+    assert html.startswith("<h1>Growing <em>fast</em></h1>\n")
+    assert "<p>First paragraph.\nStill the first.</p>" in html
+    assert "<p>Second paragraph.</p>" in html
+    assert "<p>Third paragraph.</p>" in html
+    assert "<ol>\n<li>Plan</li>\n<li>Ship\n<ul>\n<li>measure</li>\n</ul>\n</li>\n<li>Repeat</li>\n</ol>" in html
+    assert "<pre><code>a &lt; b\n</code></pre>" in html
+
+def test_inline_formatting_and_escaping():
+    assert render_inline("**bold** and _em_ in `x * y`") == "<strong>bold</strong> and <em>em</em> in <code>x * y</code>"
+    assert render_inline("[docs](https://example.com?a=1&b=2) <b>") == (
+        '<a href="https://example.com?a=1&amp;b=2">docs</a> &lt;b&gt;'
+    )
+    assert render_inline("[x](javascript:alert) snake_case_name") == '<a href="#">x</a> snake_case_name'
+
+def test_streamed_output_matches_batch_conversion():
+    for size in (1, 3, 7, 64):
+        converter = MarkdownStream()
+        streamed = [converter.feed(DOCUMENT[i:i + size]) for i in range(0, len(DOCUMENT), size)]
+        streamed.append(converter.finish())
+
+        assert "".join(streamed) == markdown_to_html(DOCUMENT)
+        assert any(streamed[:len(streamed) // 2])  # HTML arrives before the stream ends
+
+def test_streaming_formatter_previews_blog_html_and_keeps_the_markdown():
+    formatter = StreamingFormatter(Platform.BLOG)
+    assert formatter.update("# Growing *fast*\n\nFirst **para") == "# Growing *fast*\n\nFirst **para"
+    assert formatter.html.startswith("<h1>Growing <em>fast</em></h1>")
+    assert formatter.html.endswith("First **para")
+
+    assert formatter.finish(DOCUMENT) == DOCUMENT
+    assert formatter.html == markdown_to_html(DOCUMENT)
+    assert StreamingFormatter(Platform.LINKEDIN).html == ""
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import socket
+import urllib.request
+import pytest
+from app.core.config import settings
+from app.core.models import ContentRequest, Platform
+from app.utils.logger import setup_logging, shutdown_logging
+from app.utils.metrics import (
+    Histogram, MetricsRegistry, MetricsServer, SECONDS_BUCKETS, get_metrics, start_metrics_server
+)
+
+def test_histogram_quantiles_and_buckets():
+    histogram = Histogram(SECONDS_BUCKETS)
+    for value in range(1, 101):
+        histogram.observe(value / 100)
+
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(0.95) == 0.95
+    assert histogram.quantile(0.99) == 0.99
+    cumulative = dict(histogram.cumulative())
+    assert cumulative[0.5] == 50
+    assert cumulative[float("inf")] == 100
+
+def test_prometheus_rendering_includes_labels_and_quantiles():
+    registry = MetricsRegistry()
+    with registry.span("ttft", provider="ollama", platform="blog"):
+        pass
+
+    text = registry.render_prometheus()
+    assert "# TYPE flowglow_stage_duration_seconds histogram" in text
+    assert 'flowglow_stage_duration_seconds_bucket{platform="blog",provider="ollama",stage="ttft",le="+Inf"} 1' in text
+    assert 'flowglow_stage_duration_seconds_count{platform="blog",provider="ollama",stage="ttft"} 1' in text
+    assert 'quantile="0.99"' in text
+
+def test_server_exposes_text_and_json():
+    registry = MetricsRegistry()
+    registry.observe_stage("generation", 1.5, provider="groq", platform="twitter")
+    server = MetricsServer(registry, port=0).start()
+    try:
+        base = f"http://127.0.0.1:{server.port}"
+        text = urllib.request.urlopen(f"{base}/metrics").read().decode()
+        snapshot = json.loads(urllib.request.urlopen(f"{base}/metrics.json").read())
+    finally:
+        server.stop()
+
+    assert "flowglow_stage_duration_seconds_sum" in text
+    series = snapshot["stage_duration_seconds"][0]
+    assert series["labels"] == {"platform": "twitter", "provider": "groq", "stage": "generation"}
+    assert series["p50"] == 1.5
+
+def test_busy_port_disables_the_endpoint_instead_of_failing(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_CONSOLE", False)
+    shutdown_logging()
+    setup_logging(str(tmp_path))
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+        monkeypatch.setattr(settings, "METRICS_HOST", "127.0.0.1")
+        monkeypatch.setattr(settings, "METRICS_PORT", taken.getsockname()[1])
+
+        assert start_metrics_server() is None
+    shutdown_logging()
+    record = json.loads((tmp_path / "flowglow.log").read_text(encoding="utf-8").splitlines()[-1])
+    assert record["level"] == "WARNING" and "Metrics endpoint disabled" in record["message"]
+
+def test_streamed_generation_records_stage_spans(llm_handler, monkeypatch):
+    async def fake_stream(prompt, priority=None, labels=None, profile=None):
+        for chunk in ["one ", "two ", "three"]:
+            await asyncio.sleep(0.001)
+            yield chunk
+
+    registry = get_metrics()
+    registry.reset()
+    handler = llm_handler
+    monkeypatch.setattr(handler, "_stream_model", fake_stream)
+    request = ContentRequest(platform=Platform.LINKEDIN, topic="Remote work", audience="Managers", tone="professional")
+
+    async def collect():
+        return [item async for item in handler.stream("prompt", request=request)]
+
+    asyncio.run(collect())
+    stages = {series["labels"]["stage"]: series for series in registry.snapshot()["stage_duration_seconds"]}
+    assert {"ttft", "generation", "post_processing"} <= set(stages)
+    assert stages["ttft"]["labels"]["platform"] == "linkedin"
+    assert registry.snapshot()["tokens_per_second"][0]["count"] == 1
@@ -0,0 +1,84 @@
+import asyncio
+from app.core.models import Platform
+from app.utils.text_processor import StreamingFormatter, TextProcessor
+from app.utils.thread_splitter import (
+    ThreadSplitter, split_thread, stream_thread, strip_tweet_numbers, weighted_length
+)
+
+LONG_TEXT = " ".join(
+    f"Point {i} covers growth 🚀 and the results at https://example.com/articles/{i}?ref=thread." for i in range(30)
+)
+
+def test_weighted_length_counts_like_twitter():
+    assert weighted_length("hello") == 5
+    assert weighted_length("日本語") == 6
+    assert weighted_length("👩‍👩‍👧 👍🏽 🇫🇷") == 8
+    assert weighted_length("see https://example.com/a/very/long/path?query=1.") == 4 + 23 + 1
+    assert weighted_length("café") == 4
+
+def test_numbered_tweets_fit_and_keep_sentences_whole():
+    thread = TextProcessor.format_for_platform(LONG_TEXT, Platform.TWITTER)
+    tweets = thread.split("\n\n")
+
+    assert tweets[0].startswith(f"1/{len(tweets)} Point 0")
+    assert all(weighted_length(tweet) <= 280 for tweet in tweets)
+    assert all(tweet.endswith("ref=thread.") for tweet in tweets)
+
+def test_short_content_is_a_single_unnumbered_tweet():
+    assert TextProcessor.format_for_platform("Just one   tweet.", Platform.TWITTER) == "Just one tweet."
+
+def test_long_words_and_sentences_are_broken_to_fit():
+    tweets = split_thread("word " * 150 + "x" * 600)
+
+    assert all(weighted_length(tweet) <= 280 - len("9/9 ") for tweet in tweets)
+    assert "".join(tweets).replace(" ", "") == "word" * 150 + "x" * 600
+
+def test_streaming_emits_tweets_before_the_stream_ends():
+    splitter = ThreadSplitter()
+    emitted_at = []
+    chunks = [LONG_TEXT[i:i + 5] for i in range(0, len(LONG_TEXT), 5)]
+    for index, chunk in enumerate(chunks):
+        emitted_at.extend(index for _ in splitter.feed(chunk))
+    emitted_at.extend(len(chunks) for _ in splitter.finish())
+
+    assert emitted_at[0] < len(chunks) // 2
+    assert splitter.count == len(emitted_at)
+
+def test_stream_thread_matches_batch_split():
+    async def chunks():
+        for i in range(0, len(LONG_TEXT), 3):
+            yield LONG_TEXT[i:i + 3]
+
+    async def collect():
+        return [tweet async for tweet in stream_thread(chunks())]
+
+    assert asyncio.run(collect()) == split_thread(LONG_TEXT)
+
+def test_model_numbering_is_replaced_but_not_other_fractions():
+    text = "1/3 Hook.\n(2/3) Support runs 24/7 now.\nTweet 3: 24/7 is the new normal."
+    assert strip_tweet_numbers(text) == "Hook.\n\nSupport runs 24/7 now.\n\n24/7 is the new normal."
+
+def test_tweets_opening_with_a_fraction_keep_it():
+    assert strip_tweet_numbers("1/2 price this weekend only.") == "1/2 price this weekend only."
+    assert strip_tweet_numbers("Big news.\n\n3/4 of people agree.") == "Big news.\n\n3/4 of people agree."
+    thread = "1/3 Survey time.\n\n2/3 We asked 500 founders.\n3/4 of people agree async works."
+    assert strip_tweet_numbers(thread) == "Survey time.\n\nWe asked 500 founders.\n\n3/4 of people agree async works."
+    assert TextProcessor.format_for_platform("1/2 price this weekend only.", Platform.TWITTER) == "1/2 price this weekend only."
+
+def test_streamed_numbering_is_only_dropped_at_tweet_starts():
+    text = "1/2 Survey time, with results.\n\n2/2 We asked 500 founders.\n3/4 of people agree async works."
+    formatter = StreamingFormatter(Platform.TWITTER)
+    for end in range(3, len(text) + 3, 3):
+        shown = formatter.update(text[:end])
+
+    assert shown.startswith("Survey time")
+    assert "1/2" not in shown and "2/2" not in shown
+    assert "3/4 of people agree" in shown
+
+def test_streaming_formatter_shows_complete_tweets_and_matches_the_final_format():
+    formatter = StreamingFormatter(Platform.TWITTER)
+    shown = [formatter.update(LONG_TEXT[:end]) for end in range(5, len(LONG_TEXT) + 5, 5)]
+
+    assert any(update.startswith("1/ Point 0") for update in shown[:len(shown) // 2])
+    assert formatter.update("Rewritten " + LONG_TEXT).startswith("1/ Rewritten")
+    assert formatter.finish(LONG_TEXT) == TextProcessor.format_for_platform(LONG_TEXT, Platform.TWITTER)
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from app.core.models import Platform
+from app.utils.validators import ContentValidator, StreamingValidator
+
+def test_prohibited_term_split_across_chunks():
+    validator = StreamingValidator(Platform.BLOG)
+    assert validator.feed("Great offer, no sp") is None
+    issue = validator.feed("am here")
+    assert issue.code == "prohibited_content"
+    assert issue.match == "spam"
+    assert issue.position == len("Great offer, no ")
+
+def test_length_limit_stops_at_platform_limit():
+    validator = StreamingValidator(Platform.TWITTER)
+    for _ in range(28):
+        assert validator.feed("x" * 10) is None
+    issue = validator.feed("y")
+    assert issue.code == "length_exceeded"
+    assert issue.limit == ContentValidator.PLATFORM_LIMITS[Platform.TWITTER]
+
+THREAD = (
+    "1/3 Remote teams that write things down ship faster. Here is what we learned moving "
+    "a 40-person team to async-first work.\n\n"
+    "2/3 Decisions live in docs, not meetings. Every proposal gets a one-page brief, a comment "
+    "window, and a named owner.\n\n"
+    "3/3 Start with one recurring meeting and replace it with a written update. #RemoteWork #Async"
+)
+
+def _chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def test_twitter_thread_is_limited_per_tweet_not_as_a_whole():
+    assert len(THREAD) > ContentValidator.PLATFORM_LIMITS[Platform.TWITTER]
+    validator = StreamingValidator(Platform.TWITTER)
+    for chunk in _chunks(THREAD):
+        assert validator.feed(chunk) is None
+    assert validator.finish() is None
+    assert ContentValidator.validate_content(THREAD, Platform.TWITTER) == (True, None)
+
+def test_twitter_thread_rejects_a_long_tweet_and_a_runaway_thread():
+    long_tweet = THREAD.replace("Decisions live", "Decisions live " + "really " * 40)
+    validator = StreamingValidator(Platform.TWITTER)
+    for chunk in _chunks(long_tweet):
+        validator.feed(chunk)
+    assert validator.issue.code == "length_exceeded"
+    assert validator.issue.position == long_tweet.index("2/3")
+    assert not ContentValidator.validate_content(long_tweet, Platform.TWITTER)[0]
+
+    runaway = "\n".join(f"{i}/ Ship small, ship often." for i in range(1, 20))
+    validator = StreamingValidator(Platform.TWITTER, max_tweets=8)
+    for chunk in _chunks(runaway):
+        validator.feed(chunk)
+    assert validator.issue.code == "thread_too_long"
+    assert validator.issue.position == runaway.index("9/")
+    assert not ContentValidator.validate_content(runaway, Platform.TWITTER)[0]
+
+def test_update_scans_only_new_text_and_handles_rewrites():
+    validator = StreamingValidator(Platform.BLOG)
+    validator.update("Hello")
+    validator.update("Hello world")
+    assert validator.length == len("Hello world")
+    # The cleaned text can shrink, e.g. when an 'Assistant:' marker drops the prefix
+    validator.update("world")
+    assert validator.length == len("world")
+    assert validator.issue is None
+
+def test_stream_is_aborted_on_first_violation(llm_handler, monkeypatch):
+    produced = []
+
+    async def endless(prompt, priority=None, labels=None, profile=None):
+        while True:
+            produced.append("word ")
+            await asyncio.sleep(0)
+            yield "word "
+
+    handler = llm_handler
+    monkeypatch.setattr(handler, "_stream_model", endless)
+    validator = StreamingValidator(Platform.TWITTER)
+
+    async def collect():
+        return [item async for item in handler.stream("prompt", validator=validator)]
+
+    results = asyncio.run(collect())
+    assert results[-1][0].startswith("Content rejected")
+    assert validator.issue.code == "length_exceeded"
+    assert len(produced) < 70
+    assert handler.cancellation_stats()["rejected"] == 1
+
+def test_generate_with_validator_streams_and_stops(llm_handler, monkeypatch):
+    async def spammy(prompt, priority=None, labels=None, profile=None):
+        for chunk in ["Totally not ", "sp", "am", " at all"]:
+            yield chunk
+
+    handler = llm_handler
+    monkeypatch.setattr(handler, "_stream_model", spammy)
+    validator = StreamingValidator(Platform.LINKEDIN)
+
+    content, _ = asyncio.run(handler.generate("prompt", validator=validator))
+    assert content == "Content rejected: Content contains prohibited elements"
+    assert validator.issue.match == "spam"